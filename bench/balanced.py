@@ -0,0 +1,45 @@
+"""
+Benchmarks balanced layout building trees with millions of leaves, passing
+chunks one at a time (as the writer does for large writes split across
+calls) and in batches.
+
+Run from the repository root with:
+
+    python -m bench.balanced
+"""
+
+from time import perf_counter
+from typing import Sequence
+import ipld_unixfs.file.layout.balanced as Balanced
+from ipld_unixfs.file.chunker.api import Chunk
+from ipld_unixfs.file.chunker.buffer import BufferView
+
+WIDTH = Balanced.defaults.width
+CHUNK: Chunk = BufferView.create([b"x"])
+
+
+def _measure(leaves: int, batch: int) -> None:
+    chunks: Sequence[Chunk] = [CHUNK] * batch
+    start = perf_counter()
+    layout = Balanced.open(WIDTH)
+    nodes = 0
+    for _ in range(leaves // batch):
+        result = Balanced.write(layout, chunks)
+        layout = result.layout
+        nodes += len(result.nodes)
+    nodes += len(Balanced.close(layout).nodes) + 1
+    elapsed = perf_counter() - start
+    print(
+        f"{leaves:>9} leaves, batches of {batch:<5} {nodes:>7} nodes"
+        f" {elapsed:6.2f}s {elapsed / leaves * 1e9:8.1f} ns/leaf"
+    )
+
+
+def main() -> None:
+    for leaves in [1_000_000, 4_000_000]:
+        for batch in [1, 64, 1024]:
+            _measure(leaves, batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmarks materialising chunks out of a `BufferView`.
+
+Run from the repository root with:
+
+    python -m bench.buffer
+"""
+
+from time import perf_counter
+from typing import Callable
+from ipld_unixfs.file.chunker.buffer import BufferView, split
+
+MiB = 1024 * 1024
+CHUNK_SIZE = 262144
+
+
+def _buffer(size: int, segment_size: int) -> BufferView:
+    buffer = BufferView()
+    for offset in range(0, size, segment_size):
+        buffer = buffer.extend(memoryview(bytes(min(segment_size, size - offset))))
+    return buffer
+
+
+def _measure(name: str, size: int, run: Callable[[], None], rounds: int = 5) -> None:
+    best = float("inf")
+    for _ in range(rounds):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+    print(f"{name:<40} {size / best / (1024 * MiB):8.2f} GiB/s")
+
+
+def main() -> None:
+    size = 256 * MiB
+    for segment_size in [4096, 65536, MiB]:
+        buffer = _buffer(size, segment_size)
+        chunks, _ = split(buffer, [CHUNK_SIZE] * (size // CHUNK_SIZE))
+        target = memoryview(bytearray(CHUNK_SIZE))
+
+        def copy_to() -> None:
+            for chunk in chunks:
+                chunk.copy_to(target, 0)
+
+        def tobytes() -> None:
+            for chunk in chunks:
+                chunk.tobytes()
+
+        def as_memoryview() -> None:
+            for chunk in chunks:
+                chunk.as_memoryview()
+
+        print(f"segment size {segment_size} bytes, chunk size {CHUNK_SIZE} bytes")
+        _measure("  copy_to", size, copy_to)
+        _measure("  tobytes", size, tobytes)
+        _measure("  as_memoryview", size, as_memoryview)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmarks throughput and deduplication ratio of the chunkers on a synthetic
+corpus of file versions, each derived from the previous one by a number of
+small random inserts, deletes and overwrites.
+
+Run from the repository root with:
+
+    python -m bench.chunkers
+"""
+
+import random
+from time import perf_counter
+from hashlib import sha256
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.api import Chunker as ChunkerType
+from ipld_unixfs.file.chunker.fastcdc import FastCDCChunker
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.file.chunker.rabin import RabinChunker
+
+MiB = 1024 * 1024
+FILE_SIZE = 16 * MiB
+VERSIONS = 5
+EDITS = 32
+WRITE_SIZE = MiB
+SMALL_WRITE_SIZE = 4096
+
+
+def _corpus(seed: int = 1) -> list[bytes]:
+    rng = random.Random(seed)
+    data = rng.randbytes(FILE_SIZE)
+    versions = [data]
+    for _ in range(VERSIONS - 1):
+        edited = bytearray(data)
+        for _ in range(EDITS):
+            offset = rng.randrange(len(edited))
+            size = rng.randrange(1, 256)
+            kind = rng.randrange(3)
+            if kind == 0:
+                edited[offset:offset] = rng.randbytes(size)
+            elif kind == 1:
+                del edited[offset : offset + size]
+            else:
+                edited[offset : offset + size] = rng.randbytes(size)
+        data = bytes(edited)
+        versions.append(data)
+    return versions
+
+
+def _chunks(
+    chunker: ChunkerType, data: bytes, write_size: int = WRITE_SIZE
+) -> list[bytes]:
+    state = Chunker.open(chunker)
+    chunks = []
+    view = memoryview(data)
+    for offset in range(0, len(data), write_size):
+        state = Chunker.write(state, view[offset : offset + write_size])
+        chunks.extend(chunk.tobytes() for chunk in state.chunks)
+    state = Chunker.close(state)
+    chunks.extend(chunk.tobytes() for chunk in state.chunks)
+    return chunks
+
+
+def _run(name: str, chunker: ChunkerType, corpus: list[bytes]) -> None:
+    total = 0
+    count = 0
+    unique: dict[bytes, int] = {}
+    elapsed = 0.0
+    for data in corpus:
+        start = perf_counter()
+        chunks = _chunks(chunker, data)
+        elapsed += perf_counter() - start
+        total += len(data)
+        count += len(chunks)
+        for chunk in chunks:
+            unique[sha256(chunk).digest()] = len(chunk)
+
+    stored = sum(unique.values())
+    print(
+        f"{name:<24} {total / elapsed / MiB:8.2f} MiB/s"
+        f" {total / count / 1024:10.1f} KiB avg"
+        f" {total / stored:8.2f}x dedup"
+    )
+
+
+def _run_writes(name: str, chunker: ChunkerType, data: bytes) -> None:
+    """
+    Compares throughput of large and small writes, which should be close as
+    bytes searched by previous writes are not searched again.
+    """
+    rates = []
+    for write_size in [WRITE_SIZE, SMALL_WRITE_SIZE]:
+        start = perf_counter()
+        _chunks(chunker, data, write_size)
+        rates.append(len(data) / (perf_counter() - start) / MiB)
+    print(
+        f"{name:<24} {rates[0]:8.2f} MiB/s ({WRITE_SIZE // 1024} KiB writes)"
+        f" {rates[1]:8.2f} MiB/s ({SMALL_WRITE_SIZE // 1024} KiB writes)"
+    )
+
+
+def main() -> None:
+    corpus = _corpus()
+    print(
+        f"{VERSIONS} versions of {FILE_SIZE // MiB} MiB file"
+        f" with {EDITS} edits between versions"
+    )
+    _run("fixed", FixedSizeChunker(), corpus)
+    _run("rabin", RabinChunker(), corpus)
+    _run("fastcdc", FastCDCChunker(), corpus)
+    _run("fastcdc (64 KiB avg)", FastCDCChunker(65536), corpus)
+    _run("rabin (64 KiB avg)", RabinChunker(65536), corpus)
+
+    data = corpus[0][: 4 * MiB]
+    print(f"{len(data) // MiB} MiB file in large and small writes")
+    _run_writes("rabin", RabinChunker(), data)
+    _run_writes("fastcdc", FastCDCChunker(), data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmarks file writer throughput with leaves encoded on the calling thread
+and across a thread pool.
+
+Run from the repository root with:
+
+    python -m bench.writer
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Optional
+import ipld_unixfs.file as File
+from ipld_unixfs.unixfs import Block
+
+MiB = 1024 * 1024
+FILE_SIZE = 256 * MiB
+WRITE_SIZE = MiB
+
+
+class _Sink:
+    def write(self, block: Block) -> None:
+        pass
+
+
+def _measure(
+    name: str, content: bytes, raw: bool, executor: Optional[ThreadPoolExecutor]
+) -> None:
+    settings = File.defaults()
+    if raw:
+        settings.file_chunk_encoder = File.UnixFSRawLeaf()
+    view = memoryview(content)
+    start = perf_counter()
+    writer = File.create_writer(_Sink(), settings=settings, executor=executor)
+    for offset in range(0, len(content), WRITE_SIZE):
+        writer.write(view[offset : offset + WRITE_SIZE])
+    writer.close()
+    elapsed = perf_counter() - start
+    print(f"{name:<40} {len(content) / elapsed / MiB:8.1f} MiB/s")
+
+
+def main() -> None:
+    content = os.urandom(FILE_SIZE)
+    for raw in [False, True]:
+        leaves = "raw" if raw else "dag-pb"
+        _measure(f"{leaves} leaves, no executor", content, raw, None)
+        for workers in [2, 4, 8]:
+            with ThreadPoolExecutor(workers) as executor:
+                name = f"{leaves} leaves, {workers} threads"
+                _measure(name, content, raw, executor)
+
+
+if __name__ == "__main__":
+    main()
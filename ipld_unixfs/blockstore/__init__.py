@@ -0,0 +1,3 @@
+from .api import BlockStore
+from .lru import LRUBlockStore
+from .sqlite import SQLiteBlockStore
@@ -0,0 +1,22 @@
+from typing import Protocol
+from multiformats import CID
+from ipld_unixfs.unixfs import Block, ByteView
+
+
+class BlockStore(Protocol):
+    """
+    Storage of the blocks, which can be used both as a block writer (e.g. the
+    sink of the file writer) and as a block getter (e.g. the source of the
+    exporter). Blocks are addressed by the multihash of the CID, so the same
+    bytes are stored once regardless of the CID version they are linked by.
+    """
+
+    def write(self, block: Block) -> None: ...
+
+    def get(self, cid: CID) -> ByteView:
+        """
+        Returns bytes of the block or raises `KeyError` if it is not stored.
+        """
+        ...
+
+    def has(self, cid: CID) -> bool: ...
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+from multiformats import CID
+from ipld_unixfs.blockstore.api import BlockStore
+from ipld_unixfs.unixfs import Block, ByteView
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class LRUBlockStore:
+    """
+    In-memory block store holding up to `max_bytes` of blocks, evicting least
+    recently used blocks once over the budget.
+
+    If backing `store` is provided, blocks are written through to it and
+    blocks that are not held in memory are read from it (and kept in memory
+    for subsequent reads), so that frequently read blocks (e.g. branches of
+    the file DAG) are served from memory. Without the backing store evicted
+    blocks are lost.
+    """
+
+    store: Optional[BlockStore]
+    max_bytes: int
+    blocks: "OrderedDict[bytes, bytes]"
+    """Blocks by multihash, from least to most recently used."""
+    size: int
+    """Number of bytes in the `blocks`."""
+    lock: Lock
+
+    def __init__(
+        self, store: Optional[BlockStore] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError("max bytes must not be negative")
+        self.store = store
+        self.max_bytes = max_bytes
+        self.blocks = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+
+    def write(self, block: Block) -> None:
+        if self.store is not None:
+            self.store.write(block)
+        else:
+            # Block bytes may be a view (e.g. of a memory mapped file), which
+            # should not be held on to.
+            _put(self, block.cid.digest, bytes(block.bytes))
+
+    def get(self, cid: CID) -> ByteView:
+        key = cid.digest
+        with self.lock:
+            data = self.blocks.get(key)
+            if data is not None:
+                self.blocks.move_to_end(key)
+                return data
+        if self.store is None:
+            raise KeyError(cid)
+        data = bytes(self.store.get(cid))
+        _put(self, key, data)
+        return data
+
+    def has(self, cid: CID) -> bool:
+        with self.lock:
+            if cid.digest in self.blocks:
+                return True
+        return self.store is not None and self.store.has(cid)
+
+
+def _put(view: LRUBlockStore, key: bytes, data: bytes) -> None:
+    if len(data) > view.max_bytes:
+        return
+    with view.lock:
+        previous = view.blocks.pop(key, None)
+        if previous is not None:
+            view.size -= len(previous)
+        view.blocks[key] = data
+        view.size += len(data)
+        while view.size > view.max_bytes:
+            _, evicted = view.blocks.popitem(last=False)
+            view.size -= len(evicted)
@@ -0,0 +1,133 @@
+import os
+import sqlite3
+from threading import Lock
+from types import TracebackType
+from typing import Optional, Union
+from multiformats import CID
+from ipld_unixfs.unixfs import Block, ByteView
+
+DEFAULT_BATCH_SIZE = 4 * 1024 * 1024
+"""Number of bytes of blocks written within a single transaction."""
+
+Path = Union[str, "os.PathLike[str]"]
+
+
+class SQLiteBlockStore:
+    """
+    Block store keeping blocks in a local SQLite database. Writes are
+    collected and inserted in batches of `batch_size` bytes within a single
+    transaction, while blocks that are not yet inserted can already be read.
+
+    Store can be used from multiple threads (e.g. by the exporter prefetching
+    blocks), call `close` (or use it as a context manager) to insert the
+    remaining blocks.
+    """
+
+    connection: sqlite3.Connection
+    batch_size: int
+    pending: dict[bytes, bytes]
+    """Blocks that were not yet inserted, by multihash."""
+    pending_size: int
+    lock: Lock
+
+    def __init__(self, path: Path, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS blocks "
+            "(multihash BLOB PRIMARY KEY, bytes BLOB NOT NULL) WITHOUT ROWID"
+        )
+        self.connection.commit()
+        self.batch_size = batch_size
+        self.pending = {}
+        self.pending_size = 0
+        self.lock = Lock()
+
+    def write(self, block: Block) -> None:
+        write(self, block)
+
+    def get(self, cid: CID) -> ByteView:
+        return get(self, cid)
+
+    def has(self, cid: CID) -> bool:
+        return has(self, cid)
+
+    def flush(self) -> None:
+        """
+        Insert all the pending blocks.
+        """
+        flush(self)
+
+    def close(self) -> None:
+        close(self)
+
+    def __enter__(self) -> "SQLiteBlockStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        close(self)
+
+
+def open(path: Path, batch_size: int = DEFAULT_BATCH_SIZE) -> SQLiteBlockStore:
+    return SQLiteBlockStore(path, batch_size)
+
+
+def write(store: SQLiteBlockStore, block: Block) -> None:
+    with store.lock:
+        key = block.cid.digest
+        if key not in store.pending:
+            data = bytes(block.bytes)
+            store.pending[key] = data
+            store.pending_size += len(data)
+        if store.pending_size >= store.batch_size:
+            _insert(store)
+
+
+def get(store: SQLiteBlockStore, cid: CID) -> ByteView:
+    key = cid.digest
+    with store.lock:
+        data = store.pending.get(key)
+        if data is not None:
+            return data
+        row = store.connection.execute(
+            "SELECT bytes FROM blocks WHERE multihash = ?", (key,)
+        ).fetchone()
+    if row is None:
+        raise KeyError(cid)
+    result: bytes = row[0]
+    return result
+
+
+def has(store: SQLiteBlockStore, cid: CID) -> bool:
+    key = cid.digest
+    with store.lock:
+        if key in store.pending:
+            return True
+        row = store.connection.execute(
+            "SELECT 1 FROM blocks WHERE multihash = ?", (key,)
+        ).fetchone()
+    return row is not None
+
+
+def flush(store: SQLiteBlockStore) -> None:
+    with store.lock:
+        _insert(store)
+
+
+def close(store: SQLiteBlockStore) -> None:
+    flush(store)
+    store.connection.close()
+
+
+def _insert(store: SQLiteBlockStore) -> None:
+    if len(store.pending) > 0:
+        with store.connection:
+            store.connection.executemany(
+                "INSERT OR IGNORE INTO blocks VALUES (?, ?)", store.pending.items()
+            )
+        store.pending = {}
+        store.pending_size = 0
@@ -0,0 +1,9 @@
+from .writer import (
+    PLACEHOLDER_ROOT,
+    CarWriter,
+    close,
+    create_writer,
+    encode_header,
+    update_roots,
+    write,
+)
@@ -0,0 +1,108 @@
+from array import array
+from typing import Optional
+from multiformats import CID
+from ipld_unixfs.codec import read_varint, varint_size, write_varint
+
+MULTIHASH_INDEX_SORTED = 0x0401
+"""Multicodec code of the `MultihashIndexSorted` CARv2 index."""
+
+
+class Bucket:
+    """
+    Offsets of the blocks whose digests have the same multihash code and
+    length. Digests are appended into a single buffer and offsets into a
+    compact array, they are sorted only once the index is encoded.
+    """
+
+    digest_size: int
+    digests: bytearray
+    offsets: "array[int]"
+
+    def __init__(self, digest_size: int) -> None:
+        self.digest_size = digest_size
+        self.digests = bytearray()
+        self.offsets = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def add(self, digest: bytes, offset: int) -> None:
+        self.digests += digest
+        self.offsets.append(offset)
+
+    def encode(self) -> bytes:
+        """
+        Encodes entries as digest followed by the little endian offset, sorted
+        by digest.
+        """
+        size = self.digest_size
+        digests = self.digests
+        offsets = self.offsets
+        order = sorted(
+            range(len(offsets)), key=lambda n: digests[n * size : (n + 1) * size]
+        )
+        out = bytearray()
+        for n in order:
+            out += digests[n * size : (n + 1) * size]
+            out += offsets[n].to_bytes(8, "little")
+        return bytes(out)
+
+
+class MultihashIndexSorted:
+    """
+    CARv2 index mapping multihash of the block to the offset of its section
+    within the CARv1 payload. It is built incrementally as blocks are written
+    so that archive does not need to be re-read to index it. Memory use is
+    proportional to the number of blocks.
+    """
+
+    buckets: dict[tuple[int, int], Bucket]
+    """Buckets by multihash code and digest length."""
+
+    def __init__(self) -> None:
+        self.buckets = {}
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def add(self, cid: CID, offset: int) -> None:
+        multihash = cid.digest
+        code, start = read_varint(multihash)
+        size, start = read_varint(multihash, start)
+        add(self, code, multihash[start : start + size], offset)
+
+    def encode(self) -> bytes:
+        return encode(self)
+
+
+def add(index: MultihashIndexSorted, code: int, digest: bytes, offset: int) -> None:
+    key = (code, len(digest))
+    bucket: Optional[Bucket] = index.buckets.get(key)
+    if bucket is None:
+        bucket = index.buckets[key] = Bucket(len(digest))
+    bucket.add(digest, offset)
+
+
+def encode(index: MultihashIndexSorted) -> bytes:
+    """
+    Encodes the index (including the multicodec prefix) in the format used by
+    go-car: number of codes, then for every code (ascending) the code, number
+    of widths and for every width (ascending) the width, byte length of the
+    entries and the entries.
+    """
+    codes: dict[int, list[Bucket]] = {}
+    for code, size in sorted(index.buckets):
+        codes.setdefault(code, []).append(index.buckets[(code, size)])
+
+    prefix = bytearray(varint_size(MULTIHASH_INDEX_SORTED))
+    write_varint(prefix, 0, MULTIHASH_INDEX_SORTED)
+    out = [bytes(prefix), len(codes).to_bytes(4, "little")]
+    for code, buckets in codes.items():
+        out.append(code.to_bytes(8, "little"))
+        out.append(len(buckets).to_bytes(4, "little"))
+        for bucket in buckets:
+            entries = bucket.encode()
+            out.append((bucket.digest_size + 8).to_bytes(4, "little"))
+            out.append(len(entries).to_bytes(8, "little"))
+            out.append(entries)
+    return b"".join(out)
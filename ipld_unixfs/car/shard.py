@@ -0,0 +1,334 @@
+from array import array
+import hashlib
+import heapq
+from typing import BinaryIO, Callable, Iterator, Optional, Protocol, Sequence
+import dag_cbor
+from multiformats import CID, multihash
+from ipld_unixfs.car.writer import (
+    DEFAULT_BUFFER_SIZE,
+    encode_header,
+    encode_section_prefix,
+    write_vectored,
+)
+from ipld_unixfs.unixfs import Block, ByteView
+
+CAR_CODE = 0x0202
+DAG_CBOR_CODE = 0x71
+INDEX_VERSION = "index/sharded/dag@0.1"
+"""Key of the manifest block identifying the index format."""
+
+DEFAULT_SHARD_SIZE = 127 * 1024 * 1024
+
+HEADER = encode_header([])
+"""Header of the shards, which have no roots."""
+
+
+class Slots:
+    """
+    Offsets and lengths of the blocks whose multihashes have the same length.
+    Multihashes are appended into a single buffer of fixed width slots and
+    offsets and lengths into compact arrays, they are sorted by multihash on
+    first lookup so that blocks are found by bisecting the slots.
+    """
+
+    digest_size: int
+    digests: bytearray
+    offsets: "array[int]"
+    lengths: "array[int]"
+    sorted: bool
+
+    def __init__(self, digest_size: int) -> None:
+        self.digest_size = digest_size
+        self.digests = bytearray()
+        self.offsets = array("Q")
+        self.lengths = array("Q")
+        self.sorted = True
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def add(self, digest: bytes, offset: int, length: int) -> None:
+        self.digests += digest
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.sorted = False
+
+    def digest(self, position: int) -> bytes:
+        size = self.digest_size
+        return bytes(self.digests[position * size : (position + 1) * size])
+
+    def sort(self) -> None:
+        if self.sorted:
+            return
+        order = sorted(range(len(self)), key=self.digest)
+        digests = bytearray()
+        for n in order:
+            digests += self.digest(n)
+        self.digests = digests
+        self.offsets = array("Q", [self.offsets[n] for n in order])
+        self.lengths = array("Q", [self.lengths[n] for n in order])
+        self.sorted = True
+
+    def find(self, digest: bytes) -> Optional[int]:
+        """
+        Position of the slot holding the given multihash, or `None` if there
+        is no such slot.
+        """
+        self.sort()
+        low = 0
+        high = len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.digest(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.digest(low) == digest:
+            return low
+        return None
+
+    def entries(self) -> Iterator[tuple[bytes, int, int]]:
+        self.sort()
+        for n in range(len(self)):
+            yield self.digest(n), self.offsets[n], self.lengths[n]
+
+
+class ShardIndex:
+    """
+    Index of the blocks in a shard mapping block multihash to the offset and
+    length of the block bytes within the shard, so that a block can be read
+    with a single seek. Entries are held in compact slots by multihash length.
+    """
+
+    slots: dict[int, Slots]
+    """Slots by multihash length."""
+
+    def __init__(self) -> None:
+        self.slots = {}
+
+    def __len__(self) -> int:
+        return sum(len(slots) for slots in self.slots.values())
+
+    def add(self, digest: bytes, offset: int, length: int) -> None:
+        slots = self.slots.get(len(digest))
+        if slots is None:
+            slots = self.slots[len(digest)] = Slots(len(digest))
+        slots.add(digest, offset, length)
+
+    def get(self, cid: CID) -> Optional[tuple[int, int]]:
+        """
+        Offset and length of the block with the given CID in the shard, or
+        `None` if shard does not contain it.
+        """
+        digest = bytes(cid.digest)
+        slots = self.slots.get(len(digest))
+        if slots is None:
+            return None
+        position = slots.find(digest)
+        if position is None:
+            return None
+        return slots.offsets[position], slots.lengths[position]
+
+    def entries(self) -> Iterator[tuple[bytes, int, int]]:
+        """
+        Multihash, offset and length of every block, sorted by multihash.
+        """
+        return heapq.merge(*(slots.entries() for slots in self.slots.values()))
+
+
+class Shard:
+    """
+    CAR file holding a slice of the DAG blocks.
+    """
+
+    cid: CID
+    """CID of the CAR file."""
+    byte_length: int
+    index: ShardIndex
+
+    def __init__(self, cid: CID, byte_length: int, index: ShardIndex) -> None:
+        self.cid = cid
+        self.byte_length = byte_length
+        self.index = index
+
+
+class Manifest:
+    """
+    Index of the DAG sharded across CARs, linking the DAG root to the index
+    of every shard. It is encoded as dag-cbor `blocks`, the last one being
+    the root of the index:
+
+    ```
+    { "index/sharded/dag@0.1": { "content": root, "shards": [shard, ...] } }
+    ```
+
+    where each shard is a link to a `[shard multihash, [[block multihash,
+    [offset, length]], ...]]` block with entries sorted by the multihash.
+    """
+
+    root: CID
+    shards: Sequence[Shard]
+    blocks: Sequence[Block]
+
+    def __init__(self, root: CID, shards: Sequence[Shard]) -> None:
+        self.root = root
+        self.shards = shards
+        self.blocks = encode_manifest(root, shards)
+
+    @property
+    def cid(self) -> CID:
+        return self.blocks[-1].cid
+
+
+class Hasher(Protocol):
+    """Incremental hash of the shard bytes, e.g. `hashlib.sha256()`."""
+
+    def update(self, data: ByteView, /) -> None: ...
+
+    def digest(self) -> bytes: ...
+
+
+class ShardingWriter:
+    """
+    Block writer that splits blocks across CARs of up to `shard_size` bytes
+    (a block larger than that gets a shard on its own). Outputs are obtained
+    by calling `open_shard` with the shard number and are closed once shard
+    is complete.
+
+    Shards are written with no roots in the header, as the root of the DAG
+    is only known once all the blocks were written; it is recorded in the
+    `Manifest` returned by `close` instead.
+    """
+
+    open_shard: Callable[[int], BinaryIO]
+    shard_size: int
+    buffer_size: int
+    shards: list[Shard]
+    out: Optional[BinaryIO]
+    """Output of the current shard, `None` if no shard is open."""
+    hasher: Hasher
+    index: ShardIndex
+    offset: int
+    buffers: list[ByteView]
+    buffered: int
+    manifest: Optional[Manifest]
+
+    def __init__(
+        self,
+        open_shard: Callable[[int], BinaryIO],
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        self.open_shard = open_shard
+        self.shard_size = shard_size
+        self.buffer_size = buffer_size
+        self.shards = []
+        self.out = None
+        self.hasher = hashlib.sha256()
+        self.index = ShardIndex()
+        self.offset = 0
+        self.buffers = []
+        self.buffered = 0
+        self.manifest = None
+
+    def write(self, block: Block) -> None:
+        write(self, block)
+
+    def close(self, root: CID) -> Manifest:
+        """
+        Completes the last shard and returns the manifest of the shards.
+        """
+        return close(self, root)
+
+
+def create_writer(
+    open_shard: Callable[[int], BinaryIO],
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> ShardingWriter:
+    return ShardingWriter(open_shard, shard_size, buffer_size)
+
+
+def write(writer: ShardingWriter, block: Block) -> None:
+    if writer.manifest is not None:
+        raise ValueError("unable to write, sharding writer is closed")
+
+    prefix, cid = encode_section_prefix(block)
+    size = len(prefix) + len(cid) + len(block.bytes)
+    if writer.out is not None and writer.offset + size > writer.shard_size:
+        if len(writer.index) > 0:
+            _close_shard(writer)
+    if writer.out is None:
+        writer.out = writer.open_shard(len(writer.shards))
+        _append(writer, HEADER)
+
+    offset = writer.offset + len(prefix) + len(cid)
+    writer.index.add(block.cid.digest, offset, len(block.bytes))
+    _append(writer, prefix)
+    _append(writer, cid)
+    _append(writer, block.bytes)
+
+
+def close(writer: ShardingWriter, root: CID) -> Manifest:
+    if writer.manifest is None:
+        if writer.out is not None:
+            _close_shard(writer)
+        writer.manifest = Manifest(root, writer.shards)
+    return writer.manifest
+
+
+def encode_manifest(root: CID, shards: Sequence[Shard]) -> list[Block]:
+    blocks = []
+    for shard in shards:
+        index = shard.index
+        entries: list[dag_cbor.IPLDKind] = [
+            [digest, [offset, length]] for digest, offset, length in index.entries()
+        ]
+        blocks.append(_encode_block([bytes(shard.cid.digest), entries]))
+    content: dict[str, dag_cbor.IPLDKind] = {
+        "content": root,
+        "shards": [block.cid for block in blocks],
+    }
+    blocks.append(_encode_block({INDEX_VERSION: content}))
+    return blocks
+
+
+def _encode_block(value: dag_cbor.IPLDKind) -> Block:
+    data = dag_cbor.encode(value)
+    if not isinstance(data, bytes):
+        raise TypeError("expected dag-cbor encoder to return bytes")
+    return Block(
+        CID("base32", 1, DAG_CBOR_CODE, multihash.digest(data, "sha2-256")), data
+    )
+
+
+def _append(writer: ShardingWriter, buffer: ByteView) -> None:
+    writer.hasher.update(buffer)
+    writer.buffers.append(buffer)
+    writer.buffered += len(buffer)
+    writer.offset += len(buffer)
+    if writer.buffered >= writer.buffer_size:
+        _flush(writer)
+
+
+def _flush(writer: ShardingWriter) -> None:
+    if writer.out is not None and len(writer.buffers) > 0:
+        write_vectored(writer.out, writer.buffers)
+    writer.buffers = []
+    writer.buffered = 0
+
+
+def _close_shard(writer: ShardingWriter) -> None:
+    _flush(writer)
+    out = writer.out
+    if out is None:
+        raise ValueError("unable to close shard, no shard is open")
+    out.close()
+
+    digest = multihash.wrap(writer.hasher.digest(), "sha2-256")
+    cid = CID("base32", 1, CAR_CODE, digest)
+    writer.shards.append(Shard(cid, writer.offset, writer.index))
+    writer.out = None
+    writer.hasher = hashlib.sha256()
+    writer.index = ShardIndex()
+    writer.offset = 0
@@ -0,0 +1,94 @@
+from typing import BinaryIO, Optional, Sequence
+from multiformats import CID
+from ipld_unixfs.car.index import MultihashIndexSorted
+from ipld_unixfs.car.writer import DEFAULT_BUFFER_SIZE, CarWriter
+from ipld_unixfs.unixfs import Block
+
+PRAGMA = bytes.fromhex("0aa16776657273696f6e02")
+"""Fixed CARv2 pragma, a CARv1 header with version 2."""
+
+HEADER_SIZE = 40
+DATA_OFFSET = len(PRAGMA) + HEADER_SIZE
+"""CARv1 payload is written right after the pragma and the header."""
+
+CHARACTERISTICS = bytes(16)
+"""No characteristics are set, same as go-car writes by default."""
+
+
+def encode_header(data_offset: int, data_size: int, index_offset: int) -> bytes:
+    return (
+        CHARACTERISTICS
+        + data_offset.to_bytes(8, "little")
+        + data_size.to_bytes(8, "little")
+        + index_offset.to_bytes(8, "little")
+    )
+
+
+class CarV2Writer:
+    """
+    Streaming CARv2 writer. Blocks are written into the CARv1 payload as they
+    are passed to it (see `CarWriter`) while `MultihashIndexSorted` index is
+    built from their offsets. On close index is written after the payload and
+    the header is patched with the final sizes, which requires seekable
+    output.
+    """
+
+    car: CarWriter
+    index: MultihashIndexSorted
+    closed: bool
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        roots: Optional[Sequence[CID]] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        out.write(PRAGMA)
+        out.write(encode_header(DATA_OFFSET, 0, 0))
+        self.car = CarWriter(out, roots, buffer_size, DATA_OFFSET)
+        self.index = MultihashIndexSorted()
+        self.closed = False
+
+    def write(self, block: Block) -> None:
+        write(self, block)
+
+    def close(self, roots: Optional[Sequence[CID]] = None) -> None:
+        """
+        Complete the CARv1 payload (see `CarWriter.close`), write the index and
+        patch the header. Output is not closed.
+        """
+        close(self, roots)
+
+
+def create_writer(
+    out: BinaryIO,
+    roots: Optional[Sequence[CID]] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> CarV2Writer:
+    return CarV2Writer(out, roots, buffer_size)
+
+
+def write(writer: CarV2Writer, block: Block) -> None:
+    # Index points to the start of the section within the payload.
+    offset = writer.car.offset
+    writer.car.write(block)
+    writer.index.add(block.cid, offset)
+
+
+def close(writer: CarV2Writer, roots: Optional[Sequence[CID]] = None) -> None:
+    if writer.closed:
+        return
+    car = writer.car
+    car.close(roots)
+    writer.closed = True
+
+    out = car.out
+    data_size = car.offset
+    index_offset = DATA_OFFSET + data_size
+    out.write(writer.index.encode())
+    out.flush()
+    position = out.tell()
+    out.seek(len(PRAGMA))
+    out.write(encode_header(DATA_OFFSET, data_size, index_offset))
+    out.seek(position)
+    out.flush()
@@ -0,0 +1,201 @@
+import io
+import os
+from typing import BinaryIO, Optional, Sequence
+import dag_cbor
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs.unixfs import Block, ByteView
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+"""
+Number of bytes collected before they are written out. Sections are written
+with a single vectored write instead of one write per block.
+"""
+
+IOV_MAX = 1024
+"""Max number of buffers passed to a single `os.writev` call."""
+
+PLACEHOLDER_ROOT = CID("base32", 1, codec.code, multihash.wrap(bytes(32), "sha2-256"))
+"""
+Root written into the header when roots are not known up front. It has the
+same size as CIDv1 of a dag-pb block with a sha2-256 hash (that is UnixFS
+root), so that header can be updated in place once the root is known.
+"""
+
+
+def encode_header(roots: Sequence[CID]) -> bytes:
+    """
+    Encodes CARv1 header with the given roots, including the length prefix.
+    """
+    header = dag_cbor.encode({"roots": list(roots), "version": 1})
+    if not isinstance(header, bytes):
+        raise TypeError("expected dag-cbor encoder to return bytes")
+    prefix = bytearray(codec.varint_size(len(header)))
+    codec.write_varint(prefix, 0, len(header))
+    return bytes(prefix) + header
+
+
+def encode_section_prefix(block: Block) -> tuple[bytes, bytes]:
+    """
+    Returns length prefix and the CID bytes of the block section, which are
+    followed by the block bytes.
+    """
+    cid = codec.encode_cid(block.cid)
+    length = len(cid) + len(block.bytes)
+    prefix = bytearray(codec.varint_size(length))
+    codec.write_varint(prefix, 0, length)
+    return bytes(prefix), cid
+
+
+class CarWriter:
+    """
+    Streaming CARv1 writer, it is a block writer that writes blocks into the
+    output as they are passed to it.
+
+    If roots are not known up front (e.g. root of the file DAG is known only
+    after all of its blocks were written) header with the `PLACEHOLDER_ROOT`
+    is written instead and roots passed to `close` are patched into it, which
+    requires seekable output.
+    """
+
+    out: BinaryIO
+    roots: Optional[Sequence[CID]]
+    """Roots written into the header, `None` if placeholder was written."""
+    buffer_size: int
+    buffers: list[ByteView]
+    """Buffers that were not yet written to the output."""
+    buffered: int
+    """Number of bytes in the `buffers`."""
+    offset: int
+    """Number of bytes written to the output (including buffered)."""
+    byte_offset: int
+    """Position in the output at which the CAR starts."""
+    closed: bool
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        roots: Optional[Sequence[CID]] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        byte_offset: int = 0,
+    ) -> None:
+        self.out = out
+        self.roots = roots
+        self.buffer_size = buffer_size
+        self.buffers = []
+        self.buffered = 0
+        self.offset = 0
+        self.byte_offset = byte_offset
+        self.closed = False
+        header = encode_header(roots if roots is not None else [PLACEHOLDER_ROOT])
+        _append(self, header)
+
+    def write(self, block: Block) -> None:
+        """
+        Write a block section into the CAR.
+        """
+        write(self, block)
+
+    def flush(self) -> None:
+        """
+        Write all the buffered bytes to the output.
+        """
+        flush(self)
+
+    def close(self, roots: Optional[Sequence[CID]] = None) -> None:
+        """
+        Flush remaining bytes and, if the placeholder header was written, patch
+        the passed roots into it. Output is not closed.
+        """
+        close(self, roots)
+
+
+def create_writer(
+    out: BinaryIO,
+    roots: Optional[Sequence[CID]] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> CarWriter:
+    return CarWriter(out, roots, buffer_size)
+
+
+def write(writer: CarWriter, block: Block) -> None:
+    if writer.closed:
+        raise ValueError("unable to write, CAR writer is closed")
+    prefix, cid = encode_section_prefix(block)
+    _append(writer, prefix)
+    _append(writer, cid)
+    _append(writer, block.bytes)
+
+
+def flush(writer: CarWriter) -> None:
+    if len(writer.buffers) > 0:
+        write_vectored(writer.out, writer.buffers)
+        writer.buffers = []
+        writer.buffered = 0
+
+
+def close(writer: CarWriter, roots: Optional[Sequence[CID]] = None) -> None:
+    if writer.closed:
+        return
+    flush(writer)
+    writer.closed = True
+    if writer.roots is None:
+        if roots is None:
+            raise ValueError("roots are required, placeholder header was written")
+        writer.out.flush()
+        update_roots(writer.out, roots, writer.byte_offset)
+        writer.roots = roots
+    elif roots is not None and list(roots) != list(writer.roots):
+        raise ValueError("roots differ from the ones written into the header")
+    writer.out.flush()
+
+
+def update_roots(out: BinaryIO, roots: Sequence[CID], byte_offset: int = 0) -> None:
+    """
+    Replaces roots in the header of the CAR (starting at `byte_offset`) in the
+    seekable output. New header must be of the same size as the one being
+    replaced, e.g. it can replace the `PLACEHOLDER_ROOT` with the CID of a
+    UnixFS root.
+    """
+    position = out.tell()
+    header = encode_header(roots)
+    out.seek(byte_offset)
+    current = encode_header([PLACEHOLDER_ROOT])
+    if len(header) != len(current):
+        out.seek(position)
+        raise ValueError("can not update roots, header size would change")
+    out.write(header)
+    out.seek(position)
+
+
+def write_vectored(out: BinaryIO, buffers: list[ByteView]) -> None:
+    """
+    Writes buffers without concatenating them. Unbuffered files are written
+    with `os.writev`, other outputs with `writelines`.
+    """
+    if isinstance(out, io.FileIO) and hasattr(os, "writev"):
+        fd = out.fileno()
+        views = [memoryview(buffer) for buffer in buffers]
+        start = 0
+        while start < len(views):
+            batch = views[start : start + IOV_MAX]
+            written = os.writev(fd, batch)
+            # Skip over buffers that were written completely and retry
+            # remainder of the partially written one.
+            for view in batch:
+                if written >= len(view):
+                    written -= len(view)
+                    start += 1
+                else:
+                    views[start] = view[written:]
+                    break
+    else:
+        out.writelines(buffers)
+
+
+def _append(writer: CarWriter, buffer: ByteView) -> None:
+    writer.buffers.append(buffer)
+    writer.buffered += len(buffer)
+    writer.offset += len(buffer)
+    if writer.buffered >= writer.buffer_size:
+        flush(writer)
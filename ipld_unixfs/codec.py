@@ -0,0 +1,504 @@
+from typing import Iterator, Optional, Sequence, Union
+from multiformats import CID
+from ipld_unixfs.unixfs import (
+    AdvancedFile,
+    ByteView,
+    DAGLink,
+    Directory,
+    DirectoryEntryLink,
+    File,
+    FileLink,
+    FlatDirectory,
+    Metadata,
+    MTime,
+    NodeType,
+    ShardedDirectory,
+    SimpleFile,
+)
+
+code = 0x70
+"""Multicodec code of the dag-pb codec that UnixFS nodes are encoded with."""
+
+name = "UnixFS"
+
+EMPTY_BUFFER = b""
+EMPTY = ()
+UINT64 = 0xFFFFFFFFFFFFFFFF
+
+
+def encode_file_chunk(content: ByteView) -> bytes:
+    """
+    Encodes a file chunk (leaf of the file DAG) into a dag-pb block.
+    """
+    return _encode_node(EMPTY, NodeType.File, content, len(content))
+
+
+def encode_simple_file(content: ByteView, metadata: Optional[Metadata] = None) -> bytes:
+    return _encode_node(EMPTY, NodeType.File, content, len(content), EMPTY, metadata)
+
+
+def encode_advanced_file(
+    parts: Sequence[FileLink], metadata: Optional[Metadata] = None
+) -> bytes:
+    return _encode_node(
+        parts,
+        NodeType.File,
+        EMPTY_BUFFER,
+        cumulative_content_byte_length(parts),
+        [part.contentByteLength for part in parts],
+        metadata,
+    )
+
+
+def encode_file(node: File) -> bytes:
+    if isinstance(node, SimpleFile):
+        return encode_simple_file(node.content, node.metadata)
+    if isinstance(node, AdvancedFile):
+        return encode_advanced_file(node.parts, node.metadata)
+    raise TypeError(f"unknown file layout {node.layout}")
+
+
+def encode_flat_directory(
+    entries: Sequence[DirectoryEntryLink], metadata: Optional[Metadata] = None
+) -> bytes:
+    links, names = _sort_entries(entries)
+    return _encode_node(
+        links, NodeType.Directory, EMPTY_BUFFER, None, EMPTY, metadata, names
+    )
+
+
+def encode_sharded_directory(
+    bitfield: bytes,
+    fanout: int,
+    hash_type: int,
+    entries: Sequence[DirectoryEntryLink],
+    metadata: Optional[Metadata] = None,
+) -> bytes:
+    links, names = _sort_entries(entries)
+    return _encode_node(
+        links,
+        NodeType.HAMTShard,
+        bitfield,
+        None,
+        EMPTY,
+        metadata,
+        names,
+        hash_type,
+        fanout,
+    )
+
+
+def encode_shard(
+    bitfield: bytes,
+    fanout: int,
+    hash_type: int,
+    names: Sequence[bytes],
+    cids: Sequence[bytes],
+    sizes: Sequence[int],
+    metadata: Optional[Metadata] = None,
+) -> bytes:
+    """
+    Same as `encode_sharded_directory` except links are given as (already
+    sorted) encoded names, encoded CIDs and cumulative sizes of the linked
+    DAGs, which is what HAMT builder holds instead of link objects.
+    """
+    return _encode_links(
+        cids,
+        sizes,
+        NodeType.HAMTShard,
+        bitfield,
+        None,
+        EMPTY,
+        metadata,
+        names,
+        hash_type,
+        fanout,
+    )
+
+
+def encode_directory(node: Directory) -> bytes:
+    if isinstance(node, FlatDirectory):
+        return encode_flat_directory(node.entries, node.metadata)
+    if isinstance(node, ShardedDirectory):
+        return encode_sharded_directory(
+            node.bitfield, node.fanout, node.hashType, node.entries, node.metadata
+        )
+    raise TypeError(f"unknown directory type {node.type}")
+
+
+def _sort_entries(
+    entries: Sequence[DirectoryEntryLink],
+) -> tuple[list[DirectoryEntryLink], list[bytes]]:
+    # dag-pb requires links to be sorted by name bytes.
+    named = sorted(
+        ((entry.name.encode(), entry) for entry in entries), key=lambda item: item[0]
+    )
+    return [entry for _, entry in named], [name for name, _ in named]
+
+
+Node = Union[File, Directory]
+
+
+def decode(data: ByteView) -> Node:
+    """
+    Decodes UnixFS node from the dag-pb block. File chunks (including legacy
+    `Raw` nodes) are decoded as `SimpleFile` and file nodes linking to other
+    nodes as `AdvancedFile`.
+    """
+    links: list[DirectoryEntryLink] = []
+    message: Optional[ByteView] = None
+    for field, value in _read_fields(data):
+        if field == 2 and not isinstance(value, int):
+            links.append(_decode_link(value))
+        elif field == 1 and not isinstance(value, int):
+            message = value
+        else:
+            raise ValueError(f"invalid dag-pb field {field}")
+    if message is None:
+        raise ValueError("dag-pb node has no UnixFS data")
+
+    type: Optional[int] = None
+    content: ByteView = EMPTY_BUFFER
+    blocksizes: list[int] = []
+    hash_type: Optional[int] = None
+    fanout: Optional[int] = None
+    mode: Optional[int] = None
+    mtime: Optional[MTime] = None
+    for field, value in _read_fields(message):
+        if isinstance(value, int):
+            if field == 1:
+                type = value
+            elif field == 4:
+                blocksizes.append(value)
+            elif field == 5:
+                hash_type = value
+            elif field == 6:
+                fanout = value
+            elif field == 7:
+                mode = value
+        elif field == 2:
+            content = value
+        elif field == 4:
+            # Packed encoding of the repeated field.
+            offset = 0
+            while offset < len(value):
+                size, offset = read_varint(value, offset)
+                blocksizes.append(size)
+        elif field == 8:
+            mtime = _decode_mtime(value)
+    metadata = Metadata(mode, mtime) if mode is not None or mtime is not None else None
+
+    if type == NodeType.File.value or type == NodeType.Raw.value:
+        if len(links) == 0:
+            return SimpleFile(content, metadata)
+        if len(content) > 0:
+            raise ValueError("file nodes with both content and links are unsupported")
+        if len(blocksizes) != len(links):
+            raise ValueError("number of file links and block sizes differ")
+        parts = [
+            FileLink(link.cid, link.dagByteLength, size)
+            for link, size in zip(links, blocksizes)
+        ]
+        return AdvancedFile(parts, metadata)
+    if type == NodeType.Directory.value:
+        return FlatDirectory(links, metadata)
+    if type == NodeType.HAMTShard.value:
+        if hash_type is None or fanout is None:
+            raise ValueError("HAMT shard has no hash type or fanout")
+        return ShardedDirectory(bytes(content), fanout, hash_type, links, metadata)
+    raise ValueError(f"unsupported UnixFS node type {type}")
+
+
+def _decode_link(data: ByteView) -> DirectoryEntryLink:
+    cid: Optional[CID] = None
+    name = ""
+    size = 0
+    for field, value in _read_fields(data):
+        if field == 1 and not isinstance(value, int):
+            cid = CID.decode(bytes(value))
+        elif field == 2 and not isinstance(value, int):
+            name = str(value, "utf-8")
+        elif field == 3 and isinstance(value, int):
+            size = value
+        else:
+            raise ValueError(f"invalid dag-pb link field {field}")
+    if cid is None:
+        raise ValueError("dag-pb link has no hash")
+    return DirectoryEntryLink(cid, size, name)
+
+
+def _decode_mtime(data: ByteView) -> MTime:
+    secs = 0
+    nsecs: Optional[int] = None
+    offset = 0
+    while offset < len(data):
+        key, offset = read_varint(data, offset)
+        if key == 0x08:
+            secs, offset = read_varint(data, offset)
+            if secs > UINT64 >> 1:
+                secs -= UINT64 + 1
+        elif key == 0x15:
+            nsecs = int.from_bytes(data[offset : offset + 4], "little")
+            offset += 4
+        else:
+            raise ValueError(f"invalid mtime field {key >> 3}")
+    return MTime(secs, nsecs)
+
+
+def _read_fields(data: ByteView) -> Iterator[tuple[int, Union[int, memoryview]]]:
+    """
+    Reads fields of the protobuf message, which may only be varints or length
+    delimited.
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        key, offset = read_varint(view, offset)
+        wire_type = key & 7
+        if wire_type == 0:
+            value, offset = read_varint(view, offset)
+            yield key >> 3, value
+        elif wire_type == 2:
+            length, offset = read_varint(view, offset)
+            end = offset + length
+            if end > len(view):
+                raise ValueError("unexpected end of data while reading field")
+            yield key >> 3, view[offset:end]
+            offset = end
+        else:
+            raise ValueError(f"unsupported protobuf wire type {wire_type}")
+
+
+def cumulative_content_byte_length(links: Sequence[FileLink]) -> int:
+    length = 0
+    for link in links:
+        length += link.contentByteLength
+    return length
+
+
+def cumulative_dag_byte_length(block: ByteView, links: Sequence[DAGLink]) -> int:
+    length = len(block)
+    for link in links:
+        length += link.dagByteLength
+    return length
+
+
+def _encode_node(
+    links: Sequence[DAGLink],
+    type: NodeType,
+    content: ByteView,
+    filesize: Optional[int],
+    blocksizes: Sequence[int] = EMPTY,
+    metadata: Optional[Metadata] = None,
+    names: Sequence[bytes] = EMPTY,
+    hash_type: Optional[int] = None,
+    fanout: Optional[int] = None,
+) -> bytes:
+    """
+    Encodes UnixFS `Data` message wrapped in a dag-pb `PBNode`. Sizes of all
+    the (nested) messages are computed up front, so that everything except
+    the content is written into a single preallocated buffer, which is then
+    joined with the content into the resulting block.
+
+    Links are named by the corresponding `names` or have an empty name if
+    none are given.
+    """
+    cids = [encode_cid(link.cid) for link in links]
+    sizes = [link.dagByteLength for link in links]
+    return _encode_links(
+        cids,
+        sizes,
+        type,
+        content,
+        filesize,
+        blocksizes,
+        metadata,
+        names,
+        hash_type,
+        fanout,
+    )
+
+
+def _encode_links(
+    cids: Sequence[bytes],
+    sizes: Sequence[int],
+    type: NodeType,
+    content: ByteView,
+    filesize: Optional[int],
+    blocksizes: Sequence[int] = EMPTY,
+    metadata: Optional[Metadata] = None,
+    names: Sequence[bytes] = EMPTY,
+    hash_type: Optional[int] = None,
+    fanout: Optional[int] = None,
+) -> bytes:
+    """
+    Same as `_encode_node` except links are given as encoded CIDs and
+    cumulative sizes of the linked DAGs.
+    """
+    # Sizes of the `PBLink` messages.
+    if len(names) == 0:
+        names = [EMPTY_BUFFER] * len(cids)
+    link_sizes = [
+        _link_size(len(cid), len(name), size)
+        for cid, name, size in zip(cids, names, sizes)
+    ]
+
+    mode = metadata.mode if metadata is not None else None
+    mtime = metadata.mtime if metadata is not None else None
+    # Seconds are int64 so negative values are encoded as two's complement.
+    secs = mtime.secs & UINT64 if mtime is not None else 0
+    nsecs = mtime.nsecs if mtime is not None else None
+    mtime_size = 1 + varint_size(secs) + (5 if nsecs else 0)
+
+    # Empty content is omitted so that empty file encodes the same way as in
+    # go-ipfs.
+    content_size = len(content)
+    data_size = 1 + varint_size(type.value)
+    if content_size > 0:
+        data_size += 1 + varint_size(content_size) + content_size
+    if filesize is not None:
+        data_size += 1 + varint_size(filesize)
+    for block_size in blocksizes:
+        data_size += 1 + varint_size(block_size)
+    if hash_type is not None:
+        data_size += 1 + varint_size(hash_type)
+    if fanout is not None:
+        data_size += 1 + varint_size(fanout)
+    if mode is not None:
+        data_size += 1 + varint_size(mode)
+    if mtime is not None:
+        data_size += 1 + varint_size(mtime_size) + mtime_size
+
+    size = 1 + varint_size(data_size) + data_size
+    for link_size in link_sizes:
+        size += 1 + varint_size(link_size) + link_size
+
+    out = bytearray(size - content_size)
+    offset = 0
+
+    # dag-pb requires links to precede data in the encoded form.
+    for cid, name, dag_size, link_size in zip(cids, names, sizes, link_sizes):
+        out[offset] = 0x12
+        offset = write_varint(out, offset + 1, link_size)
+        out[offset] = 0x0A
+        offset = write_varint(out, offset + 1, len(cid))
+        end = offset + len(cid)
+        out[offset:end] = cid
+        # Name is written even when empty, same as in go-ipfs.
+        out[end] = 0x12
+        offset = write_varint(out, end + 1, len(name))
+        end = offset + len(name)
+        out[offset:end] = name
+        out[end] = 0x18
+        offset = write_varint(out, end + 1, dag_size)
+
+    out[offset] = 0x0A
+    offset = write_varint(out, offset + 1, data_size)
+    out[offset] = 0x08
+    offset = write_varint(out, offset + 1, type.value)
+    if content_size > 0:
+        out[offset] = 0x12
+        offset = write_varint(out, offset + 1, content_size)
+    # Content goes here, rest of the fields are written past it.
+    split = offset
+
+    if filesize is not None:
+        out[offset] = 0x18
+        offset = write_varint(out, offset + 1, filesize)
+    for block_size in blocksizes:
+        out[offset] = 0x20
+        offset = write_varint(out, offset + 1, block_size)
+    if hash_type is not None:
+        out[offset] = 0x28
+        offset = write_varint(out, offset + 1, hash_type)
+    if fanout is not None:
+        out[offset] = 0x30
+        offset = write_varint(out, offset + 1, fanout)
+    if mode is not None:
+        out[offset] = 0x38
+        offset = write_varint(out, offset + 1, mode)
+    if mtime is not None:
+        out[offset] = 0x42
+        offset = write_varint(out, offset + 1, mtime_size)
+        out[offset] = 0x08
+        offset = write_varint(out, offset + 1, secs)
+        if nsecs:
+            out[offset] = 0x15
+            out[offset + 1 : offset + 5] = nsecs.to_bytes(4, "little")
+
+    if content_size == 0:
+        return bytes(out)
+    # Join allocates the block once and copies the content into it directly.
+    view = memoryview(out)
+    return EMPTY_BUFFER.join((view[:split], content, view[split:]))
+
+
+def encode_cid(cid: CID) -> bytes:
+    """
+    Binary representation of the CID, same as `bytes(cid)` but without
+    re-encoding the prefix of every CID.
+    """
+    if cid.version == 0:
+        return cid.digest
+    key = (cid.version, cid.codec.code)
+    prefix = _cid_prefixes.get(key)
+    if prefix is None:
+        out = bytearray(varint_size(key[0]) + varint_size(key[1]))
+        write_varint(out, write_varint(out, 0, key[0]), key[1])
+        prefix = _cid_prefixes[key] = bytes(out)
+    return prefix + cid.digest
+
+
+_cid_prefixes: dict[tuple[int, int], bytes] = {}
+
+
+def _link_size(cid_size: int, name_size: int, dag_byte_length: int) -> int:
+    # Hash, Name and Tsize fields.
+    return (
+        1
+        + varint_size(cid_size)
+        + cid_size
+        + 1
+        + varint_size(name_size)
+        + name_size
+        + 1
+        + varint_size(dag_byte_length)
+    )
+
+
+def varint_size(value: int) -> int:
+    """
+    Number of bytes unsigned varint encoding of the value takes.
+    """
+    return 1 if value < 0x80 else (value.bit_length() + 6) // 7
+
+
+def write_varint(out: bytearray, offset: int, value: int) -> int:
+    """
+    Writes unsigned varint encoding of the value into the buffer at the given
+    offset and returns offset right after it.
+    """
+    while value >= 0x80:
+        out[offset] = (value & 0x7F) | 0x80
+        value >>= 7
+        offset += 1
+    out[offset] = value
+    return offset + 1
+
+
+def read_varint(data: ByteView, offset: int = 0) -> tuple[int, int]:
+    """
+    Reads unsigned varint from the buffer at the given offset and returns its
+    value and offset right after it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("unexpected end of data while reading varint")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
@@ -0,0 +1,8 @@
+from .writer import (
+    DirectoryWriter,
+    Settings,
+    close,
+    create_writer,
+    defaults,
+    set,
+)
@@ -0,0 +1,341 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from struct import Struct
+from tempfile import TemporaryFile
+from typing import IO, Iterable, Iterator, Optional
+from multiformats import CID
+from multiformats.multihash import Multihash
+from ipld_unixfs import codec
+from ipld_unixfs.file.writer import Linker
+from ipld_unixfs.multiformats import murmur3
+from ipld_unixfs.unixfs import Block, BlockWriter, DAGLink, Metadata
+
+HASH_BITS = 64
+"""Number of bits of the `murmur3-x64-64` hash of the entry name."""
+
+DEFAULT_MAX_BUFFERED_ENTRIES = 65536
+
+_HEADER = Struct(">QIIQ")
+"""Hash, name length, CID length and DAG size of the spilled entry."""
+
+
+class Entry:
+    """
+    Directory entry along with the hash of its name. Name and CID are held
+    encoded, which is all that is needed to encode the shard linking to it.
+    """
+
+    __slots__ = ("name", "hash", "cid", "size")
+
+    name: bytes
+    hash: int
+    cid: bytes
+    size: int
+
+    def __init__(self, name: bytes, hash: int, cid: bytes, size: int) -> None:
+        self.name = name
+        self.hash = hash
+        self.cid = cid
+        self.size = size
+
+
+class Run:
+    """
+    Entries spilled into a temporary file sorted by the name hash, along with
+    their hashes so that names can be looked up without reading the file.
+    """
+
+    __slots__ = ("file", "hashes")
+
+    file: IO[bytes]
+    hashes: "array[int]"
+
+    def __init__(self, file: IO[bytes], hashes: "array[int]") -> None:
+        self.file = file
+        self.hashes = hashes
+
+
+class Shard:
+    """
+    Shard that is being filled by the builder. Links are added in the order
+    of slot indexes, which is also the order of their names.
+    """
+
+    __slots__ = ("bitfield", "names", "cids", "sizes")
+
+    bitfield: int
+    names: list[bytes]
+    cids: list[bytes]
+    sizes: list[int]
+
+    def __init__(self) -> None:
+        self.bitfield = 0
+        self.names = []
+        self.cids = []
+        self.sizes = []
+
+
+class HAMT:
+    """
+    State of the HAMT sharded directory. Each shard has `fanout` slots and
+    entries are placed into them by consecutive `log2(fanout)` bit slices of
+    the name hash, starting from the most significant bits, same as in
+    go-ipfs.
+
+    Where an entry ends up depends on all the other entries, so shards are
+    only built on close. Up to `max_buffered_entries` entries are held in
+    memory, past that they are sorted by the name hash and spilled into a
+    temporary file. On close spilled runs are merged and shards are built
+    from the entries in the hash order, which completes shards one after
+    the other, so only shards on the path to the last entry are held in
+    memory.
+    """
+
+    fanout: int
+    bits: int
+    """Number of hash bits consumed by each level of the HAMT."""
+    padding: int
+    """Number of hex digits slot indexes are padded to in link names."""
+    max_buffered_entries: int
+    """Number of entries held in memory, `0` holds all of them."""
+    entries: dict[bytes, Entry]
+    """Entries that were not spilled yet, by name."""
+    runs: list[Run]
+
+    def __init__(
+        self, fanout: int, max_buffered_entries: int = DEFAULT_MAX_BUFFERED_ENTRIES
+    ) -> None:
+        if fanout < 8 or fanout & (fanout - 1) != 0:
+            raise ValueError("fanout must be a power of two and at least 8")
+        self.fanout = fanout
+        self.bits = fanout.bit_length() - 1
+        self.padding = len(f"{fanout - 1:X}")
+        self.max_buffered_entries = max_buffered_entries
+        self.entries = {}
+        self.runs = []
+
+
+def create(
+    fanout: int, max_buffered_entries: int = DEFAULT_MAX_BUFFERED_ENTRIES
+) -> HAMT:
+    return HAMT(fanout, max_buffered_entries)
+
+
+def get(hamt: HAMT, name: str) -> Optional[DAGLink]:
+    key = name.encode()
+    entry = hamt.entries.get(key)
+    if entry is None:
+        hash = murmur3.hash64(key)
+        # Later runs hold more recent entries.
+        for run in reversed(hamt.runs):
+            index = bisect_left(run.hashes, hash)
+            if index < len(run.hashes) and run.hashes[index] == hash:
+                entry = _find(run, key, hash)
+                if entry is not None:
+                    break
+    if entry is None:
+        return None
+    return DAGLink(CID.decode(entry.cid), entry.size)
+
+
+def put(hamt: HAMT, name: str, link: DAGLink) -> None:
+    """
+    Puts the entry into the HAMT, replacing the entry with the same name if
+    there is one.
+    """
+    key = name.encode()
+    cid = codec.encode_cid(link.cid)
+    hamt.entries[key] = Entry(key, murmur3.hash64(key), cid, link.dagByteLength)
+    limit = hamt.max_buffered_entries
+    if limit > 0 and len(hamt.entries) >= limit:
+        _spill(hamt)
+
+
+def close(
+    hamt: HAMT,
+    writer: BlockWriter,
+    hasher: Multihash,
+    linker: Linker,
+    metadata: Optional[Metadata] = None,
+) -> DAGLink:
+    """
+    Encodes all the shards, passing blocks to the `writer` so that nested
+    shards precede shards linking to them, and returns link to the root shard.
+    """
+    try:
+        # Merge keeps entries with the same hash in the order of the runs, so
+        # that the most recent entry of the same name comes last.
+        runs: list[Iterable[Entry]] = [_read(run) for run in hamt.runs]
+        runs.append(sorted(hamt.entries.values(), key=_hash))
+        entries = _unique(heapq.merge(*runs, key=_hash))
+        return _build(hamt, entries, writer, hasher, linker, metadata)
+    finally:
+        for run in hamt.runs:
+            run.file.close()
+        hamt.runs = []
+        hamt.entries = {}
+
+
+def _build(
+    hamt: HAMT,
+    entries: Iterator[Entry],
+    writer: BlockWriter,
+    hasher: Multihash,
+    linker: Linker,
+    metadata: Optional[Metadata],
+) -> DAGLink:
+    """
+    Builds shards from the entries sorted by hash. Entry is placed at the
+    depth of the longest hash prefix (in slices of `bits`) it shares with
+    either of its neighbours. Once next entry shares a shorter prefix, shards
+    deeper than it are complete and are encoded.
+    """
+    # Shards from the root to the one holding the current entry.
+    stack = [Shard()]
+    entry = next(entries, None)
+    shared = 0
+    while entry is not None:
+        following = next(entries, None)
+        remaining = _depth(hamt, entry, following)
+        depth = max(shared, remaining)
+        while len(stack) <= depth:
+            stack.append(Shard())
+        prefix = _prefix(hamt, entry.hash, depth)
+        _add(stack[depth], prefix, entry.name, entry.cid, entry.size)
+
+        while len(stack) > remaining + 1:
+            shard = stack.pop()
+            cid, size = _encode(hamt, shard, writer, hasher, linker, None)
+            prefix = _prefix(hamt, entry.hash, len(stack) - 1)
+            _add(stack[-1], prefix, b"", codec.encode_cid(cid), size)
+
+        entry = following
+        shared = remaining
+
+    cid, size = _encode(hamt, stack[0], writer, hasher, linker, metadata)
+    return DAGLink(cid, size)
+
+
+def _encode(
+    hamt: HAMT,
+    shard: Shard,
+    writer: BlockWriter,
+    hasher: Multihash,
+    linker: Linker,
+    metadata: Optional[Metadata],
+) -> tuple[CID, int]:
+    # Bitfield is encoded as a big-endian integer without leading zero bytes,
+    # same as in go-ipfs.
+    bitfield = shard.bitfield
+    bytes = codec.encode_shard(
+        bitfield.to_bytes((bitfield.bit_length() + 7) // 8, "big"),
+        hamt.fanout,
+        murmur3.code,
+        shard.names,
+        shard.cids,
+        shard.sizes,
+        metadata,
+    )
+    cid = linker.create_link(codec.code, hasher.digest(bytes))
+    writer.write(Block(cid, bytes))
+    return cid, len(bytes) + sum(shard.sizes)
+
+
+def _add(
+    shard: Shard, prefix: tuple[int, bytes], name: bytes, cid: bytes, size: int
+) -> None:
+    index, label = prefix
+    shard.bitfield |= 1 << index
+    shard.names.append(label + name)
+    shard.cids.append(cid)
+    shard.sizes.append(size)
+
+
+def _prefix(hamt: HAMT, hash: int, depth: int) -> tuple[int, bytes]:
+    index = _index(hamt, hash, depth)
+    return index, f"{index:0{hamt.padding}X}".encode()
+
+
+def _depth(hamt: HAMT, entry: Entry, other: Optional[Entry]) -> int:
+    """
+    Depth of the shard both entries end up in, that is number of leading
+    slices of `bits` their hashes have in common.
+    """
+    if other is None:
+        return 0
+    depth = (HASH_BITS - (entry.hash ^ other.hash).bit_length()) // hamt.bits
+    # Raises if hashes are the same past the last complete slice.
+    _index(hamt, entry.hash, depth)
+    return depth
+
+
+def _index(hamt: HAMT, hash: int, depth: int) -> int:
+    shift = HASH_BITS - hamt.bits * (depth + 1)
+    if shift < 0:
+        raise ValueError("HAMT is too deep, name hashes collide")
+    return (hash >> shift) & (hamt.fanout - 1)
+
+
+def _unique(entries: Iterable[Entry]) -> Iterator[Entry]:
+    """
+    Drops entries replaced by later entries of the same name, which are next
+    to each other as they have the same hash.
+    """
+    group: dict[bytes, Entry] = {}
+    hash = -1
+    for entry in entries:
+        if entry.hash != hash:
+            yield from _collision(group)
+            group = {}
+            hash = entry.hash
+        group[entry.name] = entry
+    yield from _collision(group)
+
+
+def _collision(group: dict[bytes, Entry]) -> Iterable[Entry]:
+    if len(group) > 1:
+        raise ValueError("HAMT is too deep, name hashes collide")
+    return group.values()
+
+
+def _hash(entry: Entry) -> int:
+    return entry.hash
+
+
+def _spill(hamt: HAMT) -> None:
+    entries = sorted(hamt.entries.values(), key=_hash)
+    file = TemporaryFile()
+    out = bytearray()
+    for entry in entries:
+        out += _HEADER.pack(entry.hash, len(entry.name), len(entry.cid), entry.size)
+        out += entry.name
+        out += entry.cid
+        if len(out) >= 1 << 20:
+            file.write(out)
+            out.clear()
+    file.write(out)
+    hamt.runs.append(Run(file, array("Q", map(_hash, entries))))
+    hamt.entries = {}
+
+
+def _read(run: Run) -> Iterator[Entry]:
+    file = run.file
+    file.seek(0)
+    size = _HEADER.size
+    while True:
+        header = file.read(size)
+        if len(header) < size:
+            return
+        hash, name_length, cid_length, dag_size = _HEADER.unpack(header)
+        name = file.read(name_length)
+        yield Entry(name, hash, file.read(cid_length), dag_size)
+
+
+def _find(run: Run, name: bytes, hash: int) -> Optional[Entry]:
+    for entry in _read(run):
+        if entry.hash > hash:
+            break
+        if entry.name == name:
+            return entry
+    return None
@@ -0,0 +1,189 @@
+from typing import Optional
+from multiformats import multihash
+from multiformats.multihash import Multihash
+from ipld_unixfs import codec
+import ipld_unixfs.directory.hamt as HAMT
+from ipld_unixfs.file.writer import CIDv1Linker, Linker
+from ipld_unixfs.unixfs import (
+    Block,
+    BlockWriter,
+    DAGLink,
+    DirectoryEntryLink,
+    Metadata,
+)
+
+DEFAULT_SHARDING_THRESHOLD = 256 * 1024
+"""
+Estimated size of the directory block at which directory is sharded, same as
+the `HAMTShardingSize` in go-ipfs.
+"""
+
+DEFAULT_FANOUT = 256
+
+DEFAULT_MAX_BUFFERED_ENTRIES = HAMT.DEFAULT_MAX_BUFFERED_ENTRIES
+
+
+class Settings:
+    hasher: Multihash
+    linker: Linker
+    sharding_threshold: int
+    """
+    Directory is turned into a HAMT once the sum of the entry name and CID
+    lengths reaches this size, `0` disables sharding.
+    """
+    fanout: int
+    max_buffered_entries: int
+    """
+    Number of entries of the sharded directory held in memory, past that they
+    are spilled into temporary files until the directory is closed. `0` holds
+    all the entries in memory.
+    """
+
+    def __init__(
+        self,
+        hasher: Multihash,
+        linker: Linker,
+        sharding_threshold: int = DEFAULT_SHARDING_THRESHOLD,
+        fanout: int = DEFAULT_FANOUT,
+        max_buffered_entries: int = DEFAULT_MAX_BUFFERED_ENTRIES,
+    ) -> None:
+        self.hasher = hasher
+        self.linker = linker
+        self.sharding_threshold = sharding_threshold
+        self.fanout = fanout
+        self.max_buffered_entries = max_buffered_entries
+
+
+def defaults() -> Settings:
+    return Settings(hasher=multihash.get("sha2-256"), linker=CIDv1Linker())
+
+
+class DirectoryWriter:
+    """
+    Writer that builds a UnixFS directory from the entries added to it. Small
+    directories are encoded as a single flat directory block. Once entries
+    would no longer fit a block (as estimated by `sharding_threshold`) the
+    directory is switched to a HAMT sharded directory compatible with
+    go-ipfs. Once closed blocks are passed to the `writer` and the link to
+    the root of the directory is returned.
+
+    Shards are only built on close, as where an entry ends up in the HAMT
+    depends on all the other entries. Until then at most
+    `max_buffered_entries` entries are held in memory and the rest are
+    spilled into temporary files.
+    """
+
+    writer: BlockWriter
+    metadata: Optional[Metadata]
+    settings: Settings
+    entries: dict[str, DAGLink]
+    """Entries of the flat directory, empty once directory is sharded."""
+    estimated_size: int
+    hamt: Optional[HAMT.HAMT]
+    link: Optional[DAGLink]
+    """Link to the root of the directory, set once writer is closed."""
+
+    def __init__(
+        self,
+        writer: BlockWriter,
+        metadata: Optional[Metadata],
+        settings: Settings,
+    ) -> None:
+        self.writer = writer
+        self.metadata = metadata
+        self.settings = settings
+        self.entries = {}
+        self.estimated_size = 0
+        self.hamt = None
+        self.link = None
+
+    def set(
+        self, name: str, link: DAGLink, overwrite: bool = False
+    ) -> "DirectoryWriter":
+        """
+        Adds an entry linking to the given file or directory. Raises if entry
+        with the same name exists, unless `overwrite` is set.
+        """
+        return set(self, name, link, overwrite)
+
+    def close(self) -> DAGLink:
+        """
+        Close the writer, writing all the directory blocks and returning the
+        link to the root of the directory.
+        """
+        return close(self)
+
+
+def create_writer(
+    writer: BlockWriter,
+    metadata: Optional[Metadata] = None,
+    settings: Optional[Settings] = None,
+) -> DirectoryWriter:
+    return DirectoryWriter(
+        writer, metadata, settings if settings is not None else defaults()
+    )
+
+
+def set(
+    view: DirectoryWriter, name: str, link: DAGLink, overwrite: bool = False
+) -> DirectoryWriter:
+    if view.link is not None:
+        raise ValueError("unable to set entry, directory writer is closed")
+    if len(name) == 0:
+        raise ValueError("directory entry name must not be empty")
+
+    hamt = view.hamt
+    if hamt is not None:
+        if not overwrite and HAMT.get(hamt, name) is not None:
+            raise ValueError(f"directory already contains entry named {name!r}")
+        HAMT.put(hamt, name, link)
+        return view
+
+    entries = view.entries
+    previous = entries.get(name)
+    if previous is not None:
+        if not overwrite:
+            raise ValueError(f"directory already contains entry named {name!r}")
+        view.estimated_size -= _estimated_size(name, previous)
+    entries[name] = link
+    view.estimated_size += _estimated_size(name, link)
+
+    settings = view.settings
+    threshold = settings.sharding_threshold
+    if threshold > 0 and view.estimated_size >= threshold:
+        hamt = HAMT.create(settings.fanout, settings.max_buffered_entries)
+        for name, link in entries.items():
+            HAMT.put(hamt, name, link)
+        view.hamt = hamt
+        view.entries = {}
+    return view
+
+
+def close(view: DirectoryWriter) -> DAGLink:
+    if view.link is not None:
+        return view.link
+
+    settings = view.settings
+    if view.hamt is not None:
+        link = HAMT.close(
+            view.hamt, view.writer, settings.hasher, settings.linker, view.metadata
+        )
+    else:
+        links = [
+            DirectoryEntryLink(link.cid, link.dagByteLength, name)
+            for name, link in view.entries.items()
+        ]
+        bytes = codec.encode_flat_directory(links, view.metadata)
+        cid = settings.linker.create_link(codec.code, settings.hasher.digest(bytes))
+        view.writer.write(Block(cid, bytes))
+        link = DAGLink(cid, codec.cumulative_dag_byte_length(bytes, links))
+
+    view.entries = {}
+    view.hamt = None
+    view.link = link
+    return link
+
+
+def _estimated_size(name: str, link: DAGLink) -> int:
+    # Same estimate as go-ipfs uses, which ignores the rest of the link fields.
+    return len(name.encode()) + len(codec.encode_cid(link.cid))
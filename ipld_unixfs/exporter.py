@@ -0,0 +1,124 @@
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Iterator, Optional
+from multiformats import CID
+from ipld_unixfs import codec
+from ipld_unixfs.unixfs import AdvancedFile, BlockGetter, ByteView, SimpleFile
+
+RAW_CODE = 0x55
+DEFAULT_PREFETCH = 16
+
+
+class _Pending:
+    """
+    Node of the file DAG that is yet to be read, along with the range of its
+    content to read and the block being fetched for it if it was prefetched.
+    """
+
+    __slots__ = ("cid", "start", "end", "block")
+
+    cid: CID
+    start: int
+    end: Optional[int]
+    """End of the range (exclusive), `None` to read to the end of the node."""
+    block: Optional["Future[ByteView]"]
+
+    def __init__(self, cid: CID, start: int = 0, end: Optional[int] = None) -> None:
+        self.cid = cid
+        self.start = start
+        self.end = end
+        self.block = None
+
+
+def read_file(
+    blocks: BlockGetter,
+    cid: CID,
+    prefetch: int = DEFAULT_PREFETCH,
+    executor: Optional[Executor] = None,
+    offset: int = 0,
+    length: Optional[int] = None,
+) -> Iterator[ByteView]:
+    """
+    Reads content of the file with the given root CID, yielding it in order a
+    leaf at a time (views of the leaf blocks, without copying).
+
+    Only `length` bytes (or the rest of the file if `None`) starting at the
+    `offset` are read. Content sizes of the links are used to only descend into
+    the subtrees overlapping the range, so the number of blocks read for a
+    range is proportional to the depth of the DAG plus leaves in the range.
+
+    File DAG is walked depth first and nodes are fetched from `blocks` as they
+    are needed. If `executor` is provided the `prefetch` upcoming nodes (known
+    from the branches read so far) are fetched by it ahead of time. Blocks
+    prefetched before the branch preceding them was read stay in memory until
+    they are read, so at most `prefetch` blocks are held per level of the DAG.
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be positive")
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError("offset and length must not be negative")
+    if length == 0:
+        return
+
+    # Nodes that are yet to be read in the order they are read.
+    queue = deque([_Pending(cid, offset, None if length is None else offset + length)])
+    while len(queue) > 0:
+        if executor is not None:
+            _prefetch(blocks, queue, prefetch, executor)
+        node = queue.popleft()
+        block = blocks.get(node.cid) if node.block is None else node.block.result()
+
+        if node.cid.codec.code == RAW_CODE:
+            content = _slice(block, node.start, node.end)
+            if len(content) > 0:
+                yield content
+            continue
+
+        file = codec.decode(block)
+        if isinstance(file, SimpleFile):
+            content = _slice(file.content, node.start, node.end)
+            if len(content) > 0:
+                yield content
+        elif isinstance(file, AdvancedFile):
+            # Children are read before the nodes that follow this one.
+            queue.extendleft(reversed(_overlapping(file, node.start, node.end)))
+        else:
+            raise ValueError(f"{node.cid} is not a UnixFS file")
+
+
+def _overlapping(file: AdvancedFile, start: int, end: Optional[int]) -> list[_Pending]:
+    """
+    Parts of the file overlapping the range, along with the range relative to
+    each part.
+    """
+    parts = []
+    part_start = 0
+    for part in file.parts:
+        part_end = part_start + part.contentByteLength
+        if end is not None and part_start >= end:
+            break
+        if part_end > start:
+            parts.append(
+                _Pending(
+                    part.cid,
+                    max(start - part_start, 0),
+                    None if end is None or end >= part_end else end - part_start,
+                )
+            )
+        part_start = part_end
+    return parts
+
+
+def _slice(content: ByteView, start: int, end: Optional[int]) -> ByteView:
+    if start == 0 and (end is None or end >= len(content)):
+        return content
+    return memoryview(content)[start:end]
+
+
+def _prefetch(
+    blocks: BlockGetter, queue: "deque[_Pending]", prefetch: int, executor: Executor
+) -> None:
+    for index in range(min(prefetch, len(queue))):
+        node = queue[index]
+        if node.block is None:
+            node.block = executor.submit(blocks.get, node.cid)
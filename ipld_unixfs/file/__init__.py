@@ -0,0 +1,17 @@
+from .aio import AsyncFileWriter, create_async_writer
+from .dedup import DedupCache, create_cache
+from .writer import (
+    FileWriter,
+    Settings,
+    UnixFSFile,
+    UnixFSLeaf,
+    UnixFSRawLeaf,
+    close,
+    create_writer,
+    defaults,
+    encode_branch,
+    encode_leaf,
+    flush,
+    write,
+)
+from .mapped import write_file
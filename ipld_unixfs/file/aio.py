@@ -0,0 +1,191 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Generic, Optional, Union
+from ipld_unixfs.file.layout.api import Layout
+from ipld_unixfs.file.writer import FileWriter, Settings, defaults
+from ipld_unixfs.unixfs import Block, FileLink, Metadata
+
+DEFAULT_MAX_QUEUED_BLOCKS = 16
+
+DEFAULT_WRITE_SIZE = 65536
+"""
+Size of the pieces bytes are passed to the file writer in when it runs on the
+event loop, blocks produced by a piece are queued before the next one.
+"""
+
+
+class _Blocks:
+    """
+    Block writer collecting blocks produced by a piece of a write, so that they
+    can be handed over to the asynchronous queue. When file writer runs on the
+    executor blocks are put into the `queue` directly instead, waiting for the
+    consumer when it is full.
+    """
+
+    blocks: list[Block]
+    queue: "Optional[asyncio.Queue[Optional[Block]]]"
+    loop: Optional[asyncio.AbstractEventLoop]
+
+    def __init__(self) -> None:
+        self.blocks = []
+        self.queue = None
+        self.loop = None
+
+    def write(self, block: Block) -> None:
+        if self.queue is not None and self.loop is not None:
+            put = asyncio.run_coroutine_threadsafe(self.queue.put(block), self.loop)
+            put.result()
+        else:
+            self.blocks.append(block)
+
+    def take(self) -> list[Block]:
+        blocks = self.blocks
+        self.blocks = []
+        return blocks
+
+
+class AsyncFileWriter(Generic[Layout]):
+    """
+    Asynchronous counterpart of the `FileWriter`. Encoded blocks are put into
+    a bounded queue that consumer reads from via `blocks()`. Once the queue
+    is full `write` and `close` suspend until the consumer catches up, so
+    that bytes are not buffered beyond `max_queued_blocks` blocks.
+
+    Chunking, encoding and hashing run on the event loop unless `executor`
+    is provided, in which case they run on it. On the event loop bytes are
+    chunked in pieces of `write_size`, so that large writes also do not get
+    ahead of the consumer.
+    """
+
+    writer: FileWriter[Layout]
+    sink: _Blocks
+    queue: "Optional[asyncio.Queue[Optional[Block]]]"
+    """
+    Encoded blocks, followed by `None` once writer is closed. Queue is created
+    on first use, so that it is bound to the loop writer is used from.
+    """
+    max_queued_blocks: int
+    executor: Optional[Executor]
+    write_size: int
+    link: Optional[FileLink]
+    """Link to the root of the file, set once writer is closed."""
+
+    def __init__(
+        self,
+        metadata: Optional[Metadata],
+        settings: Settings[Layout],
+        max_queued_blocks: int = DEFAULT_MAX_QUEUED_BLOCKS,
+        executor: Optional[Executor] = None,
+        write_size: int = DEFAULT_WRITE_SIZE,
+    ) -> None:
+        self.sink = _Blocks()
+        self.writer = FileWriter(self.sink, metadata, settings)
+        self.queue = None
+        self.max_queued_blocks = max_queued_blocks
+        self.executor = executor
+        self.write_size = write_size
+        self.link = None
+
+    async def write(
+        self, bytes: Union[bytes, bytearray, memoryview]
+    ) -> "AsyncFileWriter[Layout]":
+        """
+        Write bytes into the file. Passed bytes are not copied, so caller MUST
+        not mutate them after they were written.
+        """
+        return await write(self, bytes)
+
+    async def close(self) -> FileLink:
+        """
+        Close the writer, flushing all the remaining blocks and returning the
+        link to the root of the file DAG.
+        """
+        return await close(self)
+
+    def blocks(self) -> AsyncIterator[Block]:
+        """
+        Iterate over encoded blocks until the writer is closed. Blocks must be
+        consumed for the writes to make progress.
+        """
+        return blocks(self)
+
+
+def create_async_writer(
+    metadata: Optional[Metadata] = None,
+    settings: Optional[Settings[Any]] = None,
+    max_queued_blocks: int = DEFAULT_MAX_QUEUED_BLOCKS,
+    executor: Optional[Executor] = None,
+    write_size: int = DEFAULT_WRITE_SIZE,
+) -> AsyncFileWriter[Any]:
+    return AsyncFileWriter(
+        metadata,
+        settings if settings is not None else defaults(),
+        max_queued_blocks,
+        executor,
+        write_size,
+    )
+
+
+async def write(
+    view: AsyncFileWriter[Layout], bytes: Union[bytes, bytearray, memoryview]
+) -> AsyncFileWriter[Layout]:
+    if view.link is not None:
+        raise ValueError("unable to write, file writer is closed")
+
+    queue = _queue(view)
+    if view.executor is None:
+        data = memoryview(bytes)
+        for offset in range(0, len(data), view.write_size):
+            view.writer.write(data[offset : offset + view.write_size])
+            await _flush(view, queue)
+    else:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(view.executor, view.writer.write, bytes)
+    return view
+
+
+async def close(view: AsyncFileWriter[Layout]) -> FileLink:
+    if view.link is not None:
+        return view.link
+
+    queue = _queue(view)
+    if view.executor is None:
+        link = view.writer.close()
+    else:
+        loop = asyncio.get_running_loop()
+        link = await loop.run_in_executor(view.executor, view.writer.close)
+    await _flush(view, queue)
+    await queue.put(None)
+    view.link = link
+    return link
+
+
+async def blocks(view: AsyncFileWriter[Layout]) -> AsyncIterator[Block]:
+    queue = _queue(view)
+    while True:
+        block = await queue.get()
+        if block is None:
+            # Leave the end marker for other readers.
+            queue.put_nowait(None)
+            return
+        yield block
+
+
+def _queue(view: AsyncFileWriter[Layout]) -> "asyncio.Queue[Optional[Block]]":
+    # Must be called from a coroutine, as prior to Python 3.10 queue is bound
+    # to the event loop current when it is created.
+    queue = view.queue
+    if queue is None:
+        queue = asyncio.Queue(view.max_queued_blocks)
+        view.queue = queue
+        if view.executor is not None:
+            view.sink.queue = queue
+            view.sink.loop = asyncio.get_running_loop()
+    return queue
+
+
+async def _flush(
+    view: AsyncFileWriter[Layout], queue: "asyncio.Queue[Optional[Block]]"
+) -> None:
+    for block in view.sink.take():
+        await queue.put(block)
@@ -0,0 +1,214 @@
+"""
+Checkpoints of the file writer state, which allow resuming an interrupted
+import without re-reading or re-hashing content that was already written.
+"""
+
+from array import array
+from typing import Optional
+from multiformats import CID
+from ipld_unixfs import codec
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.api import Chunk, StatelessChunker
+from ipld_unixfs.file.chunker.buffer import BufferView
+import ipld_unixfs.file.layout.balanced as Balanced
+from ipld_unixfs.file.layout.api import NODE_ID_TYPECODE, NodeID
+from ipld_unixfs.file.writer import FileWriter, Settings, defaults, flush
+from ipld_unixfs.unixfs import BlockWriter, ByteView, FileLink, Metadata
+
+MAGIC = b"UFSW"
+VERSION = 2
+
+
+def checkpoint(view: FileWriter[Balanced.Balanced]) -> bytes:
+    """
+    Encodes state of the writer into a checkpoint. All the blocks the writer
+    produced so far are passed to the block writer first, so checkpoint is
+    valid once the block writer has committed those blocks.
+
+    Checkpoint holds content that was written but not yet chunked (less than
+    a chunk), links to the nodes that are not yet linked from a branch and
+    the balanced layout state, which is proportional to the layout width and
+    depth rather than the file size.
+    """
+    if view.link is not None:
+        raise ValueError("unable to checkpoint, file writer is closed")
+    layout = view.layout
+    if not isinstance(layout, Balanced.Balanced):
+        raise TypeError("only balanced layout state can be checkpointed")
+    chunker = view.settings.chunker
+    if not isinstance(chunker, StatelessChunker):
+        raise TypeError("only stateless chunker state can be checkpointed")
+    flush(view)
+
+    out = bytearray(MAGIC)
+    _write_uint(out, VERSION)
+    _write_bytes(out, chunker.name.encode())
+    parameters = _parameters(view.settings)
+    _write_uint(out, len(parameters))
+    for parameter in parameters:
+        _write_uint(out, parameter)
+    _write_uint(out, layout.width)
+    _write_uint(out, layout.last_id)
+    if layout.head is None:
+        _write_uint(out, 0)
+    else:
+        _write_uint(out, 1)
+        _write_bytes(out, _copy(layout.head))
+    _write_ids(out, layout.leaf_index)
+    _write_uint(out, len(layout.node_index))
+    for row in layout.node_index:
+        _write_ids(out, row)
+    _write_uint(out, len(view.nodes))
+    for id, link in view.nodes.items():
+        _write_uint(out, id)
+        _write_bytes(out, codec.encode_cid(link.cid))
+        _write_uint(out, link.dagByteLength)
+        _write_uint(out, link.contentByteLength)
+    _write_bytes(out, _copy(view.chunker.buffer))
+    return bytes(out)
+
+
+def resume(
+    data: ByteView,
+    writer: BlockWriter,
+    metadata: Optional[Metadata] = None,
+    settings: Optional[Settings[Balanced.Balanced]] = None,
+) -> FileWriter[Balanced.Balanced]:
+    """
+    Creates a file writer from the checkpoint, which continues writing the
+    file from `byte_length` of the content. Settings need to be the same as
+    the ones of the checkpointed writer.
+    """
+    if settings is None:
+        settings = defaults()
+    reader = _Reader(data)
+    if reader.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a file writer checkpoint")
+    version = reader.uint()
+    if version != VERSION:
+        raise ValueError(f"unsupported checkpoint version {version}")
+    name = str(reader.read_bytes(), "utf-8")
+    if name != settings.chunker.name:
+        raise ValueError(f"checkpoint was made with {name} chunker")
+    parameters = [reader.uint() for _ in range(reader.uint())]
+    if parameters != _parameters(settings):
+        raise ValueError("checkpoint was made with different settings")
+    width = reader.uint()
+    file_layout = settings.file_layout
+    if not isinstance(file_layout, Balanced.BalancedLayout):
+        raise TypeError("checkpoint can only be resumed with balanced layout")
+    if file_layout.width != width:
+        raise ValueError(f"checkpoint was made with layout of width {width}")
+
+    last_id = reader.uint()
+    head = _view(reader.read_bytes()) if reader.uint() == 1 else None
+    leaf_index = reader.ids()
+    node_index = [reader.ids() for _ in range(reader.uint())]
+    nodes: dict[NodeID, FileLink] = {}
+    for _ in range(reader.uint()):
+        id = reader.uint()
+        cid = CID.decode(reader.read_bytes())
+        nodes[id] = FileLink(cid, reader.uint(), reader.uint())
+    buffer = reader.read_bytes()
+    if reader.offset != len(reader.data):
+        raise ValueError("unexpected data past the end of the checkpoint")
+
+    view = FileWriter(writer, metadata, settings)
+    view.layout = Balanced.Balanced(width, head, leaf_index, node_index, last_id)
+    view.nodes = nodes
+    view.chunker = Chunker.State(settings.chunker, _view(buffer), [])
+    return view
+
+
+def byte_length(view: FileWriter[Balanced.Balanced]) -> int:
+    """
+    Number of bytes of content written into the writer, that is offset in
+    the content the writer resumed from a checkpoint expects next. Leaves
+    being encoded by the executor are flushed first.
+    """
+    flush(view)
+    length = view.chunker.buffer.byte_length
+    for link in view.nodes.values():
+        length += link.contentByteLength
+    head = view.layout.head
+    if head is not None:
+        length += head.byte_length
+    return length
+
+
+def _parameters(settings: Settings[Balanced.Balanced]) -> list[int]:
+    """
+    Settings that blocks depend on, that is integer fields of the chunker
+    context, codecs of the encoders, hasher and the version of the CIDs.
+    """
+    context = settings.chunker.context
+    fields = vars(context).values() if hasattr(context, "__dict__") else [context]
+    parameters = [field for field in fields if isinstance(field, int)]
+    parameters.append(settings.file_chunk_encoder.code)
+    parameters.append(settings.small_file_encoder.code)
+    parameters.append(settings.file_encoder.code)
+    parameters.append(settings.hasher.code)
+    digest = settings.hasher.digest(b"")
+    link = settings.linker.create_link(settings.file_encoder.code, digest)
+    parameters.append(link.version)
+    return parameters
+
+
+def _copy(chunk: Chunk) -> bytes:
+    return bytes(chunk.copy_to(memoryview(bytearray(chunk.byte_length)), 0))
+
+
+def _view(data: bytes) -> BufferView:
+    return BufferView.create([memoryview(data)]) if len(data) > 0 else BufferView()
+
+
+def _write_uint(out: bytearray, value: int) -> None:
+    offset = len(out)
+    out.extend(bytes(codec.varint_size(value)))
+    codec.write_varint(out, offset, value)
+
+
+def _write_bytes(out: bytearray, data: bytes) -> None:
+    _write_uint(out, len(data))
+    out.extend(data)
+
+
+def _write_ids(out: bytearray, ids: "array[NodeID]") -> None:
+    # Ids are increasing so they are encoded as deltas to keep them small.
+    _write_uint(out, len(ids))
+    previous = 0
+    for id in ids:
+        _write_uint(out, id - previous)
+        previous = id
+
+
+class _Reader:
+    data: ByteView
+    offset: int
+
+    def __init__(self, data: ByteView) -> None:
+        self.data = data
+        self.offset = 0
+
+    def read(self, length: int) -> bytes:
+        end = self.offset + length
+        if end > len(self.data):
+            raise ValueError("unexpected end of the checkpoint")
+        data = bytes(self.data[self.offset : end])
+        self.offset = end
+        return data
+
+    def uint(self) -> int:
+        value, self.offset = codec.read_varint(self.data, self.offset)
+        return value
+
+    def read_bytes(self) -> bytes:
+        return self.read(self.uint())
+
+    def ids(self) -> "array[NodeID]":
+        ids = array(NODE_ID_TYPECODE)
+        previous = 0
+        for _ in range(self.uint()):
+            previous += self.uint()
+            ids.append(previous)
+        return ids
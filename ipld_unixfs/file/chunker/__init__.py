@@ -1,6 +1,7 @@
 from typing import Generic, Sequence, TypeVar
 from .api import Chunk, Chunker, ChunkerBase, StatefulChunker, StatelessChunker
 from .buffer import BufferView
+from . import buffer as Buffer
 
 T = TypeVar("T")
 
@@ -9,13 +10,23 @@ class State(Generic[T]):
     chunker: Chunker[T]
     buffer: BufferView
     chunks: Sequence[Chunk]
+    scanned: int
+    """
+    Number of bytes from the start of the `buffer` that were already searched
+    for a chunk boundary.
+    """
 
     def __init__(
-        self, chunker: Chunker[T], buffer: BufferView, chunks: Sequence[Chunk]
+        self,
+        chunker: Chunker[T],
+        buffer: BufferView,
+        chunks: Sequence[Chunk],
+        scanned: int = 0,
     ) -> None:
         self.buffer = buffer
         self.chunker = chunker
         self.chunks = chunks
+        self.scanned = scanned
 
 
 def open(chunker: Chunker[T]) -> State[T]:
@@ -24,25 +35,25 @@ def open(chunker: Chunker[T]) -> State[T]:
 
 def write(state: State[T], buf: memoryview) -> State[T]:
     if len(buf) > 0:
-        return split(state.chunker, state.buffer, False)
+        buffer = state.buffer.extend(buf)
+        return split(state.chunker, buffer, False, state.scanned)
     else:
-        return State(state.chunker, state.buffer, [])
+        return State(state.chunker, state.buffer, [], state.scanned)
 
 
 def close(state: State[T]) -> State[T]:
-    return split(state.chunker, state.buffer, True)
-
-
-def split(chunker: Chunker[T], buffer: BufferView, end: bool) -> State[T]:
-    chunks: list[Chunk] = []
-
-    offset = 0
-    for size in chunker.cut(chunker.context, buffer, end):
-        # We may be splitting empty buffer in which case there will be no chunks
-        # in it so we make sure that we do not emit empty buffer.
-        if size > 0:
-            chunk = buffer[offset : offset + size]
-            chunks.append(chunk)
-            offset += size
-
-    return State(chunker, buffer[offset:], chunks)
+    return split(state.chunker, state.buffer, True, state.scanned)
+
+
+def split(
+    chunker: Chunker[T], buffer: BufferView, end: bool, scanned: int = 0
+) -> State[T]:
+    # We may be splitting empty buffer in which case there will be no chunks
+    # in it, `Buffer.split` skips empty sizes so we do not emit empty buffer.
+    # Remainder only references segments that were not fully consumed, so
+    # input buffers are released as soon as chunks are done with them.
+    # Bytes that were searched without finding a boundary are carried over so
+    # that they are not searched again when more bytes are written.
+    sizes, scanned = chunker.cut_from(chunker.context, buffer, end, scanned)
+    chunks, rest = Buffer.split(buffer, sizes)
+    return State(chunker, rest, chunks, scanned)
@@ -57,6 +57,20 @@ class ChunkerBase(Generic[T]):
         """
         pass
 
+    def cut_from(
+        self, context: T, buffer: Chunk, end: bool, scanned: int
+    ) -> tuple[Sequence[int], int]:
+        """
+        Same as `cut` except the caller also passes the number of `scanned`
+        bytes from the start of the buffer that previous call searched without
+        finding a boundary, so that chunker can skip them when more bytes are
+        written. Returns chunk byte lengths along with the number of bytes of
+        the remainder that were searched.
+
+        Default implementation searches the whole buffer on every call.
+        """
+        return self.cut(context, buffer, end), 0
+
 
 class StatefulChunker(ChunkerBase[T]):
     """
@@ -1,20 +1,31 @@
-from typing import Any, Generator, Protocol, overload
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Generator, Iterable, Optional, Protocol, overload
 from typing_extensions import Self
 
+EMPTY_BYTES = b""
+
 
 class BufferSlice(Protocol):
     segments: list[memoryview]
+    offsets: list[int]
     byte_offset: int
     byte_length: int
 
 
 class BufferView:
     segments: list[memoryview]
+    offsets: list[int]
+    """
+    Offsets at which each of the segments ends, used to locate a segment for
+    the given index with a binary search.
+    """
     byte_offset: int
     byte_length: int
 
     def __init__(self) -> None:
         self.segments = []
+        self.offsets = []
         self.byte_offset = 0
         self.byte_length = 0
 
@@ -23,11 +34,10 @@ class BufferView:
         """
         Create a new BufferView from the passed segments.
         """
-        self = cls()
-        self.segments = segments
-        self.byte_offset = byte_offset
-        self.byte_length = total_byte_length(segments)
-        return self
+        offsets = end_offsets(segments)
+        return cls._create(
+            segments, byte_offset, offsets[-1] if offsets else 0, offsets
+        )
 
     @classmethod
     def _create(
@@ -35,9 +45,11 @@ class BufferView:
         segments: list[memoryview],
         byte_offset: int,
         byte_length: int,
+        offsets: Optional[list[int]] = None,
     ) -> Self:
         self = cls()
         self.segments = segments
+        self.offsets = offsets if offsets is not None else end_offsets(segments)
         self.byte_offset = byte_offset
         self.byte_length = byte_length
         return self
@@ -68,7 +80,10 @@ class BufferView:
             yield from segment
 
     def __len__(self) -> int:
-        return total_byte_length(self.segments)
+        return self.byte_length
+
+    def __bytes__(self) -> bytes:
+        return tobytes(self)
 
     def copy_to(self, target: memoryview, offset: int = 0) -> memoryview:
         """
@@ -76,6 +91,20 @@ class BufferView:
         """
         return copy_to(self, target, offset)
 
+    def tobytes(self) -> bytes:
+        """
+        Copy buffer content into a single contiguous `bytes`.
+        """
+        return tobytes(self)
+
+    def as_memoryview(self) -> memoryview:
+        """
+        Contiguous view of the buffer content. When the buffer consists of a
+        single segment it is returned without copying, otherwise segments are
+        copied into a new buffer.
+        """
+        return as_memoryview(self)
+
     def extend(self, bytes: memoryview) -> Self:
         """
         Add the specified bytes to the end of the buffer.
@@ -88,26 +117,37 @@ class BufferView:
 
 def copy_to(buffer: BufferView, target: memoryview, offset: int = 0) -> memoryview:
     for segment in buffer.segments:
-        for i in range(len(segment)):
-            target[offset + i] = segment[i]
-        offset += len(segment)
+        end = offset + len(segment)
+        target[offset:end] = segment
+        offset = end
 
     return target
 
 
+def tobytes(buffer: BufferSlice) -> bytes:
+    segments = buffer.segments
+    if len(segments) == 1:
+        return bytes(segments[0])
+    # Join allocates result once and copies each segment into it.
+    return EMPTY_BYTES.join(segments)
+
+
+def as_memoryview(buffer: BufferSlice) -> memoryview:
+    segments = buffer.segments
+    if len(segments) == 1:
+        return memoryview(segments[0])
+    return memoryview(EMPTY_BYTES.join(segments))
+
+
 def get(buffer: BufferSlice, index: int) -> int:
-    if index >= buffer.byte_length or index <= -buffer.byte_length:
+    if index >= buffer.byte_length or index < -buffer.byte_length:
         raise IndexError("index out of range")
     if index < 0:
         index = buffer.byte_length + index
 
-    offset = 0
-    for segment in buffer.segments:
-        if index < offset + len(segment):
-            return segment[index - offset]
-        offset += len(segment)
-
-    raise Exception("did not find index in segments")
+    offsets = buffer.offsets
+    n = bisect_right(offsets, index)
+    return buffer.segments[n][index - offsets[n - 1] if n > 0 else index]
 
 
 def extend(buffer: BufferSlice, bytes: memoryview) -> BufferView:
@@ -120,13 +160,15 @@ def extend(buffer: BufferSlice, bytes: memoryview) -> BufferView:
             buffer
             if isinstance(buffer, BufferView)
             else BufferView._create(
-                buffer.segments, buffer.byte_offset, buffer.byte_length
+                buffer.segments, buffer.byte_offset, buffer.byte_length, buffer.offsets
             )
         )
+    byte_length = buffer.byte_length + len(bytes)
     view = BufferView._create(
-        list(buffer.segments), buffer.byte_offset, buffer.byte_length + len(bytes)
+        list(buffer.segments), buffer.byte_offset, byte_length, list(buffer.offsets)
     )
     view.segments.append(bytes)
+    view.offsets.append(byte_length)
     return view
 
 
@@ -135,71 +177,100 @@ def slice_(buffer: BufferSlice, bounds: slice) -> BufferView:
     Zero copy slice of a buffer. Creates a new BufferView referencing the shared
     segments.
     """
-    segments: list[memoryview] = []
-    start_offset = bounds.start if bounds.start is not None else 0
-    end_offset = bounds.stop if bounds.stop is not None else buffer.byte_length
-    start = start_offset if start_offset >= 0 else buffer.byte_length - start_offset
-    end = end_offset if end_offset >= 0 else buffer.byte_length - end_offset
+    start, end, _ = bounds.indices(buffer.byte_length)
 
     # If start at 0 offset and end is past buffer range it is effectively
     # as same buffer.
-    if start == 0 and end >= buffer.byte_length:
+    if start == 0 and end == buffer.byte_length:
         return (
             buffer
             if isinstance(buffer, BufferView)
             else BufferView._create(
-                buffer.segments, buffer.byte_offset, buffer.byte_length
+                buffer.segments, buffer.byte_offset, buffer.byte_length, buffer.offsets
             )
         )
 
     # If range is not within the current buffer just create an empty slice.
-    if start > end or start > buffer.byte_length or end <= 0:
+    if start >= end:
         return BufferView()
 
-    byte_length = 0
-    offset = 0
-    for segment in buffer.segments:
-        next_offset = offset + len(segment)
-        # Have not found a start yet
-        if byte_length == 0:
-            # If end offset is within the current segment we know start is also,
-            # because it preceeds the end & we had not found start yet.
-            # In such case we create a view with only single segment of bytes
-            # in the range.
-            if end <= next_offset:
-                range_ = segment[start - offset : end - offset]
-                segments.append(range_)
-                byte_length = len(range_)
-                break
-
-            # If start offeset falls with in current range (but not the end)
-            # we save matching buffer slice and update byteLength.
-            elif start < next_offset:
-                range_ = segment if start == offset else segment[start - offset :]
-                segments.append(range_)
-                byte_length = len(range_)
-
-        # Otherwise we already started collecting matching segments and are
-        # looking for the end of the slice. If it is with in the current range
-        # capture the segment and create a view.
-        elif end <= next_offset:
-            range = segment if end == next_offset else segment[0 : end - offset]
-            segments.append(range)
-            byte_length += len(range)
-            break
-
-        # If end is past current range we just save the segment and continue.
-        else:
-            segments.append(segment)
-            byte_length += len(segment)
-
-        offset = next_offset
-
-    return BufferView._create(segments, buffer.byte_offset + start, byte_length)
+    segments = buffer.segments
+    offsets = buffer.offsets
+    # Binary search segments holding the first and the last byte of the slice.
+    first = bisect_right(offsets, start)
+    last = bisect_left(offsets, end)
+    first_offset = offsets[first - 1] if first > 0 else 0
+
+    # If the slice is within a single segment we create a view with only
+    # single segment of bytes in the range.
+    if first == last:
+        range_ = segments[first][start - first_offset : end - first_offset]
+        return BufferView._create(
+            [range_], buffer.byte_offset + start, end - start, [end - start]
+        )
+
+    head = segments[first]
+    slices = [head if start == first_offset else head[start - first_offset :]]
+    slices.extend(segments[first + 1 : last])
+    tail = segments[last]
+    slices.append(tail if end == offsets[last] else tail[: end - offsets[last - 1]])
+
+    return BufferView._create(slices, buffer.byte_offset + start, end - start)
+
+
+def split(
+    buffer: BufferSlice, sizes: Iterable[int]
+) -> tuple[list[BufferView], BufferView]:
+    """
+    Zero copy split of a buffer into consecutive slices of the given sizes
+    (from the start of the buffer) and the remainder. Unlike repeated
+    `slice_` calls segments are walked only once, and segments fully consumed
+    by the slices are not referenced by the remainder.
+    """
+    segments = buffer.segments
+    chunks: list[BufferView] = []
+    # Index of the segment and the offset within it where next slice starts.
+    index = 0
+    position = 0
+    byte_offset = buffer.byte_offset
+    byte_length = buffer.byte_length
+
+    for size in sizes:
+        if size <= 0:
+            continue
+        if size > byte_length:
+            raise ValueError("slice size exceeds buffer byte length")
+
+        chunk: list[memoryview] = []
+        remaining = size
+        while remaining > 0:
+            segment = segments[index]
+            available = len(segment) - position
+            if remaining < available:
+                chunk.append(segment[position : position + remaining])
+                position += remaining
+                remaining = 0
+            else:
+                if available > 0:
+                    chunk.append(segment if position == 0 else segment[position:])
+                remaining -= available
+                index += 1
+                position = 0
+
+        chunks.append(BufferView._create(chunk, byte_offset, size))
+        byte_offset += size
+        byte_length -= size
+
+    rest = segments[index:]
+    if position > 0:
+        rest[0] = rest[0][position:]
+
+    return chunks, BufferView._create(rest, byte_offset, byte_length)
 
 
 def total_byte_length(segments: list[memoryview]) -> int:
-    byte_length = 0
-    for segment in segments:
-        byte_length += len(segment)
-    return byte_length
+    return sum(map(len, segments))
+
+
+def end_offsets(segments: list[memoryview]) -> list[int]:
+    return list(accumulate(map(len, segments)))
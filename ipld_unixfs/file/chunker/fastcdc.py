@@ -0,0 +1,264 @@
+from hashlib import sha256
+from typing import Optional
+from ipld_unixfs.file.chunker.api import Chunk, StatelessChunker
+from ipld_unixfs.file.chunker.buffer import BufferView
+
+default_avg_chunk_size = 262144
+default_normalization = 1
+
+FINGERPRINT_BITS = 32
+"""Width of the gear fingerprint."""
+
+GEAR = [int.from_bytes(sha256(bytes([b])).digest()[:4], "big") for b in range(256)]
+"""
+Gear table mapping bytes to random fingerprint values. Values are derived from
+SHA-256 of the byte so they can be reproduced by other implementations.
+"""
+
+SCAN_BLOCK_SIZE = 65536
+"""
+Number of bytes fingerprinted at once when looking for a boundary. Smaller
+blocks waste less work past the boundary, larger ones have less overhead.
+"""
+
+_SLOT_SIZE = 5
+"""
+Bytes per fingerprint when computing them in bulk, extra byte over the
+fingerprint width absorbs carries so that they do not spill into the next one.
+"""
+_SLOT_BITS = _SLOT_SIZE * 8
+
+_LANES = [bytes((value >> (8 * n)) & 0xFF for value in GEAR) for n in range(4)]
+"""Bytes of the `GEAR` values in the form usable with `bytes.translate`."""
+
+
+class FastCDCContext:
+    """
+    Configuration of the FastCDC chunker along with the masks derived from it.
+
+    Chunk boundary is placed before the byte at which gear fingerprint of the
+    bytes past `min_chunk_size` has all the mask bits unset. Before reaching
+    `avg_chunk_size` mask with `normalization` more bits is used and past it
+    mask with `normalization` fewer bits is used, which concentrates chunk
+    sizes around the average. Chunks are cut at `max_chunk_size` if no
+    boundary is found before.
+    """
+
+    min_chunk_size: int
+    avg_chunk_size: int
+    max_chunk_size: int
+    normalization: int
+
+    mask_s: int
+    """Mask used for chunks smaller than the average size."""
+    mask_l: int
+    """Mask used for chunks larger than the average size."""
+    candidates: bytes
+    """
+    Translation table mapping most significant byte of the fingerprint to
+    zero if it has none of the `mask_l` bits set. Since `mask_s` has all the
+    bits of `mask_l` only bytes mapped to zero can be boundaries.
+    """
+
+    def __init__(
+        self,
+        min_chunk_size: int,
+        avg_chunk_size: int,
+        max_chunk_size: int,
+        normalization: int = default_normalization,
+    ) -> None:
+        if not 0 < min_chunk_size <= avg_chunk_size <= max_chunk_size:
+            raise ValueError("chunk sizes must satisfy 0 < min <= avg <= max")
+
+        bits = avg_chunk_size.bit_length() - 1
+        if normalization < 0 or bits - normalization < 1:
+            raise ValueError("normalization level is too high for the chunk size")
+        if bits + normalization > FINGERPRINT_BITS:
+            raise ValueError("average chunk size is too large")
+
+        self.min_chunk_size = min_chunk_size
+        self.avg_chunk_size = avg_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.normalization = normalization
+        # Most significant bits of the fingerprint depend on the most bytes, so
+        # those are used for masks.
+        self.mask_s = _top_bits(bits + normalization)
+        self.mask_l = _top_bits(bits - normalization)
+        top = self.mask_l >> (FINGERPRINT_BITS - 8)
+        self.candidates = bytes(0 if b & top == 0 else 1 for b in range(256))
+
+
+class FastCDCChunker(StatelessChunker[FastCDCContext]):
+    """
+    Content defined chunker implementing FastCDC with normalized chunking.
+    """
+
+    name = "fastcdc"
+    type = "Stateless"
+
+    def __init__(
+        self,
+        avg_chunk_size: int = default_avg_chunk_size,
+        min_chunk_size: Optional[int] = None,
+        max_chunk_size: Optional[int] = None,
+        normalization: int = default_normalization,
+    ) -> None:
+        if min_chunk_size is None:
+            min_chunk_size = avg_chunk_size // 4
+        if max_chunk_size is None:
+            max_chunk_size = avg_chunk_size * 4
+        self.context = FastCDCContext(
+            min_chunk_size, avg_chunk_size, max_chunk_size, normalization
+        )
+
+    def cut(
+        self, context: FastCDCContext, buffer: Chunk, end: bool = False
+    ) -> list[int]:
+        return cut(context, _bytes(buffer), end)
+
+    def cut_from(
+        self, context: FastCDCContext, buffer: Chunk, end: bool, scanned: int
+    ) -> tuple[list[int], int]:
+        # Bytes preceding the first unsearched byte by more than the
+        # fingerprint width do not affect fingerprints left to compute, so
+        # they are not copied out of the buffer.
+        first = max(context.min_chunk_size, scanned)
+        offset = min(max(0, first - FINGERPRINT_BITS + 1), buffer.byte_length)
+        return scan(context, _bytes(buffer, offset), end, offset, scanned)
+
+
+def cut(context: FastCDCContext, data: bytes, end: bool = False) -> list[int]:
+    chunks, _ = scan(context, data, end)
+    return chunks
+
+
+def scan(
+    context: FastCDCContext,
+    data: bytes,
+    end: bool = False,
+    offset: int = 0,
+    scanned: int = 0,
+) -> tuple[list[int], int]:
+    """
+    Cuts the buffer of which `data` holds the bytes past the `offset`, skipping
+    `scanned` bytes known to have no boundary. Returns chunk sizes and number
+    of bytes of the remainder that were searched.
+    """
+    chunks: list[int] = []
+    length = offset + len(data)
+    start = 0
+    while length - start > context.min_chunk_size:
+        size = boundary(context, data, start, scanned, offset)
+        scanned = 0
+        if size < 0:
+            if length - start >= context.max_chunk_size:
+                size = context.max_chunk_size
+            else:
+                scanned = length - start
+                break
+        chunks.append(size)
+        start += size
+
+    if end and start < length:
+        chunks.append(length - start)
+        scanned = 0
+    return chunks, scanned
+
+
+def boundary(
+    context: FastCDCContext,
+    data: bytes,
+    start: int,
+    scanned: int = 0,
+    offset: int = 0,
+) -> int:
+    """
+    Finds the size of the chunk starting at `start` offset. Returns `-1` if
+    there is no boundary before max chunk size or the end of data. Search
+    begins past `scanned` bytes of the chunk if they were searched already,
+    and `data` may omit `offset` bytes preceding the bytes needed for it.
+
+    Fingerprint is `fp = (fp << 1) + GEAR[byte]`, which rather than being
+    rolled over every byte is computed for a block of bytes at once. `GEAR`
+    values are laid out in fixed width slots of a big integer with
+    `bytes.translate` and then `fp` for every slot is obtained by adding the
+    integer shifted by 1, 2, 4, 8 and 16 slots (and multiplied by matching
+    power of two). Only slots where most significant byte of the fingerprint
+    has no mask bits set are checked.
+    """
+    begin = start + context.min_chunk_size
+    normal = start + context.avg_chunk_size
+    last = min(start + context.max_chunk_size, offset + len(data))
+    mask_s = context.mask_s
+    mask_l = context.mask_l
+
+    first = max(begin, start + scanned)
+    while first < last:
+        stop = min(first + SCAN_BLOCK_SIZE, last)
+        # Include bytes preceding the block that still affect the fingerprint.
+        base = max(begin, first - FINGERPRINT_BITS + 1)
+        fingerprints = _fingerprints(data[base - offset : stop - offset])
+        skip = first - base
+        size = stop - base
+
+        # Most significant byte of every fingerprint within the block.
+        tops = fingerprints[skip * _SLOT_SIZE + 3 : size * _SLOT_SIZE : _SLOT_SIZE]
+        tops = tops.translate(context.candidates)
+        index = tops.find(0)
+        while index >= 0:
+            slot = (skip + index) * _SLOT_SIZE
+            fingerprint = int.from_bytes(fingerprints[slot : slot + 4], "little")
+            position = first + index
+            mask = mask_s if position < normal else mask_l
+            if fingerprint & mask == 0:
+                return position - start
+            index = tops.find(0, index + 1)
+
+        first = stop
+
+    return -1
+
+
+def _fingerprints(data: bytes) -> bytes:
+    count = len(data)
+    slots = bytearray(count * _SLOT_SIZE)
+    for n, lane in enumerate(_LANES):
+        slots[n::_SLOT_SIZE] = data.translate(lane)
+
+    value = int.from_bytes(slots, "little")
+    shift = 1
+    while shift < FINGERPRINT_BITS:
+        # Slots are masked before shifting so that only bits that remain
+        # within fingerprint width are added.
+        bits = FINGERPRINT_BITS - shift
+        value += (value & _slot_mask(count, bits)) << (shift * _SLOT_BITS + shift)
+        shift *= 2
+
+    # Sums spill over past the last slot, which we do not care about.
+    return value.to_bytes((count + FINGERPRINT_BITS) * _SLOT_SIZE, "little")
+
+
+_slot_masks: dict[tuple[int, int], int] = {}
+
+
+def _slot_mask(count: int, bits: int) -> int:
+    key = (count, bits)
+    mask = _slot_masks.get(key)
+    if mask is None:
+        if len(_slot_masks) > 64:
+            _slot_masks.clear()
+        slot = ((1 << bits) - 1).to_bytes(_SLOT_SIZE, "little")
+        mask = int.from_bytes(slot * count, "little")
+        _slot_masks[key] = mask
+    return mask
+
+
+def _top_bits(count: int) -> int:
+    return ((1 << count) - 1) << (FINGERPRINT_BITS - count)
+
+
+def _bytes(buffer: Chunk, offset: int = 0) -> bytes:
+    if isinstance(buffer, BufferView):
+        return buffer[offset:].tobytes()
+    data = bytes(buffer.copy_to(memoryview(bytearray(buffer.byte_length)), 0))
+    return data[offset:]
@@ -0,0 +1,222 @@
+from typing import Optional
+from ipld_unixfs.file.chunker.api import Chunk, StatelessChunker
+from ipld_unixfs.file.chunker.buffer import BufferView
+
+default_avg_chunk_size = 262144
+default_window_size = 16
+default_polynomial = 17437180132763653
+"""Irreducible polynomial used by the go-ipfs rabin chunker."""
+
+SCAN_BLOCK_SIZE = 65536
+"""
+Number of bytes fingerprinted at once when looking for a boundary. Smaller
+blocks waste less work past the boundary, larger ones have less overhead.
+"""
+
+
+class RabinContext:
+    """
+    Configuration of the rabin chunker along with the lookup tables derived
+    from it.
+
+    Chunk boundaries are placed (same as in go-ipfs) after the byte at which
+    rabin fingerprint of the last `window_size` bytes has `bits` least
+    significant bits unset, as long as chunk is at least `min_chunk_size` long.
+    Chunks are cut at `max_chunk_size` if no boundary is found before.
+    """
+
+    min_chunk_size: int
+    max_chunk_size: int
+    bits: int
+    window_size: int
+    polynomial: int
+
+    mask: int
+    tables: list[list[int]]
+    """
+    Fingerprint contribution of a byte depending on its position in the window,
+    `tables[j][b]` is `b * x^(8 * j) mod polynomial` where `j` is the distance
+    from the last byte in the window.
+    """
+    lanes: list[bytes]
+    """
+    Least significant byte of the masked `tables` in the form usable with
+    `bytes.translate`.
+    """
+
+    def __init__(
+        self,
+        min_chunk_size: int,
+        max_chunk_size: int,
+        bits: int,
+        window_size: int = default_window_size,
+        polynomial: int = default_polynomial,
+    ) -> None:
+        if window_size <= 0:
+            raise ValueError("window size must be positive")
+        if min_chunk_size < window_size:
+            raise ValueError("min chunk size can not be smaller than window size")
+        if max_chunk_size < min_chunk_size:
+            raise ValueError("max chunk size can not be smaller than min chunk size")
+
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.bits = bits
+        self.window_size = window_size
+        self.polynomial = polynomial
+        self.mask = (1 << bits) - 1
+        self.tables = []
+        self.lanes = []
+        for j in range(window_size):
+            table = [_mod(b << (8 * j), polynomial) for b in range(256)]
+            self.tables.append(table)
+            self.lanes.append(bytes(value & self.mask & 0xFF for value in table))
+
+
+class RabinChunker(StatelessChunker[RabinContext]):
+    """
+    Content defined chunker compatible with the go-ipfs `rabin` chunker.
+    """
+
+    name = "rabin"
+    type = "Stateless"
+
+    def __init__(
+        self,
+        avg_chunk_size: int = default_avg_chunk_size,
+        min_chunk_size: Optional[int] = None,
+        max_chunk_size: Optional[int] = None,
+        window_size: int = default_window_size,
+        polynomial: int = default_polynomial,
+    ) -> None:
+        # Same defaults as go-ipfs uses for `rabin-{avg}` chunker.
+        if min_chunk_size is None:
+            min_chunk_size = avg_chunk_size // 3
+        if max_chunk_size is None:
+            max_chunk_size = avg_chunk_size + avg_chunk_size // 2
+        self.context = RabinContext(
+            min_chunk_size,
+            max_chunk_size,
+            avg_chunk_size.bit_length() - 1,
+            window_size,
+            polynomial,
+        )
+
+    def cut(self, context: RabinContext, buffer: Chunk, end: bool = False) -> list[int]:
+        return cut(context, _bytes(buffer), end)
+
+    def cut_from(
+        self, context: RabinContext, buffer: Chunk, end: bool, scanned: int
+    ) -> tuple[list[int], int]:
+        # Bytes preceding the first unsearched byte by more than the window
+        # do not affect any fingerprint left to compute, so they are not
+        # copied out of the buffer.
+        first = max(context.min_chunk_size - 1, scanned)
+        offset = min(max(0, first - context.window_size + 1), buffer.byte_length)
+        return scan(context, _bytes(buffer, offset), end, offset, scanned)
+
+
+def cut(context: RabinContext, data: bytes, end: bool = False) -> list[int]:
+    chunks, _ = scan(context, data, end)
+    return chunks
+
+
+def scan(
+    context: RabinContext,
+    data: bytes,
+    end: bool = False,
+    offset: int = 0,
+    scanned: int = 0,
+) -> tuple[list[int], int]:
+    """
+    Cuts the buffer of which `data` holds the bytes past the `offset`, skipping
+    `scanned` bytes known to have no boundary. Returns chunk sizes and number
+    of bytes of the remainder that were searched.
+    """
+    chunks: list[int] = []
+    length = offset + len(data)
+    start = 0
+    while length - start >= context.min_chunk_size:
+        limit = start + context.max_chunk_size
+        first = max(start + context.min_chunk_size - 1, start + scanned)
+        last = min(limit - 1, length)
+        scanned = 0
+        # Chunk is cut at max chunk size even if there is no boundary before.
+        position = boundary(context, data, first - offset, last - offset)
+        if position >= 0:
+            position += offset
+        elif limit <= length:
+            position = limit
+        else:
+            scanned = length - start
+            break
+        chunks.append(position - start)
+        start = position
+
+    if end and start < length:
+        chunks.append(length - start)
+        scanned = 0
+    return chunks, scanned
+
+
+def boundary(context: RabinContext, data: bytes, first: int, last: int) -> int:
+    """
+    Finds the first byte in the `[first, last)` range after which chunk
+    boundary is placed. Returns offset right after that byte (end of the chunk)
+    or `-1` if there is no boundary in the range.
+
+    Instead of rolling the fingerprint over every byte this computes the least
+    significant byte of the fingerprint for a block of bytes at once. Every
+    window table is applied over the block (shifted by the position in the
+    window) with `bytes.translate` and results are XOR-ed as big integers. Only
+    bytes where result is zero can be boundaries, which are then verified by
+    computing complete fingerprint.
+    """
+    window = context.window_size
+    lanes = context.lanes
+    tables = context.tables
+    mask = context.mask
+
+    while first < last:
+        stop = min(first + SCAN_BLOCK_SIZE, last)
+        # Block is extended to include the window of the first byte.
+        region = data[first - window + 1 : stop]
+        size = stop - first
+
+        fingerprints = 0
+        for j, lane in enumerate(lanes):
+            start = window - 1 - j
+            lane_bytes = region[start : start + size].translate(lane)
+            fingerprints ^= int.from_bytes(lane_bytes, "big")
+        lows = fingerprints.to_bytes(size, "big")
+
+        index = lows.find(0)
+        while index >= 0:
+            position = first + index
+            fingerprint = 0
+            for j in range(window):
+                fingerprint ^= tables[j][data[position - j]]
+            if fingerprint & mask == 0:
+                return position + 1
+            index = lows.find(0, index + 1)
+
+        first = stop
+
+    return -1
+
+
+def _bytes(buffer: Chunk, offset: int = 0) -> bytes:
+    if isinstance(buffer, BufferView):
+        return buffer[offset:].tobytes()
+    data = bytes(buffer.copy_to(memoryview(bytearray(buffer.byte_length)), 0))
+    return data[offset:]
+
+
+def _mod(value: int, polynomial: int) -> int:
+    """
+    Remainder of the division of polynomials over GF(2).
+    """
+    degree = polynomial.bit_length()
+    while value.bit_length() >= degree:
+        value ^= polynomial << (value.bit_length() - degree)
+    return value
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Protocol
+from multiformats import CID
+from ipld_unixfs.unixfs import Block, BlockWriter, FileLink
+
+DEFAULT_MAX_ENTRIES = 1 << 20
+
+Key = tuple[int, bytes]
+"""Code of the leaf encoder and multihash of the chunk content."""
+
+
+class BlockIndex(Protocol):
+    """
+    Anything that can tell whether block is already stored, e.g. a block
+    store.
+    """
+
+    def has(self, cid: CID) -> bool: ...
+
+
+class DedupCache:
+    """
+    Bounded cache of the leaves that were already written, shared across file
+    writers so that leaves repeating within or across files are written only
+    once. Leaves are keyed by the hash of the chunk content (and the leaf
+    encoder), so that chunks seen before are neither encoded nor hashed
+    again. Writers sharing a cache are expected to use the same hasher and
+    CID version.
+
+    Up to `max_entries` most recently seen leaves are remembered. If `store`
+    is provided leaves it already has are not written either.
+    """
+
+    max_entries: int
+    store: Optional[BlockIndex]
+    entries: "OrderedDict[Key, FileLink]"
+    hits: int
+    """Number of leaves that were not written as they were seen before."""
+    misses: int
+    """Number of leaves that were written."""
+    lock: Lock
+    """Cache is looked up from the executor threads encoding leaves."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        store: Optional[BlockIndex] = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max entries must be positive")
+        self.max_entries = max_entries
+        self.store = store
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(self, key: Key) -> Optional[FileLink]:
+        """
+        Returns link to the leaf of the chunk with the given key if it was
+        already written.
+        """
+        return get(self, key)
+
+    def write(
+        self, writer: BlockWriter, key: Key, block: Block, link: FileLink
+    ) -> None:
+        """
+        Writes the leaf block unless it was already written or the store has
+        it, and records it once written.
+        """
+        write(self, writer, key, block, link)
+
+
+def create_cache(
+    max_entries: int = DEFAULT_MAX_ENTRIES, store: Optional[BlockIndex] = None
+) -> DedupCache:
+    return DedupCache(max_entries, store)
+
+
+def get(cache: DedupCache, key: Key) -> Optional[FileLink]:
+    with cache.lock:
+        link = cache.entries.get(key)
+        if link is not None:
+            cache.entries.move_to_end(key)
+            cache.hits += 1
+        return link
+
+
+def write(
+    cache: DedupCache, writer: BlockWriter, key: Key, block: Block, link: FileLink
+) -> None:
+    # Same chunk may have been written while this one was being encoded.
+    if get(cache, key) is not None:
+        return
+    if cache.store is not None and cache.store.has(block.cid):
+        with cache.lock:
+            cache.hits += 1
+    else:
+        writer.write(block)
+        with cache.lock:
+            cache.misses += 1
+
+    # Leaf is only recorded once written, so that it is written again if the
+    # writer fails.
+    with cache.lock:
+        entries = cache.entries
+        entries[key] = link
+        if len(entries) > cache.max_entries:
+            entries.popitem(last=False)
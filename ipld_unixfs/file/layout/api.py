@@ -1,23 +1,48 @@
+from array import array
 from dataclasses import dataclass
 from typing import Generic, Literal, Optional, Protocol, Sequence, TypeVar, Union
 from ipld_unixfs.multiformats.codecs.api import BlockEncoder
 from ipld_unixfs.file.chunker.api import Chunk
-from ipld_unixfs.unixfs import Metadata, File
+from ipld_unixfs.unixfs import ByteView, Metadata, File
 
 Layout = TypeVar("Layout")
 
 NodeID = int
 
+NODE_ID_TYPECODE = "Q"
+"""Typecode of the arrays holding node ids."""
+
 
 @dataclass
 class Branch:
+    """
+    Branch node of the file layout. Children are stored in an unsigned 64-bit
+    array (other sequences are copied into one) so that many nodes can be held
+    on to without boxing each child id.
+    """
+
+    __slots__ = ("id", "children", "metadata")
+
     id: NodeID
-    children: Sequence[NodeID]
+    children: "array[NodeID]"
     metadata: Optional[Metadata]
 
+    def __init__(
+        self, id: NodeID, children: Sequence[NodeID], metadata: Optional[Metadata]
+    ) -> None:
+        self.id = id
+        self.children = (
+            children
+            if isinstance(children, array) and children.typecode == NODE_ID_TYPECODE
+            else array(NODE_ID_TYPECODE, children)
+        )
+        self.metadata = metadata
+
 
 @dataclass
 class Leaf:
+    __slots__ = ("id", "content", "metadata")
+
     id: NodeID
     content: Optional[Chunk]
     metadata: Optional[Metadata]
@@ -43,7 +68,7 @@ class CloseResult:
 PB = Literal[0x70]
 RAW = Literal[0x55]
 
-FileChunkEncoder = Union[BlockEncoder[PB, bytes], BlockEncoder[RAW, bytes]]
+FileChunkEncoder = Union[BlockEncoder[PB, ByteView], BlockEncoder[RAW, ByteView]]
 
 
 class FileEncoder(Protocol):
@@ -60,7 +85,8 @@ class LayoutEngine(Protocol, Generic[Layout]):
         specific state.
 
         Please note it is important that builder does not mutate any state
-        outside of returned state object as order of calls is non deterministic.
+        outside of the layout state object as order of calls is non
+        deterministic.
         """
         ...
 
@@ -73,6 +99,11 @@ class LayoutEngine(Protocol, Generic[Layout]):
         Layout engine implementation is responsible for returning new layout
         along with all the leaf and branch nodes it created as a result.
 
+        Ownership of the passed `layout` passes to the call, that is layout
+        engine may update it in place and return it as the new layout (which
+        balanced layout does to keep per leaf work independent of the file
+        size). Caller must not use the passed layout after the call.
+
         Note: Layout engine should not hold reference to chunks or nodes to
         avoid unecessary memory use.
         """
@@ -82,6 +113,6 @@ class LayoutEngine(Protocol, Generic[Layout]):
         """
         After importer wrote all the chunks through `write` calls it will call
         `close` so that layout engine can produce all the remaining nodes along
-        with a root.
+        with a root. Same as with `write` the passed `layout` may be updated.
         """
         ...
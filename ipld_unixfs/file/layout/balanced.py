@@ -1,3 +1,4 @@
+from array import array
 from dataclasses import dataclass
 from typing import Optional, Sequence
 from ipld_unixfs.file.chunker.api import Chunk
@@ -6,6 +7,8 @@ from ipld_unixfs.file.layout.api import (
     CloseResult,
     LayoutEngine,
     Leaf,
+    NODE_ID_TYPECODE,
+    NodeID,
     WriteResult,
 )
 from ipld_unixfs.unixfs import Metadata
@@ -99,26 +102,33 @@ class Balanced:
       ]
     }
     ```
+
+    Rows are held in unsigned 64-bit arrays so that state of the layout takes
+    a few bytes per pending node.
     """
 
+    __slots__ = ("width", "head", "leaf_index", "node_index", "last_id")
+
     width: int
     head: Optional[Chunk]
-    leaf_index: Sequence[int]
-    node_index: Sequence[Sequence[int]]
+    leaf_index: "array[NodeID]"
+    node_index: "list[array[NodeID]]"
     last_id: int
 
     def __init__(
         self,
         width: int,
         head: Optional[Chunk] = None,
-        leaf_index: Sequence[int] = [],
-        node_index: Sequence[Sequence[int]] = [],
+        leaf_index: "Optional[array[NodeID]]" = None,
+        node_index: "Optional[list[array[NodeID]]]" = None,
         last_id: int = 0,
     ):
         self.width = width
         self.head = head
-        self.leaf_index = leaf_index
-        self.node_index = node_index
+        self.leaf_index = (
+            leaf_index if leaf_index is not None else array(NODE_ID_TYPECODE)
+        )
+        self.node_index = node_index if node_index is not None else []
         self.last_id = last_id
 
 
@@ -157,16 +167,19 @@ def open(width: int = defaults.width) -> Balanced:
 
 
 def write(layout: Balanced, chunks: Sequence[Chunk]) -> WriteResult[Balanced]:
+    """
+    Adds leaves for the chunks returning nodes that were completed. Note that
+    the passed `layout` is updated in place and returned as the new layout, so
+    that work done per leaf does not depend on the size of the tree. Passed
+    `layout` should not be used after the call.
+    """
     if len(chunks) == 0:
         return WriteResult(layout, EMPTY, EMPTY)
 
-    last_id = layout.last_id
-
     # We need to hold on to the first chunk until we either get a second chunk
     # (at which point we know our layout will have branches) or until we close
     # (at which point our layout will be single leaf or node depneding on
     # metadata)
-    head: Optional[Chunk] = None
     slices: list[Chunk] = []
 
     if layout.head is not None:
@@ -174,96 +187,86 @@ def write(layout: Balanced, chunks: Sequence[Chunk]) -> WriteResult[Balanced]:
         # chunks weren't empty) so we process head along with other chunks.
         slices.append(layout.head)
         slices.extend(chunks)
+        layout.head = None
     elif len(chunks) == 1 and len(layout.leaf_index) == 0:
         # If we have no head no leaves and got only one chunk we have to save it
         # until we can decide what to do with it.
-        head = chunks[0]
+        layout.head = chunks[0]
+        return WriteResult(layout, EMPTY, EMPTY)
     else:
         # Otherwise we have no head but got enough chunks to know we'll have a
         # node.
         slices.extend(chunks)
 
-    if len(slices) == 0:
-        return WriteResult(
-            Balanced(
-                layout.width,
-                head,
-                layout.leaf_index,
-                layout.node_index,
-                layout.last_id,
-            ),
-            EMPTY,
-            EMPTY,
-        )
-
-    leaf_index: list[int] = []
-    leaf_index.extend(layout.leaf_index)
+    leaf_index = layout.leaf_index
     leaves = []
-
+    last_id = layout.last_id
     for chunk in slices:
         last_id += 1
         leaf = Leaf(last_id, chunk, None)
         leaves.append(leaf)
         leaf_index.append(leaf.id)
+    layout.last_id = last_id
 
     if len(leaf_index) > layout.width:
-        return flush(
-            Balanced(layout.width, head, leaf_index, layout.node_index, last_id),
-            leaves,
-        )
-
-    return WriteResult(
-        Balanced(layout.width, head, leaf_index, layout.node_index, last_id),
-        EMPTY,
-        leaves,
-    )
-
+        return flush(layout, leaves)
 
-def _grow(index: list[list[int]], length: int) -> None:
-    while len(index) < length:
-        index.append([])
+    return WriteResult(layout, EMPTY, leaves)
 
 
 def flush(
     state: Balanced,
-    leaves: Sequence[Leaf] = [],
-    nodes: Sequence[Branch] = [],
+    leaves: Sequence[Leaf] = EMPTY,
+    nodes: Sequence[Branch] = EMPTY,
     close: bool = False,
 ) -> WriteResult[Balanced]:
-    last_id = state.last_id
-    node_index: list[list[int]] = []
-    for row in state.node_index:
-        node_index.append(list(row))
-    leaf_index = list(state.leaf_index)
+    """
+    Moves leaves and nodes from the rows that overflow into new nodes in the
+    row above. When closing, all the rows but the top one are moved up. Passed
+    `state` is updated in place.
+    """
     width = state.width
+    leaf_index = state.leaf_index
+    node_index = state.node_index
+    last_id = state.last_id
     nodes = list(nodes)
 
     # Move leaves into nodes
+    built = 0
     while len(leaf_index) > width or (len(leaf_index) > 0 and close):
-        _grow(node_index, 1)
+        if len(node_index) == 0:
+            node_index.append(array(NODE_ID_TYPECODE))
         last_id += 1
         node = Branch(last_id, leaf_index[0:width], None)
-        leaf_index = leaf_index[width:]
+        del leaf_index[0:width]
         node_index[0].append(node.id)
         nodes.append(node)
+        built += 1
 
     depth = 0
     while depth < len(node_index):
         row = node_index[depth]
         depth += 1
-
-        while len(row) > width or (len(row) > 0 and depth < len(node_index)):
+        # Rows only grow when a row below overflows, so unless closing there
+        # is nothing to do past the first row that did not get new nodes.
+        if built == 0 and not close:
+            break
+        built = 0
+
+        # Nodes are moved into the next row once row overflows or, when closing,
+        # whenever there is a row above (only top row can be left unbalanced).
+        while len(row) > width or (len(row) > 0 and close and depth < len(node_index)):
             last_id += 1
             node = Branch(last_id, row[0:width], None)
-            row = row[width:]
-            _grow(node_index, depth + 1)
+            del row[0:width]
+            if len(node_index) == depth:
+                node_index.append(array(NODE_ID_TYPECODE))
+            node_index[depth].append(node.id)
             nodes.append(node)
+            built += 1
 
-    return WriteResult(
-        Balanced(state.width, state.head, leaf_index, node_index, last_id),
-        nodes,
-        leaves,
-    )
+    state.last_id = last_id
+    return WriteResult(state, nodes, leaves)
 
 
 def close(layout: Balanced, metadata: Optional[Metadata] = None) -> CloseResult:
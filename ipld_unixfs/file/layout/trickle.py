@@ -0,0 +1,192 @@
+from array import array
+from dataclasses import dataclass
+from typing import Optional, Sequence
+from ipld_unixfs.file.chunker.api import Chunk
+from ipld_unixfs.file.layout.api import (
+    Branch,
+    CloseResult,
+    LayoutEngine,
+    Leaf,
+    NODE_ID_TYPECODE,
+    NodeID,
+    WriteResult,
+)
+from ipld_unixfs.unixfs import Metadata
+
+EMPTY = ()
+
+
+@dataclass(frozen=True)
+class Options:
+    max_direct_leaves: int
+    """Max number of leaves linked from each node."""
+    layer_repeat: int
+    """Number of subtrees of each depth linked from a node."""
+
+
+defaults = Options(174, 4)
+
+
+class Frame:
+    """
+    Node of the trickle DAG that is being filled. Node first links up to
+    `max_direct_leaves` leaves followed by `layer_repeat` subtrees of depth 1,
+    then `layer_repeat` subtrees of depth 2 and so on up to (but not
+    including) `max_depth`.
+    """
+
+    __slots__ = ("max_depth", "children", "leaves", "depth", "repeat")
+
+    max_depth: int
+    """Depth of the subtree this node is a root of, `-1` for unbounded."""
+    children: "array[NodeID]"
+    leaves: int
+    """Number of leaves linked directly."""
+    depth: int
+    """Depth of the subtree that will be added next."""
+    repeat: int
+    """Number of subtrees of the `depth` that were added."""
+
+    def __init__(self, max_depth: int) -> None:
+        self.max_depth = max_depth
+        self.children = array(NODE_ID_TYPECODE)
+        self.leaves = 0
+        self.depth = 1
+        self.repeat = 0
+
+
+class Trickle:
+    """
+    State of the trickle DAG builder. It holds a stack of nodes that are being
+    filled, from the root to the node that next leaf will be linked from.
+    Nodes are emitted as soon as they are complete, so only the nodes on the
+    stack (at most one per depth) are held in memory.
+
+    Trickle DAG is laid out the same way as by go-ipfs: every node links to
+    `max_direct_leaves` leaves and then `layer_repeat` subtrees of increasing
+    depth. This allows reading the start of the file with a shallow traversal.
+    """
+
+    options: Options
+    stack: list[Frame]
+    last_id: int
+
+    def __init__(
+        self,
+        options: Options,
+        stack: Optional[list[Frame]] = None,
+        last_id: int = 0,
+    ):
+        self.options = options
+        self.stack = stack if stack is not None else [Frame(-1)]
+        self.last_id = last_id
+
+
+class TrickleLayout(LayoutEngine[Trickle]):
+    options: Options
+
+    def __init__(self, options: Options = defaults):
+        self.options = options
+
+    def open(self) -> Trickle:
+        return open(self.options)
+
+    def write(self, layout: Trickle, chunks: Sequence[Chunk]) -> WriteResult[Trickle]:
+        return write(layout, chunks)
+
+    def close(
+        self, layout: Trickle, metadata: Optional[Metadata] = None
+    ) -> CloseResult:
+        return close(layout, metadata)
+
+
+def with_options(options: Options = defaults) -> LayoutEngine[Trickle]:
+    return TrickleLayout(options)
+
+
+def open(options: Options = defaults) -> Trickle:
+    return Trickle(options)
+
+
+def write(layout: Trickle, chunks: Sequence[Chunk]) -> WriteResult[Trickle]:
+    """
+    Adds leaves for the chunks returning new layout and nodes that were
+    completed. Unlike balanced layout every leaf is linked from a node, even if
+    file has a single leaf, same as in go-ipfs.
+    """
+    if len(chunks) == 0:
+        return WriteResult(layout, EMPTY, EMPTY)
+
+    layout = _copy(layout)
+    leaves = []
+    nodes: list[Branch] = []
+    for chunk in chunks:
+        layout.last_id += 1
+        leaf = Leaf(layout.last_id, chunk, None)
+        leaves.append(leaf)
+        _add_leaf(layout, leaf.id, nodes)
+
+    return WriteResult(layout, nodes, leaves)
+
+
+def close(layout: Trickle, metadata: Optional[Metadata] = None) -> CloseResult:
+    if layout.last_id == 0:
+        return CloseResult(Leaf(1, None, metadata), EMPTY, EMPTY)
+
+    # Complete all the nodes on the stack from the deepest one up to the root.
+    layout = _copy(layout)
+    nodes: list[Branch] = []
+    stack = layout.stack
+    while len(stack) > 1:
+        _complete(layout, nodes)
+
+    layout.last_id += 1
+    root = Branch(layout.last_id, stack[0].children, metadata)
+    return CloseResult(root, nodes, EMPTY)
+
+
+def _copy(layout: Trickle) -> Trickle:
+    # Stack holds at most a node per depth, so copying it is cheap and leaves
+    # the passed layout intact.
+    stack = []
+    for frame in layout.stack:
+        copy = Frame(frame.max_depth)
+        copy.children = array(NODE_ID_TYPECODE, frame.children)
+        copy.leaves = frame.leaves
+        copy.depth = frame.depth
+        copy.repeat = frame.repeat
+        stack.append(copy)
+    return Trickle(layout.options, stack, layout.last_id)
+
+
+def _add_leaf(layout: Trickle, id: NodeID, nodes: list[Branch]) -> None:
+    options = layout.options
+    stack = layout.stack
+    frame = stack[-1]
+    # Once node has all the direct leaves, next leaf goes into a new subtree.
+    while frame.leaves == options.max_direct_leaves:
+        child = Frame(frame.depth)
+        frame.repeat += 1
+        if frame.repeat == options.layer_repeat:
+            frame.depth += 1
+            frame.repeat = 0
+        stack.append(child)
+        frame = child
+
+    frame.children.append(id)
+    frame.leaves += 1
+
+    # Emit nodes that can not have any more children.
+    while len(stack) > 1:
+        frame = stack[-1]
+        if frame.leaves < options.max_direct_leaves or frame.depth < frame.max_depth:
+            break
+        _complete(layout, nodes)
+
+
+def _complete(layout: Trickle, nodes: list[Branch]) -> None:
+    frame = layout.stack.pop()
+    layout.last_id += 1
+    node = Branch(layout.last_id, frame.children, None)
+    nodes.append(node)
+    layout.stack[-1].children.append(node.id)
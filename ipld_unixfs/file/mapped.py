@@ -0,0 +1,51 @@
+import mmap
+import os
+from typing import Union
+from ipld_unixfs.file.layout.api import Layout
+from ipld_unixfs.file.writer import FileWriter
+
+DEFAULT_WINDOW_SIZE = 64 * 1024 * 1024
+"""Number of bytes of the file mapped at once."""
+
+Path = Union[str, "os.PathLike[str]"]
+
+
+def write_file(
+    view: FileWriter[Layout], path: Path, window_size: int = DEFAULT_WINDOW_SIZE
+) -> FileWriter[Layout]:
+    """
+    Writes content of the file at the given path into the writer without
+    reading it into Python buffers. File is memory mapped one window at a time
+    and views of the mapping are written, so that chunks (and raw leaves)
+    reference the page cache directly and only chunks spanning two windows
+    are copied.
+
+    Each window is unmapped once nothing references it any longer, that is
+    once its chunks were encoded and the block writer released the blocks.
+    Block writers that hold on to raw leaf blocks will therefore keep the
+    windows mapped. File MUST not be modified while it is being written.
+    """
+    if window_size < 1:
+        raise ValueError("window size must be positive")
+    # Mappings need to start at an offset aligned to the allocation
+    # granularity.
+    granularity = mmap.ALLOCATIONGRANULARITY
+    window_size = -(-window_size // granularity) * granularity
+
+    with open(path, "rb") as file:
+        fd = file.fileno()
+        size = os.fstat(fd).st_size
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+
+        for offset in range(0, size, window_size):
+            length = min(window_size, size - offset)
+            window = mmap.mmap(fd, length, access=mmap.ACCESS_READ, offset=offset)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                window.madvise(mmap.MADV_SEQUENTIAL)
+            # Mapping is not referenced past this point other than through the
+            # views, which is what unmaps it once they are released.
+            view.write(memoryview(window))
+            del window
+
+    return view
@@ -0,0 +1,414 @@
+from collections import deque
+from concurrent.futures import Executor, Future
+from os import cpu_count
+from typing import Any, Generic, Optional, Protocol, Sequence, Union
+from multiformats import CID, multihash
+from multiformats.multihash import Multihash
+from ipld_unixfs import codec
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.api import Chunk, Chunker as ChunkerType
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+import ipld_unixfs.file.dedup as Dedup
+from ipld_unixfs.file.dedup import DedupCache
+import ipld_unixfs.file.layout.balanced as Balanced
+from ipld_unixfs.file.layout.api import (
+    PB,
+    RAW,
+    Branch,
+    FileChunkEncoder,
+    FileEncoder,
+    Layout,
+    LayoutEngine,
+    Leaf,
+    NodeID,
+)
+from ipld_unixfs.multiformats.codecs.api import BlockEncoder
+from ipld_unixfs.unixfs import (
+    AdvancedFile,
+    Block,
+    BlockWriter,
+    ByteView,
+    File,
+    FileLink,
+    Metadata,
+    SimpleFile,
+)
+
+
+class Linker(Protocol):
+    def create_link(self, code: int, digest: bytes) -> CID: ...
+
+
+class CIDv1Linker(Linker):
+    def create_link(self, code: int, digest: bytes) -> CID:
+        return CID("base32", 1, code, digest)
+
+
+class UnixFSLeaf(BlockEncoder[PB, ByteView]):
+    """
+    Encodes file chunks as UnixFS file nodes in dag-pb blocks.
+    """
+
+    name = "UnixFSLeaf"
+    code: PB = 0x70
+
+    def encode(self, data: ByteView) -> bytes:
+        return codec.encode_file_chunk(data)
+
+
+class UnixFSRawLeaf(BlockEncoder[RAW, ByteView]):
+    """
+    Encodes file chunks as raw blocks, that is chunk content is used as block
+    bytes as is, without copying.
+    """
+
+    name = "UnixFSRawLeaf"
+    code: RAW = 0x55
+
+    def encode(self, data: ByteView) -> ByteView:
+        return data
+
+
+class UnixFSFile(FileEncoder):
+    """
+    Encodes UnixFS file nodes in dag-pb blocks.
+    """
+
+    name = codec.name
+    code: PB = 0x70
+
+    def encode(self, file: File) -> bytes:
+        return codec.encode_file(file)
+
+
+class Settings(Generic[Layout]):
+    chunker: ChunkerType[Any]
+    file_layout: LayoutEngine[Layout]
+    file_chunk_encoder: FileChunkEncoder
+    small_file_encoder: FileChunkEncoder
+    file_encoder: FileEncoder
+    hasher: Multihash
+    linker: Linker
+
+    def __init__(
+        self,
+        chunker: ChunkerType[Any],
+        file_layout: LayoutEngine[Layout],
+        file_chunk_encoder: FileChunkEncoder,
+        small_file_encoder: FileChunkEncoder,
+        file_encoder: FileEncoder,
+        hasher: Multihash,
+        linker: Linker,
+    ) -> None:
+        self.chunker = chunker
+        self.file_layout = file_layout
+        self.file_chunk_encoder = file_chunk_encoder
+        self.small_file_encoder = small_file_encoder
+        self.file_encoder = file_encoder
+        self.hasher = hasher
+        self.linker = linker
+
+
+def defaults() -> Settings[Balanced.Balanced]:
+    return Settings(
+        chunker=FixedSizeChunker(),
+        file_layout=Balanced.with_width(Balanced.defaults.width),
+        file_chunk_encoder=UnixFSLeaf(),
+        small_file_encoder=UnixFSLeaf(),
+        file_encoder=UnixFSFile(),
+        hasher=multihash.get("sha2-256"),
+        linker=CIDv1Linker(),
+    )
+
+
+EncodedChunk = tuple[Optional[Block], FileLink, Optional[Dedup.Key]]
+"""
+Block and link of the encoded leaf along with its dedup key. Block is `None`
+if the leaf was found in the dedup cache.
+"""
+
+DEFAULT_MAX_PENDING = 2 * (cpu_count() or 1)
+"""
+Default number of leaves that can be encoded by the executor concurrently.
+"""
+
+
+class FileWriter(Generic[Layout]):
+    """
+    Writer that turns a stream of bytes into a UnixFS file DAG. Bytes written
+    are chunked and laid out according to the `settings` and resulting blocks
+    are passed to the `writer` as soon as they are encoded. Once closed the
+    link to the root of the file DAG is returned.
+
+    Writer only holds on to the bytes that were not yet chunked and the links
+    of the nodes that were not yet linked from a branch, which means memory use
+    is bounded by the chunk size and the layout width rather than a file size.
+
+    If `executor` is provided leaves are encoded and hashed by it, with up to
+    `max_pending` leaves in flight. Blocks are still passed to the `writer`
+    from the calling thread and in the same order as without an executor.
+
+    If `dedup` cache is provided, chunks it has seen already are not encoded
+    and their leaves are not passed to the `writer` again.
+    """
+
+    writer: BlockWriter
+    metadata: Optional[Metadata]
+    settings: Settings[Layout]
+    chunker: Chunker.State[Any]
+    layout: Layout
+    nodes: dict[NodeID, FileLink]
+    """Links to the encoded nodes that were not yet linked from a branch."""
+    link: Optional[FileLink]
+    """Link to the root of the file, set once writer is closed."""
+    executor: Optional[Executor]
+    max_pending: int
+    pending: "deque[tuple[NodeID, Future[EncodedChunk]]]"
+    """Leaves submitted to the executor in the order they were laid out."""
+    dedup: Optional[DedupCache]
+
+    def __init__(
+        self,
+        writer: BlockWriter,
+        metadata: Optional[Metadata],
+        settings: Settings[Layout],
+        executor: Optional[Executor] = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        dedup: Optional[DedupCache] = None,
+    ) -> None:
+        if max_pending < 1:
+            raise ValueError("max pending must be positive")
+        self.writer = writer
+        self.metadata = metadata
+        self.settings = settings
+        self.chunker = Chunker.open(settings.chunker)
+        self.layout = settings.file_layout.open()
+        self.nodes = {}
+        self.link = None
+        self.executor = executor
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.dedup = dedup
+
+    def write(self, bytes: Union[bytes, bytearray, memoryview]) -> "FileWriter[Layout]":
+        """
+        Write bytes into the file. Passed bytes are not copied, so caller MUST
+        not mutate them after they were written.
+        """
+        return write(self, bytes)
+
+    def flush(self) -> None:
+        """
+        Pass blocks of the leaves that are being encoded by the executor to
+        the `writer`, waiting for them if necessary.
+        """
+        flush(self)
+
+    def close(self) -> FileLink:
+        """
+        Close the writer, flushing all the remaining blocks and returning the
+        link to the root of the file DAG.
+        """
+        return close(self)
+
+
+def create_writer(
+    writer: BlockWriter,
+    metadata: Optional[Metadata] = None,
+    settings: Optional[Settings[Any]] = None,
+    executor: Optional[Executor] = None,
+    max_pending: int = DEFAULT_MAX_PENDING,
+    dedup: Optional[DedupCache] = None,
+) -> FileWriter[Any]:
+    return FileWriter(
+        writer,
+        metadata,
+        settings if settings is not None else defaults(),
+        executor,
+        max_pending,
+        dedup,
+    )
+
+
+def write(
+    view: FileWriter[Layout], bytes: Union[bytes, bytearray, memoryview]
+) -> FileWriter[Layout]:
+    if view.link is not None:
+        raise ValueError("unable to write, file writer is closed")
+
+    view.chunker = Chunker.write(view.chunker, memoryview(bytes))
+    _write_chunks(view, view.chunker.chunks)
+    return view
+
+
+def flush(view: FileWriter[Layout]) -> None:
+    _drain(view)
+
+
+def close(view: FileWriter[Layout]) -> FileLink:
+    if view.link is not None:
+        return view.link
+
+    view.chunker = Chunker.close(view.chunker)
+    _write_chunks(view, view.chunker.chunks)
+
+    settings = view.settings
+    result = settings.file_layout.close(view.layout, view.metadata)
+    _encode_nodes(view, result.leaves, result.nodes)
+    _drain(view)
+
+    root = result.root
+    if isinstance(root, Branch):
+        block, link = encode_branch(
+            settings, root, _take_links(view, root), view.metadata
+        )
+    elif view.metadata is not None:
+        # Raw or plain file chunks can not carry metadata so we encode it as a
+        # simple file instead.
+        block, link = encode_simple_file(settings, root, view.metadata)
+    else:
+        block, link = encode_leaf(settings, root, settings.small_file_encoder)
+
+    view.writer.write(block)
+    view.link = link
+    return link
+
+
+def encode_leaf(
+    settings: Settings[Any], leaf: Leaf, encoder: FileChunkEncoder
+) -> tuple[Block, FileLink]:
+    content = _content(leaf.content)
+    bytes = encoder.encode(content)
+    cid = settings.linker.create_link(encoder.code, settings.hasher.digest(bytes))
+    return Block(cid, bytes), FileLink(cid, len(bytes), len(content))
+
+
+def encode_simple_file(
+    settings: Settings[Any], leaf: Leaf, metadata: Optional[Metadata]
+) -> tuple[Block, FileLink]:
+    content = _content(leaf.content)
+    encoder = settings.file_encoder
+    bytes = encoder.encode(SimpleFile(content, metadata))
+    cid = settings.linker.create_link(encoder.code, settings.hasher.digest(bytes))
+    return Block(cid, bytes), FileLink(cid, len(bytes), len(content))
+
+
+def encode_branch(
+    settings: Settings[Any],
+    branch: Branch,
+    links: Sequence[FileLink],
+    metadata: Optional[Metadata] = None,
+) -> tuple[Block, FileLink]:
+    encoder = settings.file_encoder
+    bytes = encoder.encode(AdvancedFile(links, metadata))
+    cid = settings.linker.create_link(encoder.code, settings.hasher.digest(bytes))
+    link = FileLink(
+        cid,
+        codec.cumulative_dag_byte_length(bytes, links),
+        codec.cumulative_content_byte_length(links),
+    )
+    return Block(cid, bytes), link
+
+
+def _write_chunks(view: FileWriter[Layout], chunks: Sequence[Chunk]) -> None:
+    if len(chunks) > 0:
+        result = view.settings.file_layout.write(view.layout, chunks)
+        view.layout = result.layout
+        _encode_nodes(view, result.leaves, result.nodes)
+
+
+def _encode_nodes(
+    view: FileWriter[Layout], leaves: Sequence[Leaf], nodes: Sequence[Branch]
+) -> None:
+    settings = view.settings
+    executor = view.executor
+    # Leaves are encoded first as branches produced by the same call link to
+    # them.
+    for leaf in leaves:
+        if executor is None:
+            block, link, key = _encode_chunk(settings, leaf, view.dedup)
+            _write_leaf(view, block, link, key)
+            view.nodes[leaf.id] = link
+        else:
+            # Wait for the oldest leaf so that at most `max_pending` leaves
+            # (and their content) are held on to.
+            _drain(view, view.max_pending - 1)
+            future = executor.submit(_encode_chunk, settings, leaf, view.dedup)
+            view.pending.append((leaf.id, future))
+
+    if len(nodes) > 0:
+        _drain(view)
+
+    for node in nodes:
+        block, link = encode_branch(settings, node, _take_links(view, node))
+        view.writer.write(block)
+        view.nodes[node.id] = link
+
+
+def _drain(view: FileWriter[Layout], limit: int = 0) -> None:
+    """
+    Writes blocks of the pending leaves in order until no more than `limit`
+    are left.
+    """
+    pending = view.pending
+    while len(pending) > limit:
+        id, future = pending.popleft()
+        block, link, key = future.result()
+        _write_leaf(view, block, link, key)
+        view.nodes[id] = link
+
+
+def _encode_chunk(
+    settings: Settings[Any], leaf: Leaf, dedup: Optional[DedupCache]
+) -> EncodedChunk:
+    """
+    Encodes the leaf with the `file_chunk_encoder`. If `dedup` cache has seen
+    the chunk before, link from the cache is returned without a block.
+    """
+    encoder = settings.file_chunk_encoder
+    if dedup is None:
+        block, link = encode_leaf(settings, leaf, encoder)
+        return block, link, None
+
+    content = _content(leaf.content)
+    digest = settings.hasher.digest(content)
+    key = (encoder.code, digest)
+    cached = dedup.get(key)
+    if cached is not None:
+        return None, cached, key
+
+    bytes = encoder.encode(content)
+    # Raw leaves are the chunk itself, so chunk hash is also the block hash.
+    if bytes is not content:
+        digest = settings.hasher.digest(bytes)
+    cid = settings.linker.create_link(encoder.code, digest)
+    return Block(cid, bytes), FileLink(cid, len(bytes), len(content)), key
+
+
+def _write_leaf(
+    view: FileWriter[Layout],
+    block: Optional[Block],
+    link: FileLink,
+    key: Optional[Dedup.Key],
+) -> None:
+    if block is None:
+        return
+    if view.dedup is None or key is None:
+        view.writer.write(block)
+    else:
+        view.dedup.write(view.writer, key, block, link)
+
+
+def _take_links(view: FileWriter[Layout], branch: Branch) -> list[FileLink]:
+    return [view.nodes.pop(id) for id in branch.children]
+
+
+def _content(chunk: Optional[Chunk]) -> ByteView:
+    if chunk is None:
+        return codec.EMPTY_BUFFER
+    # Chunks within a single written buffer are views of it, anything else is
+    # copied into a contiguous buffer.
+    if isinstance(chunk, BufferView):
+        return chunk.as_memoryview()
+    return chunk.copy_to(memoryview(bytearray(chunk.byte_length)), 0)
@@ -0,0 +1,407 @@
+import multiprocessing
+import os
+import queue
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue
+from os import cpu_count
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
+)
+from multiformats import CID
+import ipld_unixfs.directory.writer as Directory
+from ipld_unixfs.file.writer import Settings, create_writer, defaults
+from ipld_unixfs.unixfs import Block, BlockWriter, DAGLink, FileLink
+
+DEFAULT_READ_SIZE = 1024 * 1024
+DEFAULT_MAX_QUEUED_BLOCKS = 64
+DEFAULT_MAX_PENDING_BYTES = 256 * 1024 * 1024
+POLL_INTERVAL = 1.0
+"""Seconds to wait for a message before checking workers are alive."""
+
+Task = tuple[int, str]
+"""Index of the file in the batch and its path."""
+
+
+@dataclass
+class _BlockMessage:
+    index: int
+    cid: bytes
+    bytes: bytes
+
+
+@dataclass
+class _DoneMessage:
+    index: int
+    cid: bytes
+    dag_byte_length: int
+    content_byte_length: int
+
+
+@dataclass
+class _ErrorMessage:
+    index: int
+    error: BaseException
+
+
+Message = Union[_BlockMessage, _DoneMessage, _ErrorMessage]
+"""Message sent from the worker to the importing process."""
+
+
+class FileImportError(Exception):
+    """
+    Raised when file could not be imported by the worker process.
+    """
+
+    path: str
+
+    def __init__(self, path: str, cause: BaseException) -> None:
+        super().__init__(f"failed to import {path}: {cause!r}")
+        self.path = path
+        self.__cause__ = cause
+
+
+def import_files(
+    paths: Iterable[str],
+    writer: BlockWriter,
+    settings: Callable[[], Settings[Any]] = defaults,
+    processes: Optional[int] = None,
+    max_queued_blocks: int = DEFAULT_MAX_QUEUED_BLOCKS,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> Iterator[tuple[str, FileLink]]:
+    """
+    Imports files at the given paths across a pool of worker processes,
+    yielding path and link to the root of each file as soon as it is imported
+    (which may differ from the order of the paths).
+
+    Each worker reads the file and runs the file writer with settings created
+    by calling `settings` (which needs to be picklable e.g. a module level
+    function). Blocks are sent back to the calling process and passed to the
+    `writer` as they arrive, blocks of a file are passed before the file is
+    yielded.
+
+    Memory use is bounded regardless of the number of files: `paths` are
+    consumed lazily, each worker imports one file at a time and workers block
+    once `max_queued_blocks` blocks are waiting to be written.
+    """
+    pool = _Pool(settings, processes, max_queued_blocks, read_size)
+    try:
+        pending: dict[int, str] = {}
+        source = enumerate(paths)
+        exhausted = False
+        while True:
+            # Keep every worker busy with a file queued up after the current
+            # one, without reading paths any further ahead.
+            while not exhausted and len(pending) < 2 * len(pool.workers):
+                next_task = next(source, None)
+                if next_task is None:
+                    exhausted = True
+                else:
+                    index, path = next_task
+                    pending[index] = path
+                    pool.submit(index, path)
+
+            if len(pending) == 0:
+                break
+
+            index, link = pool.receive(writer)
+            if isinstance(link, BaseException):
+                raise FileImportError(pending[index], link)
+            yield pending.pop(index), link
+
+        pool.close()
+    finally:
+        pool.terminate()
+
+
+class _Directory:
+    """
+    Directory that is being imported, it is closed and linked from the parent
+    once it was walked and all of its entries were imported.
+    """
+
+    name: str
+    parent: Optional["_Directory"]
+    writer: Directory.DirectoryWriter
+    remaining: int
+    """Number of entries that are not yet imported."""
+    walked: bool
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional["_Directory"],
+        writer: Directory.DirectoryWriter,
+    ) -> None:
+        self.name = name
+        self.parent = parent
+        self.writer = writer
+        self.remaining = 0
+        self.walked = False
+
+
+@dataclass
+class _File:
+    directory: _Directory
+    name: str
+    path: str
+    size: int
+
+
+def import_directory(
+    path: str,
+    writer: BlockWriter,
+    settings: Callable[[], Settings[Any]] = defaults,
+    directory_settings: Optional[Directory.Settings] = None,
+    processes: Optional[int] = None,
+    max_queued_blocks: int = DEFAULT_MAX_QUEUED_BLOCKS,
+    read_size: int = DEFAULT_READ_SIZE,
+    max_pending_files: Optional[int] = None,
+    max_pending_bytes: int = DEFAULT_MAX_PENDING_BYTES,
+) -> DAGLink:
+    """
+    Imports directory tree at the given path, returning link to the root
+    directory. Files are imported across a pool of worker processes same as
+    with `import_files`, while directories are built in the calling process
+    and written as soon as all of their entries are imported. Blocks are passed
+    to the `writer` so that blocks of the entries precede the blocks of the
+    directory.
+
+    Tree is walked lazily, only as far ahead as needed to have up to
+    `max_pending_files` (twice the number of processes by default) files or
+    `max_pending_bytes` of file content being imported at once. Symbolic links
+    and other special files are skipped.
+    """
+    pool = _Pool(settings, processes, max_queued_blocks, read_size)
+    if max_pending_files is None:
+        max_pending_files = 2 * len(pool.workers)
+    if max_pending_files < 1:
+        raise ValueError("max pending files must be positive")
+    if directory_settings is None:
+        directory_settings = Directory.defaults()
+
+    walk: list[tuple[_Directory, Generator[os.DirEntry[str], None, None]]] = []
+    try:
+        root = _Directory(
+            path, None, Directory.create_writer(writer, settings=directory_settings)
+        )
+        walk.append((root, _scan(path)))
+        pending: dict[int, _File] = {}
+        pending_bytes = 0
+        last_index = 0
+        while True:
+            while (
+                len(walk) > 0
+                and len(pending) < max_pending_files
+                and (len(pending) == 0 or pending_bytes < max_pending_bytes)
+            ):
+                directory, entries = walk[-1]
+                entry = next(entries, None)
+                if entry is None:
+                    entries.close()
+                    walk.pop()
+                    directory.walked = True
+                    _complete(directory)
+                elif entry.is_dir(follow_symlinks=False):
+                    child = _Directory(
+                        entry.name,
+                        directory,
+                        Directory.create_writer(writer, settings=directory_settings),
+                    )
+                    directory.remaining += 1
+                    walk.append((child, _scan(entry.path)))
+                elif entry.is_file(follow_symlinks=False):
+                    file = _File(
+                        directory,
+                        entry.name,
+                        entry.path,
+                        entry.stat(follow_symlinks=False).st_size,
+                    )
+                    directory.remaining += 1
+                    last_index += 1
+                    pending[last_index] = file
+                    pending_bytes += file.size
+                    pool.submit(last_index, file.path)
+
+            if root.writer.link is not None:
+                break
+
+            index, link = pool.receive(writer)
+            file = pending.pop(index)
+            if isinstance(link, BaseException):
+                raise FileImportError(file.path, link)
+            pending_bytes -= file.size
+            file.directory.writer.set(file.name, link)
+            file.directory.remaining -= 1
+            _complete(file.directory)
+
+        pool.close()
+        return root.writer.link
+    finally:
+        for _, entries in walk:
+            entries.close()
+        pool.terminate()
+
+
+def _scan(path: str) -> Generator[os.DirEntry[str], None, None]:
+    # Generator closes the directory once exhausted or closed.
+    with os.scandir(path) as entries:
+        yield from entries
+
+
+def _complete(directory: _Directory) -> None:
+    """
+    Closes the directory if all of its entries were imported, linking it from
+    the parent which may complete it in turn.
+    """
+    current: Optional[_Directory] = directory
+    while current is not None and current.walked and current.remaining == 0:
+        link = current.writer.close()
+        parent = current.parent
+        if parent is not None:
+            parent.writer.set(current.name, link)
+            parent.remaining -= 1
+        current = parent
+
+
+class _Pool:
+    """
+    Pool of worker processes importing files. Each file is identified by the
+    index it was submitted with.
+    """
+
+    tasks: "Queue[Optional[Task]]"
+    results: "Queue[Message]"
+    workers: list[BaseProcess]
+
+    def __init__(
+        self,
+        settings: Callable[[], Settings[Any]],
+        processes: Optional[int],
+        max_queued_blocks: int,
+        read_size: int,
+    ) -> None:
+        if processes is None:
+            processes = cpu_count() or 1
+        if processes < 1:
+            raise ValueError("number of processes must be positive")
+
+        context = multiprocessing.get_context()
+        self.tasks = context.Queue()
+        self.results = context.Queue(max_queued_blocks)
+        self.workers = [
+            context.Process(
+                target=_work,
+                args=(self.tasks, self.results, settings, read_size),
+                daemon=True,
+            )
+            for _ in range(processes)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, index: int, path: str) -> None:
+        self.tasks.put((index, path))
+
+    def receive(
+        self, writer: BlockWriter
+    ) -> tuple[int, Union[FileLink, BaseException]]:
+        """
+        Passes blocks to the `writer` until some file is imported, returning
+        its index and link or an error it failed with.
+        """
+        while True:
+            message = _receive(self.results, self.workers)
+            if isinstance(message, _BlockMessage):
+                writer.write(Block(CID.decode(message.cid), message.bytes))
+            elif isinstance(message, _DoneMessage):
+                link = FileLink(
+                    CID.decode(message.cid),
+                    message.dag_byte_length,
+                    message.content_byte_length,
+                )
+                return message.index, link
+            else:
+                return message.index, message.error
+
+    def close(self) -> None:
+        """
+        Stops the workers once they are done with all the submitted files.
+        """
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join()
+
+    def terminate(self) -> None:
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in self.workers:
+            worker.join()
+
+
+def _receive(results: "Queue[Message]", workers: Sequence[BaseProcess]) -> Message:
+    while True:
+        try:
+            return results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            # Worker that died (e.g. was killed) will never report back.
+            if any(worker.exitcode is not None for worker in workers):
+                raise RuntimeError("import worker process exited unexpectedly")
+
+
+class _Sink:
+    """
+    Block writer sending blocks to the importing process.
+    """
+
+    results: "Queue[Message]"
+    index: int
+
+    def __init__(self, results: "Queue[Message]", index: int) -> None:
+        self.results = results
+        self.index = index
+
+    def write(self, block: Block) -> None:
+        message = _BlockMessage(self.index, bytes(block.cid), bytes(block.bytes))
+        self.results.put(message)
+
+
+def _work(
+    tasks: "Queue[Optional[Task]]",
+    results: "Queue[Message]",
+    settings: Callable[[], Settings[Any]],
+    read_size: int,
+) -> None:
+    # Settings are created in the worker since hashers can not be pickled.
+    file_settings = settings()
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        index, path = task
+        try:
+            writer = create_writer(_Sink(results, index), settings=file_settings)
+            with open(path, "rb") as file:
+                while True:
+                    data = file.read(read_size)
+                    if len(data) == 0:
+                        break
+                    writer.write(data)
+            link = writer.close()
+            results.put(
+                _DoneMessage(
+                    index, bytes(link.cid), link.dagByteLength, link.contentByteLength
+                )
+            )
+        except Exception as error:
+            results.put(_ErrorMessage(index, error))
@@ -1,6 +1,6 @@
 # TODO: PR to multiformats?
 from abc import abstractmethod
-from typing import Generic, TypeVar
+from typing import Generic, TypeVar, Union
 
 
 Code = TypeVar("Code", bound=int)
@@ -18,5 +18,5 @@ class BlockEncoder(Generic[Code, Data]):
     code: Code
 
     @abstractmethod
-    def encode(self, data: Data) -> bytes:
+    def encode(self, data: Data) -> Union[bytes, memoryview]:
         pass
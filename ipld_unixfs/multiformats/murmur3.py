@@ -0,0 +1,92 @@
+"""
+MurmurHash3 x64 128-bit hash function (seed 0) as used by go-ipfs for hashing
+names of the HAMT sharded directory entries.
+"""
+
+from struct import Struct
+
+name = "murmur3-x64-64"
+code = 0x22
+"""Multicodec code of the hash, which is first 64 bits of the 128-bit hash."""
+
+_M64 = 0xFFFFFFFFFFFFFFFF
+_C1 = 0x87C37B91114253D5
+_C2 = 0x4CF5AD432745937F
+_BLOCK = Struct("<QQ")
+
+
+def digest(data: bytes) -> bytes:
+    """
+    First 64 bits of the 128-bit hash in big-endian byte order.
+    """
+    h1, _ = hash128(data)
+    return h1.to_bytes(8, "big")
+
+
+def hash64(data: bytes) -> int:
+    """
+    First 64 bits of the 128-bit hash as an unsigned integer.
+    """
+    return hash128(data)[0]
+
+
+def hash128(data: bytes, seed: int = 0) -> tuple[int, int]:
+    """
+    Computes the hash returning both of its 64-bit halves.
+    """
+    length = len(data)
+    h1 = h2 = seed
+    end = length - length % 16
+    for offset in range(0, end, 16):
+        k1, k2 = _BLOCK.unpack_from(data, offset)
+
+        k1 = (k1 * _C1) & _M64
+        k1 = ((k1 << 31) | (k1 >> 33)) & _M64
+        k1 = (k1 * _C2) & _M64
+        h1 ^= k1
+
+        h1 = ((h1 << 27) | (h1 >> 37)) & _M64
+        h1 = (h1 + h2) & _M64
+        h1 = (h1 * 5 + 0x52DCE729) & _M64
+
+        k2 = (k2 * _C2) & _M64
+        k2 = ((k2 << 33) | (k2 >> 31)) & _M64
+        k2 = (k2 * _C1) & _M64
+        h2 ^= k2
+
+        h2 = ((h2 << 31) | (h2 >> 33)) & _M64
+        h2 = (h2 + h1) & _M64
+        h2 = (h2 * 5 + 0x38495AB5) & _M64
+
+    tail = data[end:]
+    if len(tail) > 8:
+        k2 = int.from_bytes(tail[8:], "little")
+        k2 = (k2 * _C2) & _M64
+        k2 = ((k2 << 33) | (k2 >> 31)) & _M64
+        k2 = (k2 * _C1) & _M64
+        h2 ^= k2
+    if len(tail) > 0:
+        k1 = int.from_bytes(tail[:8], "little")
+        k1 = (k1 * _C1) & _M64
+        k1 = ((k1 << 31) | (k1 >> 33)) & _M64
+        k1 = (k1 * _C2) & _M64
+        h1 ^= k1
+
+    h1 ^= length
+    h2 ^= length
+    h1 = (h1 + h2) & _M64
+    h2 = (h2 + h1) & _M64
+    h1 = _fmix(h1)
+    h2 = _fmix(h2)
+    h1 = (h1 + h2) & _M64
+    h2 = (h2 + h1) & _M64
+    return h1, h2
+
+
+def _fmix(k: int) -> int:
+    k ^= k >> 33
+    k = (k * 0xFF51AFD7ED558CCD) & _M64
+    k ^= k >> 33
+    k = (k * 0xC4CEB9FE1A85EC53) & _M64
+    k ^= k >> 33
+    return k
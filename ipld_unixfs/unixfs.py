@@ -1,8 +1,15 @@
+from dataclasses import dataclass
 from enum import Enum
 from typing import Literal, Optional, Protocol, Sequence, Union
 
 from multiformats import CID
 
+ByteView = Union[bytes, memoryview]
+"""
+Read-only binary data. File content is passed around as `memoryview` where
+possible so that it does not need to be copied.
+"""
+
 
 class NodeType(Enum):
     Raw = 0
@@ -48,11 +55,21 @@ class MTime:
     secs: int
     nsecs: Optional[int]
 
+    def __init__(self, secs: int, nsecs: Optional[int] = None) -> None:
+        self.secs = secs
+        self.nsecs = nsecs
+
 
 class Metadata:
     mode: Optional[Mode]
     mtime: Optional[MTime]
 
+    def __init__(
+        self, mode: Optional[Mode] = None, mtime: Optional[MTime] = None
+    ) -> None:
+        self.mode = mode
+        self.mtime = mtime
+
 
 class SimpleFile:
     """
@@ -64,7 +81,13 @@ class SimpleFile:
     metadata: Optional[Metadata]
     type: Literal[NodeType.File]
     layout: Literal["simple"]
-    content: bytes
+    content: ByteView
+
+    def __init__(self, content: ByteView, metadata: Optional[Metadata] = None) -> None:
+        self.metadata = metadata
+        self.type = NodeType.File
+        self.layout = "simple"
+        self.content = content
 
 
 class FileChunk:
@@ -97,7 +120,13 @@ class FileChunk:
     metadata: Optional[Metadata]
     type: Literal[NodeType.File]
     layout: Literal["simple"]
-    content: bytes
+    content: ByteView
+
+    def __init__(self, content: ByteView, metadata: Optional[Metadata] = None) -> None:
+        self.metadata = metadata
+        self.type = NodeType.File
+        self.layout = "simple"
+        self.content = content
 
 
 class DAGLink:
@@ -110,11 +139,19 @@ class DAGLink:
     block and all the blocks it links to.
     """
 
+    def __init__(self, cid: CID, dagByteLength: int) -> None:
+        self.cid = cid
+        self.dagByteLength = dagByteLength
+
 
 class ContentDAGLink(DAGLink):
     contentByteLength: int
     """Total number of bytes in the file."""
 
+    def __init__(self, cid: CID, dagByteLength: int, contentByteLength: int) -> None:
+        super().__init__(cid, dagByteLength)
+        self.contentByteLength = contentByteLength
+
 
 FileLink = ContentDAGLink
 
@@ -143,6 +180,11 @@ class FileShard:
     layout: Literal["advanced"]
     parts: Sequence[FileLink]
 
+    def __init__(self, parts: Sequence[FileLink]) -> None:
+        self.type = NodeType.File
+        self.layout = "advanced"
+        self.parts = parts
+
 
 class AdvancedFile:
     """
@@ -157,5 +199,114 @@ class AdvancedFile:
     layout: Literal["advanced"]
     parts: Sequence[FileLink]
 
+    def __init__(
+        self, parts: Sequence[FileLink], metadata: Optional[Metadata] = None
+    ) -> None:
+        self.metadata = metadata
+        self.type = NodeType.File
+        self.layout = "advanced"
+        self.parts = parts
+
 
 File = Union[SimpleFile, AdvancedFile]
+
+
+class DirectoryEntryLink(DAGLink):
+    name: str
+    """Name of the entry within the directory."""
+
+    def __init__(self, cid: CID, dagByteLength: int, name: str) -> None:
+        super().__init__(cid, dagByteLength)
+        self.name = name
+
+
+class FlatDirectory:
+    """
+    Logical representation of a directory that fits a single block, all of
+    its entries are linked from it directly.
+    """
+
+    metadata: Optional[Metadata]
+    type: Literal[NodeType.Directory]
+    entries: Sequence[DirectoryEntryLink]
+
+    def __init__(
+        self,
+        entries: Sequence[DirectoryEntryLink],
+        metadata: Optional[Metadata] = None,
+    ) -> None:
+        self.metadata = metadata
+        self.type = NodeType.Directory
+        self.entries = entries
+
+
+class ShardedDirectory:
+    """
+    Logical representation of a node of the directory sharded across a HAMT
+    (hash array mapped trie). Entries are named by the hex encoded index of
+    the slot they occupy, followed by the entry name for the directory
+    entries, while links to the nested shards carry just the index.
+
+    Please note that just like with files, nodes other than the root are
+    expected to have no `mode` and `mtime` fields.
+    """
+
+    metadata: Optional[Metadata]
+    type: Literal[NodeType.HAMTShard]
+    bitfield: bytes
+    """Big-endian bitfield of the occupied slots."""
+    fanout: int
+    hashType: int
+    """Multicodec code of the hash function entry names are hashed with."""
+    entries: Sequence[DirectoryEntryLink]
+
+    def __init__(
+        self,
+        bitfield: bytes,
+        fanout: int,
+        hashType: int,
+        entries: Sequence[DirectoryEntryLink],
+        metadata: Optional[Metadata] = None,
+    ) -> None:
+        self.metadata = metadata
+        self.type = NodeType.HAMTShard
+        self.bitfield = bitfield
+        self.fanout = fanout
+        self.hashType = hashType
+        self.entries = entries
+
+
+Directory = Union[FlatDirectory, ShardedDirectory]
+
+
+@dataclass
+class Block:
+    """
+    Encoded IPLD block along with the CID it is addressed by.
+    """
+
+    cid: CID
+    bytes: ByteView
+    """
+    Block bytes, which may be a view of the bytes written into the file writer
+    (e.g. raw leaves) rather than a copy.
+    """
+
+
+class BlockWriter(Protocol):
+    """
+    Consumer of the blocks produced by the writers. Blocks are passed to the
+    `write` method as soon as they are encoded, it is up to the implementation
+    to decide what to do with them (write into a CAR, upload, etc...).
+    """
+
+    def write(self, block: Block) -> None: ...
+
+
+class BlockGetter(Protocol):
+    """
+    Source of the blocks, e.g. a block store, a CAR or a network client.
+    Implementations raise `KeyError` for the blocks they do not have.
+    """
+
+    def get(self, cid: CID) -> ByteView: ...
@@ -0,0 +1,72 @@
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs.blockstore import LRUBlockStore
+from ipld_unixfs.unixfs import Block, ByteView
+
+
+def _block(data: bytes, code: int = 0x55) -> Block:
+    return Block(CID("base32", 1, code, multihash.digest(data, "sha2-256")), data)
+
+
+class _Store:
+    blocks: dict[CID, ByteView]
+    reads: int
+
+    def __init__(self) -> None:
+        self.blocks = {}
+        self.reads = 0
+
+    def write(self, block: Block) -> None:
+        self.blocks[block.cid] = block.bytes
+
+    def get(self, cid: CID) -> ByteView:
+        self.reads += 1
+        return self.blocks[cid]
+
+    def has(self, cid: CID) -> bool:
+        return cid in self.blocks
+
+
+def test_evicts_least_recently_used() -> None:
+    store = LRUBlockStore(max_bytes=30)
+    a, b, c = _block(bytes(10)), _block(bytes(11)), _block(bytes(12))
+    store.write(a)
+    store.write(b)
+    assert store.get(a.cid) == a.bytes
+    store.write(c)
+    assert store.size == 22
+    assert store.has(a.cid) and store.has(c.cid)
+    assert not store.has(b.cid)
+    with pytest.raises(KeyError):
+        store.get(b.cid)
+    # Blocks larger than the budget are not held.
+    store.write(_block(bytes(31)))
+    assert store.size == 22
+
+
+def test_addressed_by_multihash() -> None:
+    store = LRUBlockStore()
+    block = _block(b"hello", 0x70)
+    store.write(block)
+    v0 = CID("base58btc", 0, 0x70, block.cid.digest)
+    assert store.get(v0) == b"hello"
+
+
+def test_caches_backing_store() -> None:
+    backing = _Store()
+    store = LRUBlockStore(backing, max_bytes=100)
+    a, b = _block(bytes(60)), _block(bytes(50))
+    store.write(a)
+    store.write(b)
+    assert backing.blocks == {a.cid: a.bytes, b.cid: b.bytes}
+    assert store.size == 0
+
+    for _ in range(3):
+        assert store.get(a.cid) == a.bytes
+    assert backing.reads == 1
+    assert store.get(b.cid) == b.bytes
+    assert store.get(a.cid) == a.bytes
+    assert backing.reads == 3
+    assert store.has(b.cid)
+    with pytest.raises(KeyError):
+        store.get(_block(b"missing").cid)
@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+from multiformats import CID, multihash
+import ipld_unixfs.blockstore.sqlite as SQLite
+from ipld_unixfs.blockstore import LRUBlockStore
+from ipld_unixfs.exporter import read_file
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.unixfs import Block
+
+
+def _block(data: bytes) -> Block:
+    return Block(CID("base32", 1, 0x55, multihash.digest(data, "sha2-256")), data)
+
+
+def test_batched_writes(tmp_path: Path) -> None:
+    path = tmp_path / "blocks.db"
+    store = SQLite.open(path, batch_size=100)
+    blocks = [_block(bytes([n]) * 40) for n in range(5)]
+    for block in blocks[:2]:
+        store.write(block)
+    # Pending blocks can be read before they are inserted.
+    assert len(store.pending) == 2
+    assert store.get(blocks[0].cid) == blocks[0].bytes
+    store.write(blocks[2])
+    assert len(store.pending) == 0
+    store.write(blocks[3])
+    store.write(blocks[3])
+    assert store.pending_size == 40
+    with pytest.raises(KeyError):
+        store.get(blocks[4].cid)
+    assert not store.has(blocks[4].cid)
+    store.close()
+
+    with SQLite.open(path) as store:
+        for block in blocks[:4]:
+            assert store.has(block.cid)
+            assert store.get(block.cid) == block.bytes
+        assert not store.has(blocks[4].cid)
+
+
+def test_file_round_trip(tmp_path: Path) -> None:
+    content = os.urandom(100_000)
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(1000)
+    with SQLite.open(tmp_path / "blocks.db", batch_size=10_000) as store:
+        writer = File.create_writer(store, settings=settings)
+        writer.write(content)
+        link = writer.close()
+
+        cache = LRUBlockStore(store, max_bytes=10_000)
+        with ThreadPoolExecutor(4) as executor:
+            for _ in range(2):
+                chunks = read_file(cache, link.cid, prefetch=8, executor=executor)
+                assert b"".join(chunks) == content
+        assert 0 < cache.size <= 10_000
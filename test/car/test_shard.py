@@ -0,0 +1,123 @@
+from io import BytesIO
+from typing import Any
+import dag_cbor
+import pytest
+from multiformats import CID, multihash, varint
+import ipld_unixfs.car.shard as Shard
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.unixfs import Block
+
+
+class _Output(BytesIO):
+    closed_value: bytes
+
+    def close(self) -> None:
+        self.closed_value = self.getvalue()
+        super().close()
+
+
+def _sections(data: bytes) -> list[tuple[int, int]]:
+    """Offset and length of the block bytes of each section."""
+    length, size, _ = varint.decode_raw(data)
+    assert dag_cbor.decode(data[size : size + length]) == {"roots": [], "version": 1}
+    offset = size + length
+    sections = []
+    while offset < len(data):
+        length, size, _ = varint.decode_raw(data[offset:])
+        sections.append((offset + size + 36, length - 36))
+        offset += size + length
+    return sections
+
+
+def test_sharding() -> None:
+    outputs: list[_Output] = []
+
+    def open_shard(n: int) -> Any:
+        assert n == len(outputs)
+        outputs.append(_Output())
+        return outputs[-1]
+
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(1000)
+    sharding = Shard.create_writer(open_shard, shard_size=5000, buffer_size=1500)
+    writer = File.create_writer(sharding, settings=settings)
+    content = bytes(range(256)) * 100
+    writer.write(content)
+    link = writer.close()
+    manifest = sharding.close(link.cid)
+
+    assert manifest.root == link.cid
+    assert len(manifest.shards) == len(outputs) > 1
+    count = 0
+    for shard, output in zip(manifest.shards, outputs):
+        data = output.closed_value
+        assert len(data) <= 5000
+        assert shard.byte_length == len(data)
+        assert shard.cid.digest == multihash.digest(data, "sha2-256")
+        sections = _sections(data)
+        assert len(sections) == len(shard.index)
+        for offset, length in sections:
+            digest = multihash.digest(data[offset : offset + length], "sha2-256")
+            cid = CID("base32", 1, 0x70, digest)
+            assert shard.index.get(cid) == (offset, length)
+        digests = [digest for digest, _, _ in shard.index.entries()]
+        assert digests == sorted(digests)
+        count += len(sections)
+    # 26 leaves and a root
+    assert count == 27
+
+    index = manifest.blocks[-1]
+    assert manifest.cid == index.cid
+    value = dag_cbor.decode(index.bytes)
+    assert value == {
+        "index/sharded/dag@0.1": {
+            "content": link.cid,
+            "shards": [block.cid for block in manifest.blocks[:-1]],
+        }
+    }
+    first = dag_cbor.decode(manifest.blocks[0].bytes)
+    assert isinstance(first, list)
+    assert first[0] == bytes(manifest.shards[0].cid.digest)
+    assert first[1] == sorted(first[1])
+
+
+def test_large_block_gets_own_shard() -> None:
+    outputs: list[BytesIO] = []
+
+    def open_shard(n: int) -> Any:
+        outputs.append(_Output())
+        return outputs[-1]
+
+    sharding = Shard.create_writer(open_shard, shard_size=100)
+    for data in [b"a" * 10, b"b" * 500, b"c" * 10]:
+        digest = multihash.digest(data, "sha2-256")
+        sharding.write(Block(CID("base32", 1, 0x55, digest), data))
+    manifest = sharding.close(CID("base32", 1, 0x55, digest))
+    assert [len(shard.index) for shard in manifest.shards] == [1, 1, 1]
+    assert manifest.shards[0].index.get(CID("base32", 1, 0x55, digest)) is None
+
+    with pytest.raises(ValueError):
+        sharding.write(Block(CID("base32", 1, 0x55, digest), b"c"))
+
+
+def test_index_lookup() -> None:
+    index = Shard.ShardIndex()
+    digests = [multihash.digest(bytes([n]), "sha2-256") for n in range(20)]
+    for n, digest in enumerate(digests):
+        index.add(bytes(digest), n * 100, n)
+    identity = multihash.digest(b"abc", "identity")
+    index.add(bytes(identity), 5000, 3)
+
+    assert len(index) == 21
+    for n, digest in enumerate(digests):
+        assert index.get(CID("base32", 1, 0x55, digest)) == (n * 100, n)
+    assert index.get(CID("base32", 1, 0x55, identity)) == (5000, 3)
+    missing = multihash.digest(b"missing", "sha2-256")
+    assert index.get(CID("base32", 1, 0x55, missing)) is None
+
+    # Blocks added after a lookup are found too.
+    index.add(bytes(missing), 6000, 7)
+    assert index.get(CID("base32", 1, 0x55, missing)) == (6000, 7)
+    entries = list(index.entries())
+    assert [entry[0] for entry in entries] == sorted(entry[0] for entry in entries)
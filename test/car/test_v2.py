@@ -0,0 +1,96 @@
+from io import BytesIO
+import dag_cbor
+from multiformats import CID, multihash, varint
+import ipld_unixfs.car.v2 as CarV2
+from ipld_unixfs.car.index import MultihashIndexSorted
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.unixfs import Block
+
+
+def _read_index(data: bytes) -> dict[bytes, int]:
+    """Reads `MultihashIndexSorted` into a multihash to offset mapping."""
+    codec, size, _ = varint.decode_raw(data)
+    assert codec == 0x0401
+    offset = size
+    entries = {}
+    codes = int.from_bytes(data[offset : offset + 4], "little")
+    offset += 4
+    last_code = -1
+    for _ in range(codes):
+        code = int.from_bytes(data[offset : offset + 8], "little")
+        assert code > last_code
+        last_code = code
+        widths = int.from_bytes(data[offset + 8 : offset + 12], "little")
+        offset += 12
+        for _ in range(widths):
+            width = int.from_bytes(data[offset : offset + 4], "little")
+            length = int.from_bytes(data[offset + 4 : offset + 12], "little")
+            offset += 12
+            digests = []
+            for start in range(offset, offset + length, width):
+                digest = data[start : start + width - 8]
+                digests.append(digest)
+                mh = multihash.wrap(digest, code)
+                entries[bytes(mh)] = int.from_bytes(
+                    data[start + width - 8 : start + width], "little"
+                )
+            assert digests == sorted(digests)
+            offset += length
+    assert offset == len(data)
+    return entries
+
+
+def test_car_v2() -> None:
+    out = BytesIO()
+    car = CarV2.create_writer(out)
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(1000)
+    settings.file_chunk_encoder = File.UnixFSRawLeaf()
+    writer = File.create_writer(car, settings=settings)
+    writer.write(bytes(range(256)) * 40)
+    link = writer.close()
+    extra = b"extra"
+    car.write(Block(CID("base32", 1, 0x55, multihash.digest(extra, "sha2-512")), extra))
+    car.close([link.cid])
+
+    data = out.getvalue()
+    assert data[:11] == CarV2.PRAGMA
+    header = data[11:51]
+    assert header[:16] == bytes(16)
+    data_offset = int.from_bytes(header[16:24], "little")
+    data_size = int.from_bytes(header[24:32], "little")
+    index_offset = int.from_bytes(header[32:40], "little")
+    assert data_offset == 51
+    assert index_offset == data_offset + data_size
+
+    payload = data[data_offset : data_offset + data_size]
+    length, size, _ = varint.decode_raw(payload)
+    roots = dag_cbor.decode(payload[size : size + length])
+    assert roots == {"roots": [link.cid], "version": 1}
+
+    index = _read_index(data[index_offset:])
+    # 11 leaves, root and the extra block
+    assert len(index) == 13 == len(car.index)
+    for mh, offset in index.items():
+        length, size, _ = varint.decode_raw(payload[offset:])
+        section = payload[offset + size : offset + size + length]
+        # version, codec, hash code and digest length all fit a byte
+        cid = CID.decode(section[: 4 + section[3]])
+        block = section[4 + section[3] :]
+        assert bytes(cid.digest) == mh
+        hasher = "sha2-256" if mh[0] == 0x12 else "sha2-512"
+        assert multihash.digest(block, hasher) == mh
+
+
+def test_index_sorted_per_code_and_width() -> None:
+    index = MultihashIndexSorted()
+    for n in range(20):
+        data = bytes([n])
+        index.add(CID("base32", 1, 0x55, multihash.digest(data, "sha2-256")), n)
+        index.add(CID("base32", 1, 0x55, multihash.digest(data, "sha2-512")), n + 100)
+    entries = _read_index(index.encode())
+    assert len(entries) == 40
+    for n in range(20):
+        assert entries[bytes(multihash.digest(bytes([n]), "sha2-256"))] == n
+        assert entries[bytes(multihash.digest(bytes([n]), "sha2-512"))] == n + 100
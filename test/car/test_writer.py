@@ -0,0 +1,83 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+import dag_cbor
+import pytest
+from multiformats import CID, multihash, varint
+import ipld_unixfs.car as Car
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.unixfs import Block, FileLink
+
+
+def _read(data: bytes) -> tuple[Any, list[tuple[CID, bytes]]]:
+    length, size, _ = varint.decode_raw(data)
+    header = dag_cbor.decode(data[size : size + length])
+    offset = size + length
+    blocks = []
+    while offset < len(data):
+        length, size, _ = varint.decode_raw(data[offset:])
+        section = data[offset + size : offset + size + length]
+        cid = CID.decode(section[:36])
+        blocks.append((cid, section[36:]))
+        offset += size + length
+    return header, blocks
+
+
+def _import(car: Car.CarWriter) -> FileLink:
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(1024)
+    writer = File.create_writer(car, settings=settings)
+    writer.write(bytes(range(256)) * 50)
+    return writer.close()
+
+
+def test_placeholder_root(tmp_path: Path) -> None:
+    path = tmp_path / "file.car"
+    # unbuffered file is written with vectored writes
+    with open(path, "wb", buffering=0) as out:
+        car = Car.create_writer(out, buffer_size=4096)
+        link = _import(car)
+        car.close([link.cid])
+
+    header, blocks = _read(path.read_bytes())
+    assert header == {"roots": [link.cid], "version": 1}
+    assert len(blocks) == 14
+    assert blocks[-1][0] == link.cid
+    for cid, data in blocks:
+        assert multihash.digest(data, "sha2-256") == cid.digest
+
+
+def test_known_roots() -> None:
+    out = BytesIO()
+    block = Block(
+        CID("base32", 1, 0x55, multihash.digest(b"hello", "sha2-256")), b"hello"
+    )
+    car = Car.create_writer(out, [block.cid])
+    car.write(block)
+    car.close()
+
+    header, blocks = _read(out.getvalue())
+    assert header == {"roots": [block.cid], "version": 1}
+    assert blocks == [(block.cid, b"hello")]
+    assert car.offset == len(out.getvalue())
+
+
+def test_placeholder_requires_roots() -> None:
+    car = Car.create_writer(BytesIO())
+    with pytest.raises(ValueError):
+        car.close()
+
+
+def test_roots_must_keep_header_size() -> None:
+    car = Car.create_writer(BytesIO())
+    root = CID("base32", 1, 0x55, multihash.digest(b"hello", "sha2-512"))
+    with pytest.raises(ValueError):
+        car.close([root])
+
+
+def test_write_after_close_fails() -> None:
+    car = Car.create_writer(BytesIO(), [Car.PLACEHOLDER_ROOT])
+    car.close()
+    with pytest.raises(ValueError):
+        car.write(Block(Car.PLACEHOLDER_ROOT, b""))
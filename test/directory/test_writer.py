@@ -0,0 +1,225 @@
+import pytest
+from multiformats import CID
+from ipld_unixfs import codec
+import ipld_unixfs.directory as Directory
+import ipld_unixfs.file as File
+from ipld_unixfs.multiformats import murmur3
+from ipld_unixfs.unixfs import DAGLink, Metadata, MTime
+from test.helpers import Blocks
+
+
+def _file(blocks: Blocks, content: bytes) -> DAGLink:
+    writer = File.create_writer(blocks)
+    writer.write(content)
+    return writer.close()
+
+
+Fields = dict[int, list[object]]
+
+
+def _fields(data: bytes) -> Fields:
+    """Decodes protobuf message into values of each field."""
+    fields: Fields = {}
+    offset = 0
+    while offset < len(data):
+        key, offset = codec.read_varint(data, offset)
+        value: object
+        if key & 7 == 0:
+            value, offset = codec.read_varint(data, offset)
+        else:
+            length, offset = codec.read_varint(data, offset)
+            value = data[offset : offset + length]
+            offset += length
+        fields.setdefault(key >> 3, []).append(value)
+    return fields
+
+
+def _decode(block: bytes) -> tuple[list[tuple[str, CID, object]], Fields]:
+    """Decodes dag-pb block into links and fields of the UnixFS data."""
+    node = _fields(block)
+    links = []
+    for value in node.get(2, []):
+        assert isinstance(value, bytes)
+        link = _fields(value)
+        cid, name, tsize = link[1][0], link[2][0], link[3][0]
+        assert isinstance(cid, bytes) and isinstance(name, bytes)
+        links.append((name.decode(), CID.decode(cid), tsize))
+    data = node[1][0]
+    assert isinstance(data, bytes)
+    return links, _fields(data)
+
+
+def test_empty_directory() -> None:
+    blocks = Blocks()
+    link = Directory.create_writer(blocks).close()
+    # `ipfs object new unixfs-dir`
+    assert (
+        str(link.cid) == "bafybeiczsscdsbs7ffqz55asqdf3smv6klcw3gofszvwlyarci47bgf354"
+    )
+    assert link.dagByteLength == 4
+    assert [block.cid for block in blocks.blocks] == [link.cid]
+
+
+def test_flat_directory() -> None:
+    blocks = Blocks()
+    hello = _file(blocks, b"hello world\n")
+    empty = _file(blocks, b"")
+    writer = Directory.create_writer(blocks)
+    writer.set("hello.txt", hello)
+    writer.set("b", empty)
+    writer.set("a", empty)
+    link = writer.close()
+
+    links, data = _decode(blocks.get(link.cid))
+    # Links are sorted by name.
+    assert links == [
+        ("a", empty.cid, empty.dagByteLength),
+        ("b", empty.cid, empty.dagByteLength),
+        ("hello.txt", hello.cid, hello.dagByteLength),
+    ]
+    assert data == {1: [1]}
+    block = blocks.get(link.cid)
+    assert link.dagByteLength == len(block) + hello.dagByteLength + 2 * 6
+    assert writer.close() is link
+
+
+def test_metadata() -> None:
+    blocks = Blocks()
+    writer = Directory.create_writer(blocks, Metadata(0o755, MTime(5)))
+    link = writer.close()
+    assert blocks.get(link.cid).hex() == "0a09080138ed0342020805"
+
+
+def test_duplicate_entries() -> None:
+    blocks = Blocks()
+    hello = _file(blocks, b"hello world\n")
+    empty = _file(blocks, b"")
+    writer = Directory.create_writer(blocks)
+    writer.set("file", hello)
+    with pytest.raises(ValueError):
+        writer.set("file", empty)
+    writer.set("file", empty, overwrite=True)
+    links, _ = _decode(blocks.get(writer.close().cid))
+    assert links == [("file", empty.cid, empty.dagByteLength)]
+
+    with pytest.raises(ValueError):
+        writer.set("other", empty)
+    with pytest.raises(ValueError):
+        Directory.create_writer(blocks).set("", empty)
+
+
+def _walk(
+    blocks: Blocks, cid: CID, depth: int, entries: dict[str, tuple[CID, int]]
+) -> int:
+    """Collects entries of the HAMT checking they are where go-ipfs puts them."""
+    links, fields = _decode(blocks.get(cid))
+    assert fields[1] == [5]
+    assert fields[5] == [0x22]
+    assert fields[6] == [256]
+    indexes = [int(name[:2], 16) for name, _, _ in links]
+    bitfield = sum(1 << index for index in indexes)
+    assert fields[2] == [bitfield.to_bytes((bitfield.bit_length() + 7) // 8, "big")]
+
+    size = len(blocks.get(cid))
+    for (name, child, tsize), index in zip(links, indexes):
+        assert name[:2] == f"{index:02X}"
+        assert isinstance(tsize, int)
+        size += tsize
+        if len(name) == 2:
+            assert tsize == _walk(blocks, child, depth + 1, entries)
+        else:
+            hash = murmur3.digest(name[2:].encode())
+            assert hash[depth] == index
+            entries[name[2:]] = (child, tsize)
+    return size
+
+
+def test_switches_to_hamt() -> None:
+    blocks = Blocks()
+    files = [_file(blocks, bytes([n])) for n in range(4)]
+    settings = Directory.defaults()
+    # Each entry is estimated at 36 bytes of CID and 5 bytes of name.
+    settings.sharding_threshold = 41 * 100
+    writer = Directory.create_writer(blocks, settings=settings)
+    for n in range(99):
+        writer.set(f"f{n:04}", files[n % 4])
+    assert writer.hamt is None
+    writer.set("f0099", files[3])
+    assert writer.hamt is not None
+    for n in range(100, 2000):
+        writer.set(f"f{n:04}", files[n % 4])
+    writer.set("f0000", files[1], overwrite=True)
+    with pytest.raises(ValueError):
+        writer.set("f0001", files[0])
+
+    count = len(blocks.blocks)
+    link = writer.close()
+    # Nested shards precede the root.
+    assert blocks.blocks[-1].cid == link.cid
+    assert len(blocks.blocks) - count > 1
+
+    entries: dict[str, tuple[CID, int]] = {}
+    assert _walk(blocks, link.cid, 0, entries) == link.dagByteLength
+    expected = {
+        f"f{n:04}": (files[n % 4].cid, files[n % 4].dagByteLength) for n in range(2000)
+    }
+    expected["f0000"] = (files[1].cid, files[1].dagByteLength)
+    assert entries == expected
+
+
+@pytest.mark.parametrize("spill", [0, 7, 100])
+@pytest.mark.parametrize(
+    "fanout,cid",
+    [
+        (256, "bafybeigajce4swezimk442vf7ojt2wlz45rzqzchnxdgmujghn626e4era"),
+        (16, "bafybeidjfikepndnh3rnqrkhqq53rku3evffc7ic2g56gnjwbe6jqeefb4"),
+    ],
+)
+def test_spills_entries(spill: int, fanout: int, cid: str) -> None:
+    blocks = Blocks()
+    files = [_file(blocks, bytes([n])) for n in range(4)]
+    settings = Directory.defaults()
+    settings.sharding_threshold = 1
+    settings.fanout = fanout
+    settings.max_buffered_entries = spill
+    writer = Directory.create_writer(blocks, settings=settings)
+    for n in range(3000):
+        writer.set(f"f{n:04}", files[n % 4])
+        if n == 1500:
+            writer.set("f0000", files[1], overwrite=True)
+    assert writer.hamt is not None
+    if spill > 0:
+        assert len(writer.hamt.entries) < spill
+        assert len(writer.hamt.runs) == 3000 // spill
+    # Entries are found whether they were spilled or not.
+    with pytest.raises(ValueError):
+        writer.set("f0002", files[0])
+    with pytest.raises(ValueError):
+        writer.set("f2999", files[0])
+    writer.set("f0001", files[1], overwrite=True)
+
+    link = writer.close()
+    # Same DAG regardless of how entries were spilled.
+    assert str(link.cid) == cid
+    assert blocks.blocks[-1].cid == link.cid
+
+
+def test_sharding_disabled() -> None:
+    blocks = Blocks()
+    empty = _file(blocks, b"")
+    settings = Directory.defaults()
+    settings.sharding_threshold = 0
+    writer = Directory.create_writer(blocks, settings=settings)
+    for n in range(10000):
+        writer.set(str(n), empty)
+    assert writer.hamt is None
+    assert len(_fields(blocks.get(writer.close().cid))[2]) == 10000
+
+
+def test_invalid_fanout() -> None:
+    settings = Directory.defaults()
+    settings.fanout = 100
+    settings.sharding_threshold = 1
+    writer = Directory.create_writer(Blocks(), settings=settings)
+    with pytest.raises(ValueError):
+        writer.set("a", _file(Blocks(), b""))
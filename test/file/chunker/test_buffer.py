@@ -1,5 +1,6 @@
+from itertools import accumulate
 import pytest
-from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.file.chunker.buffer import BufferView, split
 
 
 def test_concat_two_bytes() -> None:
@@ -50,3 +51,110 @@ def test_create() -> None:
     assert buffer[19] == 2
     with pytest.raises(IndexError):
         buffer[20]
+
+
+def test_split() -> None:
+    buffer = BufferView().extend(bytes([1] * 5)).extend(bytes([2] * 5))
+    buffer = buffer.extend(bytes([3] * 5))
+
+    chunks, rest = split(buffer, [4, 0, 4, 4])
+    assert [bytes(chunk) for chunk in chunks] == [
+        bytes([1, 1, 1, 1]),
+        bytes([1, 2, 2, 2]),
+        bytes([2, 2, 3, 3]),
+    ]
+    assert [chunk.byte_length for chunk in chunks] == [4, 4, 4]
+    assert [chunk.byte_offset for chunk in chunks] == [0, 4, 8]
+    assert len(chunks[1].segments) == 2
+
+    assert bytes(rest) == bytes([3, 3, 3])
+    assert rest.byte_offset == 12
+    assert rest.byte_length == 3
+    # fully consumed segments are not referenced by the remainder
+    assert len(rest.segments) == 1
+
+
+def test_split_at_segment_boundary() -> None:
+    buffer = BufferView().extend(bytes([1] * 4)).extend(bytes([2] * 4))
+    chunks, rest = split(buffer, [4])
+    assert [bytes(chunk) for chunk in chunks] == [bytes([1] * 4)]
+    assert len(chunks[0].segments) == 1
+    assert bytes(rest) == bytes([2] * 4)
+    assert len(rest.segments) == 1
+
+    chunks, rest = split(buffer, [4, 4])
+    assert len(chunks) == 2
+    assert rest.byte_length == 0
+    assert rest.segments == []
+
+
+def test_split_past_end() -> None:
+    buffer = BufferView().extend(bytes([1] * 4))
+    with pytest.raises(ValueError):
+        split(buffer, [3, 3])
+
+
+def test_copy_to() -> None:
+    buffer = BufferView().extend(bytes([1] * 3)).extend(bytes([2] * 2))
+    target = memoryview(bytearray(7))
+    out = buffer.copy_to(target, 1)
+    assert out is target
+    assert bytes(out) == bytes([0, 1, 1, 1, 2, 2, 0])
+
+
+def test_tobytes() -> None:
+    buffer = BufferView().extend(bytes([1] * 3)).extend(bytes([2] * 2))
+    assert buffer.tobytes() == bytes([1, 1, 1, 2, 2])
+    assert bytes(buffer[2:4]) == bytes([1, 2])
+    assert bytes(buffer[1:2]) == bytes([1])
+    assert BufferView().tobytes() == bytes()
+
+
+def test_as_memoryview() -> None:
+    source = bytearray([1, 2, 3, 4])
+    buffer = BufferView().extend(memoryview(source))
+    view = buffer[1:3].as_memoryview()
+    assert bytes(view) == bytes([2, 3])
+    # single segment views share memory with the source
+    source[1] = 9
+    assert bytes(view) == bytes([9, 3])
+
+    buffer = buffer.extend(memoryview(bytes([5])))
+    view = buffer[2:5].as_memoryview()
+    assert bytes(view) == bytes([3, 4, 5])
+
+
+def test_index_and_slice_match_bytes() -> None:
+    expect = bytes(range(256)) * 4
+    buffer = BufferView()
+    offset = 0
+    size = 0
+    while offset < len(expect):
+        buffer = buffer.extend(memoryview(expect[offset : offset + size]))
+        offset += size
+        size = size % 13 + 1
+
+    assert len(buffer) == len(expect)
+    assert buffer.offsets[-1] == len(expect)
+    for index in [0, 1, 12, 13, 500, len(expect) - 1, -1, -len(expect)]:
+        assert buffer[index] == expect[index]
+    for start in range(0, len(expect), 37):
+        for end in range(start - 40, len(expect) + 40, 53):
+            view = buffer[start:end]
+            assert bytes(view) == expect[start:end]
+            assert len(view) == len(expect[start:end])
+            assert view.offsets == [*accumulate(map(len, view.segments))]
+    assert bytes(buffer[-10:]) == expect[-10:]
+    assert bytes(buffer[:-10]) == expect[:-10]
+
+
+def test_extend_leaves_buffer_intact() -> None:
+    first = BufferView().extend(memoryview(b"ab"))
+    second = first.extend(memoryview(b"cd"))
+    assert bytes(first) == b"ab"
+    assert bytes(second) == b"abcd"
+
+    segments = [memoryview(b"ef")]
+    third = BufferView.create(segments).extend(memoryview(b"gh"))
+    assert len(segments) == 1
+    assert bytes(third) == b"efgh"
@@ -0,0 +1,45 @@
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+
+
+def test_write_appends_to_buffer() -> None:
+    state = Chunker.open(FixedSizeChunker(4))
+    state = Chunker.write(state, memoryview(bytes([1, 2, 3])))
+    assert list(state.chunks) == []
+    assert bytes(state.buffer) == bytes([1, 2, 3])
+
+    state = Chunker.write(state, memoryview(bytes([4, 5, 6, 7, 8, 9])))
+    assert [bytes(chunk) for chunk in state.chunks] == [
+        bytes([1, 2, 3, 4]),
+        bytes([5, 6, 7, 8]),
+    ]
+    assert bytes(state.buffer) == bytes([9])
+    assert state.buffer.byte_offset == 8
+
+
+def test_write_empty() -> None:
+    state = Chunker.open(FixedSizeChunker(4))
+    state = Chunker.write(state, memoryview(bytes([1, 2])))
+    state = Chunker.write(state, memoryview(bytes()))
+    assert list(state.chunks) == []
+    assert bytes(state.buffer) == bytes([1, 2])
+
+
+def test_close_flushes_remainder() -> None:
+    state = Chunker.open(FixedSizeChunker(4))
+    state = Chunker.write(state, memoryview(bytes(range(6))))
+    state = Chunker.close(state)
+    assert [bytes(chunk) for chunk in state.chunks] == [bytes([4, 5])]
+    assert state.buffer.byte_length == 0
+
+
+def test_close_empty() -> None:
+    state = Chunker.close(Chunker.open(FixedSizeChunker(4)))
+    assert list(state.chunks) == []
+
+
+def test_consumed_segments_are_released() -> None:
+    state = Chunker.open(FixedSizeChunker(4))
+    for _ in range(1000):
+        state = Chunker.write(state, memoryview(bytes(3)))
+        assert len(state.buffer.segments) <= 2
@@ -0,0 +1,180 @@
+import random
+import pytest
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.buffer import BufferView
+import ipld_unixfs.file.chunker.fastcdc as FastCDC
+from ipld_unixfs.file.chunker.fastcdc import GEAR, FastCDCChunker, FastCDCContext
+
+
+def _reference_cut(context: FastCDCContext, data: bytes, end: bool) -> list[int]:
+    """
+    Straightforward port of the FastCDC algorithm rolling the fingerprint one
+    byte at a time.
+    """
+    chunks = []
+    start = 0
+    while len(data) - start > context.min_chunk_size:
+        size = len(data) - start
+        if size >= context.max_chunk_size:
+            size = context.max_chunk_size
+        normal = min(context.avg_chunk_size, size)
+
+        fingerprint = 0
+        found = -1
+        for index in range(context.min_chunk_size, size):
+            fingerprint = ((fingerprint << 1) + GEAR[data[start + index]]) & 0xFFFFFFFF
+            mask = context.mask_s if index < normal else context.mask_l
+            if fingerprint & mask == 0:
+                found = index
+                break
+
+        if found < 0:
+            if size < context.max_chunk_size:
+                break
+            found = size
+        chunks.append(found)
+        start += found
+
+    if end and start < len(data):
+        chunks.append(len(data) - start)
+    return chunks
+
+
+def _random(seed: int, size: int) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def test_api() -> None:
+    chunker = FastCDCChunker()
+    assert chunker.name == "fastcdc"
+    assert chunker.type == "Stateless"
+    assert isinstance(chunker.context, FastCDCContext)
+    assert chunker.context.min_chunk_size == 65536
+    assert chunker.context.avg_chunk_size == 262144
+    assert chunker.context.max_chunk_size == 1048576
+    assert chunker.context.mask_s == 0xFFFFE000
+    assert chunker.context.mask_l == 0xFFFF8000
+
+
+def test_invalid_context() -> None:
+    with pytest.raises(ValueError):
+        FastCDCChunker(64, min_chunk_size=128)
+    with pytest.raises(ValueError):
+        FastCDCChunker(64, max_chunk_size=32)
+    with pytest.raises(ValueError):
+        FastCDCChunker(4, normalization=2)
+    with pytest.raises(ValueError):
+        FastCDCChunker(1 << 31, normalization=2)
+
+
+@pytest.mark.parametrize("end", [False, True])
+@pytest.mark.parametrize("avg", [256, 1024])
+def test_matches_reference(end: bool, avg: int) -> None:
+    data = _random(7, 60000)
+    chunker = FastCDCChunker(avg)
+    cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), end)
+    assert cuts == _reference_cut(chunker.context, data, end)
+    assert len(cuts) > 20
+    assert all(size >= chunker.context.min_chunk_size for size in cuts[:-1])
+    assert all(size <= chunker.context.max_chunk_size for size in cuts)
+    if end:
+        assert sum(cuts) == len(data)
+
+
+def test_cuts_at_max_chunk_size() -> None:
+    chunker = FastCDCChunker(1024)
+    # fingerprint of the zero bytes settles on a value with mask bits set
+    data = bytes(20000)
+    cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), True)
+    assert cuts == _reference_cut(chunker.context, data, True)
+    assert cuts[0] == chunker.context.max_chunk_size
+
+
+def test_short_buffer() -> None:
+    chunker = FastCDCChunker(256)
+    buffer = BufferView.create([memoryview(bytes(10))])
+    assert chunker.cut(chunker.context, buffer) == []
+    assert chunker.cut(chunker.context, buffer, True) == [10]
+    assert chunker.cut(chunker.context, BufferView(), True) == []
+
+
+def test_carry_over() -> None:
+    data = _random(5, 40000)
+    chunker = FastCDCChunker(512)
+    expect = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), True)
+
+    # Feed data in pieces carrying over the bytes that were not cut.
+    cuts: list[int] = []
+    rest = b""
+    for offset in range(0, len(data), 3000):
+        rest += data[offset : offset + 3000]
+        sizes = chunker.cut(chunker.context, BufferView.create([memoryview(rest)]))
+        cuts.extend(sizes)
+        rest = rest[sum(sizes) :]
+    cuts.extend(
+        chunker.cut(chunker.context, BufferView.create([memoryview(rest)]), True)
+    )
+
+    assert cuts == expect
+
+
+def test_boundaries_survive_edits() -> None:
+    data = _random(11, 30000)
+    edited = data[:15000] + b"edit" + data[15000:]
+    chunker = FastCDCChunker(512)
+
+    def chunks(data: bytes) -> set[bytes]:
+        cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), True)
+        result = set()
+        offset = 0
+        for size in cuts:
+            result.add(data[offset : offset + size])
+            offset += size
+        return result
+
+    before = chunks(data)
+    after = chunks(edited)
+    assert len(before - after) <= 2
+
+
+def test_scans_in_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FastCDC, "SCAN_BLOCK_SIZE", 7)
+    data = _random(3, 20000)
+    chunker = FastCDCChunker(256)
+    cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), True)
+    assert cuts == _reference_cut(chunker.context, data, True)
+
+
+@pytest.mark.parametrize("size", [1, 7, 100, 4096])
+def test_small_writes(size: int) -> None:
+    data = _random(5, 20000)
+    chunker = FastCDCChunker(512)
+    state = Chunker.open(chunker)
+    cuts: list[int] = []
+    for offset in range(0, len(data), size):
+        state = Chunker.write(state, memoryview(data[offset : offset + size]))
+        cuts.extend(chunk.byte_length for chunk in state.chunks)
+    cuts.extend(chunk.byte_length for chunk in Chunker.close(state).chunks)
+    assert cuts == _reference_cut(chunker.context, data, True)
+
+
+def test_small_writes_are_not_rescanned(monkeypatch: pytest.MonkeyPatch) -> None:
+    searched = 0
+    fingerprints = FastCDC._fingerprints
+
+    def count(data: bytes) -> bytes:
+        nonlocal searched
+        searched += len(data)
+        return fingerprints(data)
+
+    monkeypatch.setattr(FastCDC, "_fingerprints", count)
+    data = _random(9, 50000)
+    chunker = FastCDCChunker(4096)
+    state = Chunker.open(chunker)
+    for offset in range(0, len(data), 64):
+        state = Chunker.write(state, memoryview(data[offset : offset + 64]))
+    Chunker.close(state)
+    # Besides the bytes preceding each block within the fingerprint width,
+    # every byte is fingerprinted at most once.
+    assert searched <= len(data) * FastCDC.FINGERPRINT_BITS // 64 + len(data)
@@ -0,0 +1,179 @@
+import random
+import pytest
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.buffer import BufferView
+import ipld_unixfs.file.chunker.rabin as Rabin
+from ipld_unixfs.file.chunker.rabin import RabinChunker, RabinContext
+
+
+def _reference_cut(context: RabinContext, data: bytes, end: bool) -> list[int]:
+    """
+    Straightforward port of the go-ipfs rabin chunker rolling the fingerprint
+    one byte at a time.
+    """
+    polynomial = context.polynomial
+    degree = polynomial.bit_length() - 1
+    shift = degree - 8
+
+    def mod(value: int) -> int:
+        while value.bit_length() > degree:
+            value ^= polynomial << (value.bit_length() - degree - 1)
+        return value
+
+    def append(digest: int, byte: int) -> int:
+        return mod((digest << 8) | byte)
+
+    out = []
+    for byte in range(256):
+        digest = append(0, byte)
+        for _ in range(context.window_size - 1):
+            digest = append(digest, 0)
+        out.append(digest)
+    table = [mod(byte << degree) | (byte << degree) for byte in range(256)]
+
+    chunks = []
+    start = 0
+    while True:
+        window = [0] * context.window_size
+        position = 0
+        digest = 0
+        # reset slides in a single 1 byte
+        window[0] = 1
+        position = 1
+        digest = append(digest, 1)
+
+        count = 0
+        found = False
+        for byte in data[start:]:
+            digest ^= out[window[position]]
+            window[position] = byte
+            position = (position + 1) % context.window_size
+            digest = ((digest << 8) | byte) ^ table[digest >> shift]
+            count += 1
+            if count < context.min_chunk_size:
+                continue
+            if digest & context.mask == 0 or count >= context.max_chunk_size:
+                found = True
+                break
+        if not found:
+            break
+        chunks.append(count)
+        start += count
+
+    if end and start < len(data):
+        chunks.append(len(data) - start)
+    return chunks
+
+
+def test_api() -> None:
+    chunker = RabinChunker()
+    assert chunker.name == "rabin"
+    assert chunker.type == "Stateless"
+    assert isinstance(chunker.context, RabinContext)
+    assert chunker.context.min_chunk_size == 87381
+    assert chunker.context.max_chunk_size == 393216
+    assert chunker.context.bits == 18
+    assert chunker.context.window_size == 16
+    assert chunker.context.polynomial == 17437180132763653
+
+
+def test_invalid_context() -> None:
+    with pytest.raises(ValueError):
+        RabinChunker(64, min_chunk_size=8)
+    with pytest.raises(ValueError):
+        RabinChunker(64, min_chunk_size=32, max_chunk_size=16)
+
+
+@pytest.mark.parametrize("end", [False, True])
+def test_matches_reference(end: bool) -> None:
+    rng = random.Random(7)
+    data = bytes(rng.getrandbits(8) for _ in range(40000))
+    chunker = RabinChunker(256)
+    cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), end)
+    assert cuts == _reference_cut(chunker.context, data, end)
+    assert len(cuts) > 20
+    assert all(size >= chunker.context.min_chunk_size for size in cuts[:-1])
+    assert all(size <= chunker.context.max_chunk_size for size in cuts)
+    if end:
+        assert sum(cuts) == len(data)
+
+
+def test_cuts_at_max_chunk_size() -> None:
+    chunker = RabinChunker(1024)
+    # fingerprint of the repeated byte never has boundary bits unset
+    data = bytes([1]) * 10000
+    cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), True)
+    assert cuts == _reference_cut(chunker.context, data, True)
+    assert cuts[0] == chunker.context.max_chunk_size
+
+
+def test_short_buffer() -> None:
+    chunker = RabinChunker(256)
+    buffer = BufferView.create([memoryview(bytes(10))])
+    assert chunker.cut(chunker.context, buffer) == []
+    assert chunker.cut(chunker.context, buffer, True) == [10]
+    assert chunker.cut(chunker.context, BufferView(), True) == []
+
+
+def test_boundaries_survive_edits() -> None:
+    rng = random.Random(11)
+    data = bytes(rng.getrandbits(8) for _ in range(30000))
+    edited = data[:15000] + b"edit" + data[15000:]
+    chunker = RabinChunker(512)
+
+    def chunks(data: bytes) -> set[bytes]:
+        cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), True)
+        result = set()
+        offset = 0
+        for size in cuts:
+            result.add(data[offset : offset + size])
+            offset += size
+        return result
+
+    before = chunks(data)
+    after = chunks(edited)
+    assert len(before - after) <= 2
+
+
+def test_scans_in_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Rabin, "SCAN_BLOCK_SIZE", 7)
+    rng = random.Random(3)
+    data = bytes(rng.getrandbits(8) for _ in range(20000))
+    chunker = RabinChunker(256)
+    cuts = chunker.cut(chunker.context, BufferView.create([memoryview(data)]), True)
+    assert cuts == _reference_cut(chunker.context, data, True)
+
+
+@pytest.mark.parametrize("size", [1, 7, 100, 4096])
+def test_small_writes(size: int) -> None:
+    rng = random.Random(5)
+    data = bytes(rng.getrandbits(8) for _ in range(20000))
+    chunker = RabinChunker(512)
+    state = Chunker.open(chunker)
+    cuts: list[int] = []
+    for offset in range(0, len(data), size):
+        state = Chunker.write(state, memoryview(data[offset : offset + size]))
+        cuts.extend(chunk.byte_length for chunk in state.chunks)
+    cuts.extend(chunk.byte_length for chunk in Chunker.close(state).chunks)
+    assert cuts == _reference_cut(chunker.context, data, True)
+
+
+def test_small_writes_are_not_rescanned(monkeypatch: pytest.MonkeyPatch) -> None:
+    searched = 0
+    search = Rabin.boundary
+
+    def boundary(context: RabinContext, data: bytes, first: int, last: int) -> int:
+        nonlocal searched
+        searched += max(0, last - first)
+        return search(context, data, first, last)
+
+    monkeypatch.setattr(Rabin, "boundary", boundary)
+    rng = random.Random(9)
+    data = bytes(rng.getrandbits(8) for _ in range(50000))
+    chunker = RabinChunker(4096)
+    state = Chunker.open(chunker)
+    for offset in range(0, len(data), 64):
+        state = Chunker.write(state, memoryview(data[offset : offset + 64]))
+    Chunker.close(state)
+    # Every byte is searched at most once.
+    assert searched <= len(data)
@@ -1,3 +1,4 @@
+from array import array
 from ipld_unixfs.file.layout.api import Branch, Leaf
 import ipld_unixfs.file.layout.balanced as Balanced
 from ipld_unixfs.file.chunker.buffer import BufferView
@@ -114,3 +115,40 @@ def test_overflows_into_second_node_at_width_boundary() -> None:
     assert list(result.leaves) == []
     assert result.nodes == [Branch(6, [4], None)]
     assert result.root == Branch(7, [5, 6], None)
+
+
+def test_deep_tree_propagates_nodes_into_upper_rows() -> None:
+    file = range(10)
+    layout = Balanced.open(width=3)
+    result = Balanced.write(
+        layout, [BufferView.create([file[n : n + 1]]) for n in range(10)]
+    )
+    assert result.nodes == [
+        Branch(11, [1, 2, 3], None),
+        Branch(12, [4, 5, 6], None),
+        Branch(13, [7, 8, 9], None),
+    ]
+
+    result = Balanced.close(result.layout)
+    assert result.nodes == [
+        Branch(14, [10], None),
+        Branch(15, [11, 12, 13], None),
+        Branch(16, [14], None),
+    ]
+    assert result.root == Branch(17, [15, 16], None)
+
+
+def test_nodes_hold_children_in_arrays() -> None:
+    layout = Balanced.open(width=3)
+    chunks = [BufferView.create([memoryview(bytes([n]))]) for n in range(10)]
+    result = Balanced.write(layout, chunks)
+    assert result.nodes == [
+        Branch(11, [1, 2, 3], None),
+        Branch(12, [4, 5, 6], None),
+        Branch(13, [7, 8, 9], None),
+    ]
+    assert result.nodes[0].children == array("Q", [1, 2, 3])
+    assert result.layout.leaf_index == array("Q", [10])
+    assert result.layout.node_index == [array("Q", [11, 12, 13])]
+    assert not hasattr(result.nodes[0], "__dict__")
+    assert not hasattr(result.leaves[0], "__dict__")
@@ -0,0 +1,130 @@
+from typing import Iterator, Union
+import pytest
+from ipld_unixfs.file.layout.api import Branch, Leaf, Node
+import ipld_unixfs.file.layout.trickle as Trickle
+from ipld_unixfs.file.chunker.buffer import BufferView
+
+Tree = Union[int, list["Tree"]]
+
+
+def _reference(options: Trickle.Options, count: int) -> Tree:
+    """
+    Port of the go-ipfs trickle importer producing nested lists of leaf
+    numbers.
+    """
+    leaves = iter(range(1, count + 1))
+    pending: list[int] = []
+
+    def done() -> bool:
+        if pending:
+            return False
+        leaf = next(leaves, None)
+        if leaf is None:
+            return True
+        pending.append(leaf)
+        return False
+
+    def fill(max_depth: int) -> list[Tree]:
+        node: list[Tree] = []
+        while len(node) < options.max_direct_leaves and not done():
+            node.append(pending.pop())
+        depth = 1
+        while max_depth == -1 or depth < max_depth:
+            if done():
+                break
+            repeat = 0
+            while repeat < options.layer_repeat and not done():
+                node.append(fill(depth))
+                repeat += 1
+            depth += 1
+        return node
+
+    return fill(-1)
+
+
+def _chunks(count: int) -> Iterator[BufferView]:
+    for n in range(count):
+        yield BufferView.create([memoryview(bytes([n % 256]))])
+
+
+def _build(options: Trickle.Options, count: int, batch: int) -> tuple[Tree, int]:
+    layout = Trickle.open(options)
+    chunks = list(_chunks(count))
+    nodes: dict[int, Node] = {}
+    emitted: set[int] = set()
+
+    def collect(branches: list[Branch], leaves: list[Leaf]) -> None:
+        for leaf in leaves:
+            nodes[leaf.id] = leaf
+        for branch in branches:
+            # children are emitted before the node linking to them
+            assert all(child in nodes for child in branch.children)
+            nodes[branch.id] = branch
+
+    depth = 0
+    for offset in range(0, count, batch):
+        result = Trickle.write(layout, chunks[offset : offset + batch])
+        collect(list(result.nodes), list(result.leaves))
+        layout = result.layout
+        depth = max(depth, len(layout.stack))
+    result = Trickle.close(layout)
+    collect(list(result.nodes), list(result.leaves))
+    nodes[result.root.id] = result.root
+
+    leaf_numbers = {
+        leaf.id: n + 1
+        for n, leaf in enumerate(
+            sorted(
+                (node for node in nodes.values() if isinstance(node, Leaf)),
+                key=lambda leaf: leaf.id,
+            )
+        )
+    }
+
+    def tree(node: Node) -> Tree:
+        if isinstance(node, Leaf):
+            return leaf_numbers[node.id]
+        return [tree(nodes[child]) for child in node.children]
+
+    return tree(result.root), depth
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 9, 17, 40, 100, 257])
+@pytest.mark.parametrize("batch", [1, 7])
+def test_matches_reference(count: int, batch: int) -> None:
+    options = Trickle.Options(3, 2)
+    tree, _ = _build(options, count, batch)
+    assert tree == _reference(options, count)
+
+
+def test_default_options() -> None:
+    tree, depth = _build(Trickle.defaults, 5000, 100)
+    assert tree == _reference(Trickle.defaults, 5000)
+    # only nodes being filled are held on to
+    assert depth <= 4
+
+
+def test_empty_produces_empty_leaf_node() -> None:
+    result = Trickle.close(Trickle.open())
+    assert result.root == Leaf(1, None, None)
+    assert list(result.nodes) == []
+
+
+def test_single_leaf_is_linked_from_root() -> None:
+    # go-ipfs trickle importer links even a single leaf from a root node.
+    chunk = BufferView.create([memoryview(b"abc")])
+    result = Trickle.write(Trickle.open(), [chunk])
+    assert list(result.leaves) == [Leaf(1, chunk, None)]
+    result = Trickle.close(result.layout)
+    assert isinstance(result.root, Branch)
+    assert list(result.root.children) == [1]
+
+
+def test_does_not_mutate_layout() -> None:
+    options = Trickle.Options(3, 2)
+    layout = Trickle.write(Trickle.open(options), list(_chunks(7))).layout
+    stack = [list(frame.children) for frame in layout.stack]
+    Trickle.write(layout, list(_chunks(5)))
+    Trickle.close(layout)
+    assert [list(frame.children) for frame in layout.stack] == stack
+    assert layout.last_id == 8
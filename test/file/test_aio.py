@@ -0,0 +1,122 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import pytest
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+import ipld_unixfs.file.layout.balanced as Balanced
+from ipld_unixfs.unixfs import Block
+from test.helpers import Blocks, balanced_settings
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.mark.parametrize("threads", [False, True])
+def test_matches_sync_writer(threads: bool) -> None:
+    expect = Blocks()
+    writer = File.create_writer(
+        expect, settings=balanced_settings(FixedSizeChunker(64), 4)
+    )
+    for offset in range(0, len(CONTENT), 1000):
+        writer.write(CONTENT[offset : offset + 1000])
+    link = writer.close()
+
+    async def run(executor: Optional[ThreadPoolExecutor]) -> list[Block]:
+        writer = File.create_async_writer(
+            settings=balanced_settings(FixedSizeChunker(64), 4),
+            max_queued_blocks=2,
+            executor=executor,
+        )
+
+        async def produce() -> None:
+            for offset in range(0, len(CONTENT), 1000):
+                await writer.write(CONTENT[offset : offset + 1000])
+            assert (await writer.close()).cid == link.cid
+
+        task = asyncio.create_task(produce())
+        blocks = [block async for block in writer.blocks()]
+        await task
+        return blocks
+
+    with ThreadPoolExecutor(1) as executor:
+        blocks = asyncio.run(run(executor if threads else None))
+    assert blocks == expect.blocks
+
+
+def test_backpressure() -> None:
+    async def run() -> None:
+        writer = File.create_async_writer(
+            settings=balanced_settings(FixedSizeChunker(64), 4), max_queued_blocks=3
+        )
+        # One write producing far more blocks than fit into the queue does
+        # not complete until blocks are consumed.
+        write = asyncio.create_task(writer.write(CONTENT))
+        await asyncio.sleep(0.01)
+        assert not write.done()
+        assert writer.queue is not None and writer.queue.full()
+
+        async def consume() -> int:
+            return len([block async for block in writer.blocks()])
+
+        consumer = asyncio.create_task(consume())
+        await write
+        await writer.close()
+        # 160 leaves, 40 + 10 + 3 + 1 branches
+        assert await consumer == 214
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("threads", [False, True])
+def test_large_write_is_queued_as_produced(threads: bool) -> None:
+    async def run(executor: Optional[ThreadPoolExecutor]) -> None:
+        writer = File.create_async_writer(
+            settings=balanced_settings(FixedSizeChunker(64), 4),
+            max_queued_blocks=3,
+            executor=executor,
+            write_size=640,
+        )
+        write = asyncio.create_task(writer.write(CONTENT))
+        await asyncio.sleep(0.05)
+        assert not write.done()
+        assert writer.queue is not None and writer.queue.full()
+        # Only blocks of a single piece (10 leaves and the branches they
+        # complete) are held outside of the queue, or none with the executor.
+        assert len(writer.sink.blocks) <= (0 if threads else 14)
+
+        consumer = asyncio.create_task(_count(writer))
+        await write
+        await writer.close()
+        assert await consumer == 214
+
+    with ThreadPoolExecutor(1) as executor:
+        asyncio.run(run(executor if threads else None))
+
+
+def test_created_outside_of_event_loop() -> None:
+    writer = File.create_async_writer(
+        settings=balanced_settings(FixedSizeChunker(64), 4)
+    )
+    assert writer.queue is None
+
+    async def run() -> int:
+        consumer = asyncio.create_task(_count(writer))
+        await writer.write(CONTENT)
+        await writer.close()
+        return await consumer
+
+    assert asyncio.run(run()) == 214
+
+
+async def _count(writer: File.AsyncFileWriter[Balanced.Balanced]) -> int:
+    return len([block async for block in writer.blocks()])
+
+
+def test_write_after_close_fails() -> None:
+    async def run() -> None:
+        writer = File.create_async_writer()
+        await writer.close()
+        with pytest.raises(ValueError):
+            await writer.write(b"hello")
+
+    asyncio.run(run())
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import pytest
+from multiformats import multihash
+import ipld_unixfs.file as File
+import ipld_unixfs.file.checkpoint as Checkpoint
+from ipld_unixfs.file.chunker.fastcdc import FastCDCChunker
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+import ipld_unixfs.file.layout.balanced as Balanced
+import ipld_unixfs.file.layout.trickle as Trickle
+from ipld_unixfs.unixfs import Metadata
+from test.helpers import Blocks, balanced_settings
+
+
+def _settings(cdc: bool = False) -> File.Settings[Balanced.Balanced]:
+    chunker = FastCDCChunker(1024) if cdc else FixedSizeChunker(1000)
+    return balanced_settings(chunker, 3, raw=True)
+
+
+@pytest.mark.parametrize("size", [0, 500, 1000, 1500, 20_000, 100_000])
+@pytest.mark.parametrize("split", [0, 1, 999, 1000, 9_999, 10_500, 25_000])
+@pytest.mark.parametrize("cdc", [False, True])
+def test_resume(size: int, split: int, cdc: bool) -> None:
+    content = os.urandom(size)
+    split = min(split, size)
+    metadata = Metadata(0o644)
+
+    expect = Blocks()
+    writer = File.create_writer(expect, metadata, _settings(cdc))
+    writer.write(content)
+    link = writer.close()
+
+    blocks = Blocks()
+    writer = File.create_writer(blocks, metadata, _settings(cdc))
+    writer.write(content[: split // 2])
+    writer.write(content[split // 2 : split])
+    assert Checkpoint.byte_length(writer) == split
+    checkpoint = Checkpoint.checkpoint(writer)
+    written = len(blocks.blocks)
+
+    resumed = Checkpoint.resume(checkpoint, blocks, metadata, _settings(cdc))
+    assert Checkpoint.byte_length(resumed) == split
+    resumed.write(content[split:])
+    assert resumed.close().cid == link.cid
+    # Blocks written before the checkpoint are not written again.
+    assert sorted(bytes(block.bytes) for block in blocks.blocks) == sorted(
+        bytes(block.bytes) for block in expect.blocks
+    )
+    assert written <= len(blocks.blocks)
+
+
+def test_checkpoint_is_compact() -> None:
+    blocks = Blocks()
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(1000)
+    writer = File.create_writer(blocks, settings=settings)
+    writer.write(os.urandom(500_500))
+    checkpoint = Checkpoint.checkpoint(writer)
+    # Links of the pending leaves and the residual 500 bytes.
+    assert len(checkpoint) < 500 * 50
+
+
+def test_executor() -> None:
+    content = os.urandom(50_000)
+    blocks = Blocks()
+    with ThreadPoolExecutor(2) as executor:
+        writer = File.create_writer(
+            blocks, settings=_settings(), executor=executor, max_pending=4
+        )
+        writer.write(content[:30_000])
+        checkpoint = Checkpoint.checkpoint(writer)
+    resumed = Checkpoint.resume(checkpoint, blocks, settings=_settings())
+    resumed.write(content[30_000:])
+
+    expect = File.create_writer(Blocks(), settings=_settings())
+    expect.write(content)
+    assert resumed.close().cid == expect.close().cid
+
+    # Leaves still being encoded by the executor are counted.
+    settings = _settings()
+    settings.file_layout = Balanced.with_width(100)
+    with ThreadPoolExecutor(2) as executor:
+        writer = File.create_writer(
+            Blocks(), settings=settings, executor=executor, max_pending=8
+        )
+        writer.write(content[:5500])
+        assert Checkpoint.byte_length(writer) == 5500
+
+
+def _invalid(
+    settings: File.Settings[Balanced.Balanced], data: Optional[bytes] = None
+) -> None:
+    writer = File.create_writer(Blocks(), settings=_settings())
+    writer.write(bytes(5000))
+    checkpoint = Checkpoint.checkpoint(writer) if data is None else data
+    Checkpoint.resume(checkpoint, Blocks(), settings=settings)
+
+
+def test_invalid() -> None:
+    settings = _settings()
+    settings.file_layout = Balanced.with_width(4)
+    with pytest.raises(ValueError):
+        _invalid(settings)
+    with pytest.raises(ValueError):
+        _invalid(_settings(cdc=True))
+    settings = _settings()
+    settings.chunker = FixedSizeChunker(2000)
+    with pytest.raises(ValueError):
+        _invalid(settings)
+    settings = _settings()
+    settings.file_chunk_encoder = File.UnixFSLeaf()
+    with pytest.raises(ValueError):
+        _invalid(settings)
+    settings = _settings()
+    settings.hasher = multihash.get("sha2-512")
+    with pytest.raises(ValueError):
+        _invalid(settings)
+    with pytest.raises(ValueError):
+        _invalid(_settings(), b"nope")
+    with pytest.raises(ValueError):
+        _invalid(_settings(), Checkpoint.MAGIC + b"\x01")
+
+    writer = File.create_writer(Blocks(), settings=_settings())
+    writer.close()
+    with pytest.raises(ValueError):
+        Checkpoint.checkpoint(writer)
+
+    settings = File.defaults()
+    settings.file_layout = Trickle.with_options()
+    with pytest.raises(TypeError):
+        Checkpoint.checkpoint(File.create_writer(Blocks(), settings=settings))
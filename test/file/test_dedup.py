@@ -0,0 +1,131 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import pytest
+from multiformats import CID, multihash
+import ipld_unixfs.file as File
+from ipld_unixfs.blockstore import LRUBlockStore
+from ipld_unixfs.file.chunker.fastcdc import FastCDCChunker
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.unixfs import Block, FileLink
+from test.helpers import Blocks
+
+
+def _write(
+    blocks: Blocks,
+    content: bytes,
+    dedup: File.DedupCache,
+    settings: Optional[File.Settings[object]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> FileLink:
+    if settings is None:
+        settings = File.defaults()
+        settings.chunker = FixedSizeChunker(1000)
+        settings.file_chunk_encoder = File.UnixFSRawLeaf()
+    writer = File.create_writer(
+        blocks, settings=settings, executor=executor, dedup=dedup
+    )
+    writer.write(content)
+    return writer.close()
+
+
+def test_skips_repeated_leaves() -> None:
+    content = os.urandom(10_000)
+    blocks = Blocks()
+    dedup = File.create_cache()
+    link = _write(blocks, content, dedup)
+    assert (dedup.hits, dedup.misses) == (0, 10)
+    count = len(blocks.blocks)
+
+    with ThreadPoolExecutor(2) as executor:
+        assert _write(blocks, content, dedup, executor=executor).cid == link.cid
+    assert (dedup.hits, dedup.misses) == (10, 10)
+    # Only the branch was written again.
+    assert len(blocks.blocks) == count + 1
+    assert len({block.cid for block in blocks.blocks}) == count
+
+
+def test_repeated_within_file() -> None:
+    blocks = Blocks()
+    dedup = File.create_cache()
+    _write(blocks, bytes(10_000), dedup)
+    assert (dedup.hits, dedup.misses) == (9, 1)
+    assert len(blocks.blocks) == 2
+
+
+def test_content_defined_chunks() -> None:
+    content = os.urandom(1 << 20)
+    settings = File.defaults()
+    settings.chunker = FastCDCChunker(16384)
+    settings.file_chunk_encoder = File.UnixFSRawLeaf()
+    blocks = Blocks()
+    dedup = File.create_cache()
+    _write(blocks, content, dedup, settings)
+    misses = dedup.misses
+    # Insert a few bytes in the middle, only leaves around it change.
+    _write(blocks, content[:500_000] + b"edit" + content[500_000:], dedup, settings)
+    assert dedup.misses - misses <= 3
+    assert dedup.hits >= misses - 3
+
+
+def test_bounded() -> None:
+    blocks = Blocks()
+    dedup = File.create_cache(max_entries=4)
+    content = os.urandom(10_000)
+    _write(blocks, content, dedup)
+    _write(blocks, content, dedup)
+    # Leaves are seen in the same order, so they are evicted before they
+    # repeat.
+    assert dedup.hits == 0
+    assert len(dedup.entries) == 4
+
+
+def test_store() -> None:
+    store = LRUBlockStore()
+    data = bytes(1000)
+    store.write(Block(CID("base32", 1, 0x55, multihash.digest(data, "sha2-256")), data))
+    blocks = Blocks()
+    dedup = File.create_cache(store=store)
+    _write(blocks, bytes(2000), dedup)
+    assert (dedup.hits, dedup.misses) == (2, 0)
+    assert len(blocks.blocks) == 1
+
+
+class _Failing(Blocks):
+    def write(self, block: Block) -> None:
+        raise OSError("disk full")
+
+
+def test_failed_write_is_not_recorded() -> None:
+    dedup = File.create_cache()
+    content = os.urandom(3000)
+    with pytest.raises(OSError):
+        _write(_Failing(), content, dedup)
+    assert len(dedup.entries) == 0
+
+    # Leaves are written once the writer works.
+    blocks = Blocks()
+    _write(blocks, content, dedup)
+    assert len(blocks.blocks) == 4
+    assert (dedup.hits, dedup.misses) == (0, 3)
+
+
+def test_seen_chunks_are_not_encoded(monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(1000)
+    encoded = 0
+    encode = File.UnixFSLeaf.encode
+
+    def count(self: File.UnixFSLeaf, data: bytes) -> bytes:
+        nonlocal encoded
+        encoded += 1
+        return encode(self, data)
+
+    monkeypatch.setattr(File.UnixFSLeaf, "encode", count)
+    content = os.urandom(5000)
+    dedup = File.create_cache()
+    link = _write(Blocks(), content, dedup, settings)
+    assert encoded == 5
+    assert _write(Blocks(), content, dedup, settings).cid == link.cid
+    assert encoded == 5
+    assert (dedup.hits, dedup.misses) == (5, 5)
@@ -0,0 +1,84 @@
+import gc
+import mmap
+import os
+import weakref
+from pathlib import Path
+import pytest
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.unixfs import Block
+from test.helpers import Blocks, balanced_settings
+
+
+@pytest.mark.parametrize("size", [0, 100, 3000, 50000])
+@pytest.mark.parametrize("raw", [False, True])
+def test_write_file(tmp_path: Path, size: int, raw: bool) -> None:
+    content = os.urandom(size)
+    path = tmp_path / "file"
+    path.write_bytes(content)
+
+    expect = Blocks()
+    writer = File.create_writer(
+        expect, settings=balanced_settings(FixedSizeChunker(3000), 4, raw)
+    )
+    writer.write(content)
+    link = writer.close()
+
+    blocks = Blocks()
+    writer = File.create_writer(
+        blocks, settings=balanced_settings(FixedSizeChunker(3000), 4, raw)
+    )
+    # Smallest window, so that chunks span windows.
+    File.write_file(writer, path, window_size=1)
+    assert writer.close().cid == link.cid
+    # Branches may be emitted at different points, since content is written
+    # in pieces.
+    assert sorted(bytes(block.bytes) for block in blocks.blocks) == sorted(
+        bytes(block.bytes) for block in expect.blocks
+    )
+
+
+def test_raw_leaves_reference_mapping(tmp_path: Path) -> None:
+    path = tmp_path / "file"
+    path.write_bytes(os.urandom(3 * mmap.ALLOCATIONGRANULARITY))
+    blocks = Blocks()
+    writer = File.create_writer(
+        blocks, settings=balanced_settings(FixedSizeChunker(3000), 4, True)
+    )
+    File.write_file(writer, path)
+    writer.close()
+    leaf = blocks.blocks[0].bytes
+    assert isinstance(leaf, memoryview)
+    assert isinstance(leaf.obj, mmap.mmap)
+
+
+class _Windows:
+    """Block writer dropping blocks, while tracking mappings they reference."""
+
+    windows: list["weakref.ref[mmap.mmap]"]
+
+    def __init__(self) -> None:
+        self.windows = []
+
+    def write(self, block: Block) -> None:
+        data = block.bytes
+        if isinstance(data, memoryview) and isinstance(data.obj, mmap.mmap):
+            self.windows.append(weakref.ref(data.obj))
+
+
+def test_windows_are_unmapped(tmp_path: Path) -> None:
+    granularity = mmap.ALLOCATIONGRANULARITY
+    path = tmp_path / "file"
+    path.write_bytes(os.urandom(8 * granularity))
+    sink = _Windows()
+    settings = balanced_settings(FixedSizeChunker(3000), 4, True)
+    settings.chunker = FixedSizeChunker(1024)
+    writer = File.create_writer(sink, settings=settings)
+    File.write_file(writer, path, window_size=granularity)
+    gc.collect()
+    assert len(sink.windows) == 8 * granularity // 1024
+    # Only the window holding the not yet chunked tail is still mapped.
+    assert len({id(window()) for window in sink.windows if window() is not None}) <= 1
+    writer.close()
+    gc.collect()
+    assert all(window() is None for window in sink.windows)
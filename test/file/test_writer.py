@@ -0,0 +1,205 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from multiformats import CID
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+import ipld_unixfs.file.layout.trickle as Trickle
+from ipld_unixfs.unixfs import Metadata
+from test.helpers import Blocks, balanced_settings
+
+
+def test_empty_file() -> None:
+    blocks = Blocks()
+    link = File.create_writer(blocks).close()
+    assert (
+        str(link.cid) == "bafybeif7ztnhq65lumvvtr4ekcwd2ifwgm3awq4zfr3srh462rwyinlb4y"
+    )
+    assert link.contentByteLength == 0
+    assert link.dagByteLength == 6
+    assert [block.cid for block in blocks.blocks] == [link.cid]
+
+
+def test_small_file() -> None:
+    blocks = Blocks()
+    writer = File.create_writer(blocks)
+    writer.write(b"hello world\n")
+    link = writer.close()
+    # `echo "hello world" | ipfs add --cid-version=1`
+    expect = CID.decode("QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o").set(version=1)
+    assert link.cid == expect
+    assert link.contentByteLength == 12
+    assert len(blocks.blocks) == 1
+
+
+def test_small_file_with_metadata() -> None:
+    blocks = Blocks()
+    writer = File.create_writer(blocks, Metadata(mode=0o644))
+    writer.write(b"hello world\n")
+    link = writer.close()
+    assert len(blocks.blocks) == 1
+    assert bytes(blocks.blocks[0].bytes).endswith(b"\x18\x0c\x38\xa4\x03")
+    assert link.cid != CID.decode("QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o")
+
+
+def test_blocks_are_written_before_they_are_linked() -> None:
+    blocks = Blocks()
+    writer = File.create_writer(
+        blocks, settings=balanced_settings(FixedSizeChunker(4), 3)
+    )
+    content = bytes(range(100))
+    for offset in range(0, len(content), 7):
+        writer.write(content[offset : offset + 7])
+    link = writer.close()
+
+    assert link.contentByteLength == 100
+    assert blocks.blocks[-1].cid == link.cid
+    # 25 leaves, 9 + 3 + 1 branches
+    assert len(blocks.blocks) == 38
+    assert link.dagByteLength == sum(len(block.bytes) for block in blocks.blocks)
+
+    written: set[bytes] = set()
+    for block in blocks.blocks:
+        # every CID a branch links to has been written before
+        data = bytes(block.bytes)
+        offset = 0
+        while data[offset] == 0x12:
+            size = data[offset + 1]
+            link_cid = data[offset + 4 : offset + 4 + data[offset + 3]]
+            assert link_cid in written
+            offset += 2 + size
+        written.add(bytes(block.cid))
+
+
+def test_write_in_pieces_matches_single_write() -> None:
+    content = bytes(range(256)) * 40
+
+    whole = Blocks()
+    writer = File.create_writer(
+        whole, settings=balanced_settings(FixedSizeChunker(64), 4)
+    )
+    writer.write(content)
+    expect = writer.close()
+
+    pieces = Blocks()
+    writer = File.create_writer(
+        pieces, settings=balanced_settings(FixedSizeChunker(64), 4)
+    )
+    for offset in range(0, len(content), 100):
+        writer.write(content[offset : offset + 100])
+    link = writer.close()
+
+    assert link.cid == expect.cid
+    assert {block.cid for block in pieces.blocks} == {
+        block.cid for block in whole.blocks
+    }
+
+
+def test_raw_leaves() -> None:
+    settings = balanced_settings(FixedSizeChunker(4), 3)
+    settings.file_chunk_encoder = File.UnixFSRawLeaf()
+    blocks = Blocks()
+    writer = File.create_writer(blocks, settings=settings)
+    content = bytes(range(20))
+    writer.write(content)
+    link = writer.close()
+
+    assert link.contentByteLength == 20
+    leaves = [block for block in blocks.blocks if block.cid.codec.code == 0x55]
+    assert len(leaves) == 5
+    assert b"".join(bytes(leaf.bytes) for leaf in leaves) == content
+    # leaves reference written bytes instead of copying them
+    for leaf in leaves:
+        assert isinstance(leaf.bytes, memoryview)
+        assert leaf.bytes.obj is content
+    assert link.dagByteLength == sum(len(block.bytes) for block in blocks.blocks)
+
+
+def test_raw_small_file() -> None:
+    settings = File.defaults()
+    settings.small_file_encoder = File.UnixFSRawLeaf()
+    blocks = Blocks()
+    writer = File.create_writer(blocks, settings=settings)
+    writer.write(b"hello world\n")
+    link = writer.close()
+    # `echo "hello world" | ipfs add --raw-leaves --cid-version=1`
+    assert (
+        str(link.cid) == "bafkreifjjcie6lypi6ny7amxnfftagclbuxndqonfipmb64f2km2devei4"
+    )
+    assert link.dagByteLength == 12
+
+
+@pytest.mark.parametrize("max_pending", [1, 3, 16])
+def test_executor_matches_sequential(max_pending: int) -> None:
+    content = bytes(range(256)) * 40
+
+    sequential = Blocks()
+    writer = File.create_writer(
+        sequential, settings=balanced_settings(FixedSizeChunker(64), 4)
+    )
+    for offset in range(0, len(content), 1000):
+        writer.write(content[offset : offset + 1000])
+    expect = writer.close()
+
+    parallel = Blocks()
+    with ThreadPoolExecutor(4) as executor:
+        writer = File.create_writer(
+            parallel,
+            settings=balanced_settings(FixedSizeChunker(64), 4),
+            executor=executor,
+            max_pending=max_pending,
+        )
+        for offset in range(0, len(content), 1000):
+            writer.write(content[offset : offset + 1000])
+            assert len(writer.pending) <= max_pending
+        link = writer.close()
+
+    assert link.cid == expect.cid
+    assert parallel.blocks == sequential.blocks
+
+
+def test_trickle_layout() -> None:
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(4)
+    settings.file_layout = Trickle.with_options(Trickle.Options(3, 2))
+    blocks = Blocks()
+    writer = File.create_writer(blocks, settings=settings)
+    writer.write(bytes(range(100)))
+    link = writer.close()
+
+    assert link.contentByteLength == 100
+    assert blocks.blocks[-1].cid == link.cid
+    assert link.dagByteLength == sum(len(block.bytes) for block in blocks.blocks)
+
+
+def test_trickle_single_chunk() -> None:
+    settings = File.defaults()
+    settings.file_layout = Trickle.with_options()
+    blocks = Blocks()
+    writer = File.create_writer(blocks, settings=settings)
+    writer.write(b"hello world\n")
+    link = writer.close()
+
+    # Same as `ipfs add --trickle` the leaf is linked from a root node rather
+    # than being the root, so CID differs from the balanced layout.
+    leaf, root = blocks.blocks
+    assert bytes(leaf.bytes) == bytes.fromhex("0a120802120c") + b"hello world\n" + (
+        b"\x18\x0c"
+    )
+    assert bytes(root.bytes) == (
+        # Link to the leaf with an empty name and the size of the leaf block.
+        bytes.fromhex("122a0a24")
+        + bytes(leaf.cid)
+        + bytes.fromhex("12001814")
+        # File node with 12 bytes of content in a single 12 byte block.
+        + bytes.fromhex("0a060802180c200c")
+    )
+    assert (
+        str(link.cid) == "bafybeiferv5edw6olesv226sxyogcf76z32x4bkro4e375pnmmckdwfngu"
+    )
+
+
+def test_write_after_close_fails() -> None:
+    writer = File.create_writer(Blocks())
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.write(b"hello")
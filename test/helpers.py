@@ -0,0 +1,39 @@
+from typing import Any
+from multiformats import CID
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.api import Chunker
+import ipld_unixfs.file.layout.balanced as Balanced
+from ipld_unixfs.unixfs import Block
+
+
+class Blocks:
+    """Block writer collecting blocks in the order they were written."""
+
+    blocks: list[Block]
+
+    def __init__(self) -> None:
+        self.blocks = []
+
+    def write(self, block: Block) -> None:
+        self.blocks.append(block)
+
+    def get(self, cid: CID) -> bytes:
+        for block in self.blocks:
+            if block.cid == cid:
+                return bytes(block.bytes)
+        raise KeyError(cid)
+
+
+def balanced_settings(
+    chunker: Chunker[Any], width: int, raw: bool = False
+) -> File.Settings[Balanced.Balanced]:
+    """
+    Default settings with the given chunker and balanced layout of the given
+    width, using raw leaves if `raw` is set.
+    """
+    settings = File.defaults()
+    settings.chunker = chunker
+    settings.file_layout = Balanced.with_width(width)
+    if raw:
+        settings.file_chunk_encoder = File.UnixFSRawLeaf()
+    return settings
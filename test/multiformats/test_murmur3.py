@@ -0,0 +1,16 @@
+from ipld_unixfs.multiformats import murmur3
+
+
+def test_hash128() -> None:
+    assert murmur3.hash128(b"") == (0, 0)
+    assert murmur3.hash128(b"hello") == (0xCBD8A7B341BD9B02, 0x5B1E906A48AE1D19)
+    # Exercises full blocks and both halves of the tail.
+    assert murmur3.hash128(b"The quick brown fox jumps over the lazy dog") == (
+        0xE34BBC7BBC071B6C,
+        0x7A433CA9C49A9347,
+    )
+
+
+def test_digest() -> None:
+    assert murmur3.digest(b"hello").hex() == "cbd8a7b341bd9b02"
+    assert murmur3.hash64(b"hello") == 0xCBD8A7B341BD9B02
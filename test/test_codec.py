@@ -0,0 +1,164 @@
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs.unixfs import (
+    AdvancedFile,
+    ContentDAGLink,
+    DirectoryEntryLink,
+    FileChunk,
+    FileShard,
+    FlatDirectory,
+    Metadata,
+    MTime,
+    ShardedDirectory,
+    SimpleFile,
+)
+
+
+def _links() -> list[ContentDAGLink]:
+    sha256 = multihash.get("sha2-256")
+    return [
+        ContentDAGLink(
+            CID("base32", 1, 0x55, sha256.digest(bytes([n]))), 300 * n + 5, 200 * n + 1
+        )
+        for n in range(3)
+    ]
+
+
+def test_empty_file() -> None:
+    assert codec.encode_file_chunk(b"").hex() == "0a0408021800"
+    assert codec.encode_file(SimpleFile(b"")).hex() == "0a0408021800"
+
+
+def test_file_chunk() -> None:
+    # `echo "hello world" | ipfs add --raw-leaves=false`
+    block = codec.encode_file_chunk(b"hello world\n")
+    assert block.hex() == "0a120802120c68656c6c6f20776f726c640a180c"
+    digest = multihash.get("sha2-256").digest(block)
+    assert CID("base58btc", 0, 0x70, digest) == CID.decode(
+        "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+    )
+
+
+def test_multi_byte_lengths() -> None:
+    content = bytes(300)
+    block = codec.encode_file_chunk(content)
+    assert block == bytes.fromhex("0ab402080212ac02") + content + b"\x18\xac\x02"
+
+
+def test_metadata() -> None:
+    metadata = Metadata(mode=0o644, mtime=MTime(5, 7))
+    assert (
+        codec.encode_simple_file(b"abc", metadata).hex()
+        == "0a1508021203616263180338a403420708051507000000"
+    )
+    metadata = Metadata(mtime=MTime(1700000000))
+    assert (
+        codec.encode_simple_file(b"", metadata).hex() == "0a0c0802180042060880e2cfaa06"
+    )
+
+
+def test_negative_mtime() -> None:
+    metadata = Metadata(mtime=MTime(-5))
+    assert (
+        codec.encode_simple_file(b"", metadata).hex()
+        == "0a1108021800420b08fbffffffffffffffff01"
+    )
+
+
+def test_advanced_file() -> None:
+    links = _links()
+    block = codec.encode_advanced_file(links)
+    assert (
+        block.hex()
+        == "122a0a24015512206e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d12001805122b0a24015512204bf5122f344554c53bde2ebb8cd2b7e3d1600ad631c385a5d7cce23c7785459a120018b102122b0a2401551220dbc1b4c900ffe48d575b5da5c638040125f65db0fe3e24494b76ea986457d986120018dd040a0d080218db04200120c901209103"
+    )
+    assert block == codec.encode_file(AdvancedFile(links))
+    assert codec.cumulative_content_byte_length(links) == 603
+    assert codec.cumulative_dag_byte_length(block, links) == len(block) + 915
+
+
+def test_advanced_file_with_metadata() -> None:
+    block = codec.encode_advanced_file(_links(), Metadata(mode=0o755))
+    assert (
+        block.hex()
+        == "122a0a24015512206e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d12001805122b0a24015512204bf5122f344554c53bde2ebb8cd2b7e3d1600ad631c385a5d7cce23c7785459a120018b102122b0a2401551220dbc1b4c900ffe48d575b5da5c638040125f65db0fe3e24494b76ea986457d986120018dd040a10080218db04200120c90120910338ed03"
+    )
+
+
+def test_cid_bytes() -> None:
+    cid = _links()[0].cid
+    assert codec.encode_cid(cid) == bytes(cid)
+    v0 = CID.decode("QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o")
+    assert codec.encode_cid(v0) == bytes(v0)
+
+
+def test_unknown_layout() -> None:
+    with pytest.raises(TypeError):
+        codec.encode_file(FileShard([]))  # type: ignore[arg-type]
+
+
+def test_flat_directory() -> None:
+    assert codec.encode_flat_directory([]).hex() == "0a020801"
+    cid = _links()[0].cid
+    entries = [DirectoryEntryLink(cid, 5, "b"), DirectoryEntryLink(cid, 300, "a")]
+    block = codec.encode_flat_directory(entries)
+    link = "0a24" + bytes(cid).hex()
+    assert block.hex() == (
+        f"122c{link}12016118ac02" + f"122b{link}1201621805" + "0a020801"
+    )
+
+
+def test_sharded_directory() -> None:
+    cid = _links()[0].cid
+    entries = [DirectoryEntryLink(cid, 5, "0Aa")]
+    block = codec.encode_sharded_directory(b"\x04\x00", 256, 0x22, entries)
+    link = "0a24" + bytes(cid).hex()
+    assert (
+        block.hex()
+        == f"122d{link}1203304161" + "1805" + "0a0b080512020400282230800" + "2"
+    )
+
+
+def test_decode_file() -> None:
+    metadata = Metadata(mode=0o644, mtime=MTime(-5, 7))
+    node = codec.decode(codec.encode_simple_file(b"abc", metadata))
+    assert isinstance(node, SimpleFile)
+    assert bytes(node.content) == b"abc"
+    assert node.metadata is not None and node.metadata.mode == 0o644
+    assert node.metadata.mtime is not None
+    assert (node.metadata.mtime.secs, node.metadata.mtime.nsecs) == (-5, 7)
+
+    links = _links()
+    node = codec.decode(codec.encode_advanced_file(links))
+    assert isinstance(node, AdvancedFile)
+    assert node.metadata is None
+    assert [
+        (part.cid, part.dagByteLength, part.contentByteLength) for part in node.parts
+    ] == [(link.cid, link.dagByteLength, link.contentByteLength) for link in links]
+
+
+def test_decode_directory() -> None:
+    cid = _links()[0].cid
+    entries = [DirectoryEntryLink(cid, 5, "b"), DirectoryEntryLink(cid, 300, "a")]
+    node = codec.decode(codec.encode_flat_directory(entries))
+    assert isinstance(node, FlatDirectory)
+    assert [(e.name, e.cid, e.dagByteLength) for e in node.entries] == [
+        ("a", cid, 300),
+        ("b", cid, 5),
+    ]
+
+    block = codec.encode_sharded_directory(b"\x04\x00", 256, 0x22, entries[:1])
+    node = codec.decode(block)
+    assert isinstance(node, ShardedDirectory)
+    assert (node.bitfield, node.fanout, node.hashType) == (b"\x04\x00", 256, 0x22)
+    assert [entry.name for entry in node.entries] == ["b"]
+
+
+def test_decode_invalid() -> None:
+    with pytest.raises(ValueError):
+        codec.decode(b"")
+    with pytest.raises(ValueError):
+        codec.decode(bytes.fromhex("0a020804"))
+    with pytest.raises(ValueError):
+        codec.decode(bytes.fromhex("0a0408021203"))
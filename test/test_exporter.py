@@ -0,0 +1,164 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs.exporter import read_file
+import ipld_unixfs.directory as Directory
+import ipld_unixfs.file as File
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+import ipld_unixfs.file.layout.balanced as Balanced
+import ipld_unixfs.file.layout.trickle as Trickle
+from ipld_unixfs.unixfs import Block, ByteView, FileLink
+
+
+class _Blocks:
+    blocks: dict[CID, ByteView]
+
+    def __init__(self) -> None:
+        self.blocks = {}
+
+    def write(self, block: Block) -> None:
+        self.blocks[block.cid] = block.bytes
+
+    def get(self, cid: CID) -> ByteView:
+        return self.blocks[cid]
+
+
+def _import(
+    blocks: _Blocks, content: bytes, raw: bool = False, trickle: bool = False
+) -> CID:
+    settings = File.defaults()
+    settings.chunker = FixedSizeChunker(100)
+    settings.file_layout = (
+        Trickle.with_options(Trickle.Options(3, 2))
+        if trickle
+        else Balanced.with_width(3)
+    )
+    if raw:
+        settings.file_chunk_encoder = File.UnixFSRawLeaf()
+        settings.small_file_encoder = File.UnixFSRawLeaf()
+    writer = File.create_writer(blocks, settings=settings)
+    writer.write(content)
+    return writer.close().cid
+
+
+@pytest.mark.parametrize("size", [0, 1, 100, 101, 5000])
+@pytest.mark.parametrize("raw", [False, True])
+@pytest.mark.parametrize("trickle", [False, True])
+def test_read_file(size: int, raw: bool, trickle: bool) -> None:
+    content = os.urandom(size)
+    blocks = _Blocks()
+    cid = _import(blocks, content, raw, trickle)
+    assert b"".join(read_file(blocks, cid)) == content
+
+    with ThreadPoolExecutor(4) as executor:
+        chunks = list(read_file(blocks, cid, prefetch=4, executor=executor))
+    assert b"".join(chunks) == content
+    assert all(len(chunk) > 0 for chunk in chunks)
+
+
+def test_legacy_raw_nodes() -> None:
+    # Leaves of the files imported by go-ipfs with CIDv0 have `Raw` type.
+    blocks = _Blocks()
+    sha256 = multihash.get("sha2-256")
+    leaves = []
+    for part in [b"hello ", b"world\n"]:
+        leaf = bytes.fromhex("0a") + bytes([len(part) + 6]) + b"\x08\x00\x12"
+        leaf += bytes([len(part)]) + part + b"\x18" + bytes([len(part)])
+        cid = CID("base58btc", 0, 0x70, sha256.digest(leaf))
+        blocks.blocks[cid] = leaf
+        leaves.append(FileLink(cid, len(leaf), len(part)))
+    root = codec.encode_advanced_file(leaves)
+    cid = CID("base58btc", 0, 0x70, sha256.digest(root))
+    blocks.blocks[cid] = root
+    assert b"".join(read_file(blocks, cid)) == b"hello world\n"
+
+
+class _Tracking(_Blocks):
+    """Block getter tracking the number of blocks fetched concurrently."""
+
+    lock: threading.Lock
+    active: int
+    peak: int
+
+    def __init__(self, blocks: _Blocks) -> None:
+        super().__init__()
+        self.blocks = blocks.blocks
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def get(self, cid: CID) -> ByteView:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        threading.Event().wait(0.001)
+        with self.lock:
+            self.active -= 1
+        return super().get(cid)
+
+
+def test_prefetch_is_bounded() -> None:
+    content = os.urandom(10000)
+    blocks = _Blocks()
+    cid = _import(blocks, content, raw=True)
+    tracking = _Tracking(blocks)
+    with ThreadPoolExecutor(16) as executor:
+        data = b"".join(read_file(tracking, cid, prefetch=3, executor=executor))
+    assert data == content
+    assert 1 < tracking.peak <= 3
+
+
+def test_not_a_file() -> None:
+    blocks = _Blocks()
+    cid = Directory.create_writer(blocks).close().cid
+    with pytest.raises(ValueError):
+        list(read_file(blocks, cid))
+    with pytest.raises(KeyError):
+        list(read_file(blocks, _import(_Blocks(), b"missing")))
+    with pytest.raises(ValueError):
+        list(read_file(blocks, cid, prefetch=0))
+
+
+@pytest.mark.parametrize("raw", [False, True])
+@pytest.mark.parametrize("trickle", [False, True])
+def test_read_range(raw: bool, trickle: bool) -> None:
+    content = os.urandom(5000)
+    blocks = _Blocks()
+    cid = _import(blocks, content, raw, trickle)
+    ranges = [(0, None), (0, 0), (0, 1), (99, 2), (100, 100), (4999, None)]
+    ranges += [(1234, 2345), (4000, 5000), (5000, None), (6000, 10)]
+    for offset, length in ranges:
+        end = None if length is None else offset + length
+        data = b"".join(read_file(blocks, cid, offset=offset, length=length))
+        assert data == content[offset:end], (offset, length)
+
+    with pytest.raises(ValueError):
+        list(read_file(blocks, cid, offset=-1))
+
+
+class _Counting(_Blocks):
+    reads: list[CID]
+
+    def __init__(self, blocks: _Blocks) -> None:
+        super().__init__()
+        self.blocks = blocks.blocks
+        self.reads = []
+
+    def get(self, cid: CID) -> ByteView:
+        self.reads.append(cid)
+        return super().get(cid)
+
+
+def test_read_range_skips_subtrees() -> None:
+    # 3^5 leaves, so balanced DAG has 5 levels of branches.
+    content = os.urandom(243 * 100)
+    blocks = _Blocks()
+    cid = _import(blocks, content)
+    counting = _Counting(blocks)
+    data = b"".join(read_file(counting, cid, offset=len(content) - 150))
+    assert data == content[-150:]
+    # Branch at each level and the two last leaves.
+    assert len(counting.reads) == 5 + 2
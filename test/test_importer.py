@@ -0,0 +1,128 @@
+import os
+from pathlib import Path
+from typing import Optional
+import pytest
+from multiformats import CID
+import ipld_unixfs.directory as Directory
+import ipld_unixfs.file as File
+from ipld_unixfs.importer import FileImportError, import_directory, import_files
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+import ipld_unixfs.file.layout.balanced as Balanced
+from ipld_unixfs.unixfs import Block, BlockWriter, DAGLink
+from test.directory.test_writer import _decode
+from test.helpers import Blocks, balanced_settings
+
+
+def _settings() -> File.Settings[Balanced.Balanced]:
+    # Factory is defined at module level so that worker processes can import
+    # it.
+    return balanced_settings(FixedSizeChunker(1024), 4)
+
+
+def _files(tmp_path: Path) -> list[str]:
+    paths = []
+    for n in range(12):
+        path = tmp_path / f"file{n}"
+        path.write_bytes(bytes([n]) * (n * 1500))
+        paths.append(str(path))
+    return paths
+
+
+def test_import_files(tmp_path: Path) -> None:
+    paths = _files(tmp_path)
+    blocks = Blocks()
+    links = dict(
+        import_files(iter(paths), blocks, _settings, processes=2, max_queued_blocks=2)
+    )
+    assert sorted(links) == sorted(paths)
+
+    cids = {block.cid for block in blocks.blocks}
+    for path in paths:
+        expect = Blocks()
+        writer = File.create_writer(expect, settings=_settings())
+        writer.write(Path(path).read_bytes())
+        link = writer.close()
+        assert links[path].cid == link.cid
+        assert links[path].dagByteLength == link.dagByteLength
+        assert links[path].contentByteLength == link.contentByteLength
+        assert {block.cid for block in expect.blocks} <= cids
+
+
+def test_import_error(tmp_path: Path) -> None:
+    paths = _files(tmp_path)[:2] + [str(tmp_path / "missing")]
+    with pytest.raises(FileImportError) as error:
+        list(import_files(paths, Blocks(), _settings, processes=2))
+    assert error.value.path == str(tmp_path / "missing")
+    assert isinstance(error.value.__cause__, FileNotFoundError)
+
+
+def _tree(tmp_path: Path) -> Path:
+    root = tmp_path / "root"
+    (root / "nested" / "empty").mkdir(parents=True)
+    (root / "nested" / "deeper").mkdir()
+    (root / "a.txt").write_bytes(b"hello world\n")
+    (root / "nested" / "b.bin").write_bytes(bytes(5000))
+    for n in range(20):
+        (root / "nested" / "deeper" / f"{n}").write_bytes(bytes([n]) * n * 300)
+    os.symlink(root / "a.txt", root / "link")
+    return root
+
+
+def _import(path: Path, writer: BlockWriter) -> DAGLink:
+    """Imports the tree entry by entry in the calling process."""
+    if path.is_file():
+        file = File.create_writer(writer, settings=_settings())
+        file.write(path.read_bytes())
+        return file.close()
+    directory = Directory.create_writer(writer)
+    for entry in path.iterdir():
+        if not entry.is_symlink():
+            directory.set(entry.name, _import(entry, writer))
+    return directory.close()
+
+
+@pytest.mark.parametrize("max_pending_files", [1, None])
+def test_import_directory(tmp_path: Path, max_pending_files: Optional[int]) -> None:
+    root = _tree(tmp_path)
+    expect = Blocks()
+    link = _import(root, expect)
+
+    blocks = Blocks()
+    result = import_directory(
+        str(root),
+        blocks,
+        _settings,
+        processes=2,
+        max_queued_blocks=2,
+        max_pending_files=max_pending_files,
+    )
+    assert result.cid == link.cid
+    assert result.dagByteLength == link.dagByteLength
+    assert blocks.blocks[-1].cid == link.cid
+    assert {block.cid for block in blocks.blocks} == {
+        block.cid for block in expect.blocks
+    }
+
+    # Blocks of the entries precede blocks of the directories linking to them.
+    seen = set()
+    for block in blocks.blocks:
+        for child in _children(block):
+            assert child in seen
+        seen.add(block.cid)
+
+
+def _children(block: Block) -> list[CID]:
+    if block.cid.codec.code != 0x70:
+        return []
+    links, _ = _decode(bytes(block.bytes))
+    return [cid for _, cid, _ in links]
+
+
+def test_import_directory_error(tmp_path: Path) -> None:
+    root = _tree(tmp_path)
+    (root / "nested" / "b.bin").chmod(0)
+    if os.access(root / "nested" / "b.bin", os.R_OK):
+        pytest.skip("file permissions are not enforced")
+    with pytest.raises(FileImportError) as error:
+        import_directory(str(root), Blocks(), _settings, processes=2)
+    assert error.value.path == str(root / "nested" / "b.bin")